@@ -1,107 +1,657 @@
-from PySide6.QtCore import Qt, QFile
-from PySide6.QtWidgets import QMainWindow, QWidget
-from PySide6.QtUiTools import QUiLoader
-from functools import partial
+"""Animation Tweaker: tween the selection between its previous and next keys.
+
+Run in Maya's Script Editor:
+
+    import yfu_animation_tweaker
+    yfu_animation_tweaker.show()
+
+Importing only defines the tool; the window and its widgets are built in
+code on the first show(), no .ui file is needed.
+"""
+
+import os
+import time
+
+try:
+    from PySide6 import QtCore, QtWidgets
+    from shiboken6 import wrapInstance
+except ImportError:
+    from PySide2 import QtCore, QtWidgets
+    from shiboken2 import wrapInstance
 
 from maya import OpenMayaUI as omui
-from shiboken6 import wrapInstance
 
+import maya.api.OpenMaya as om
+import maya.api.OpenMayaAnim as oma
 import maya.cmds as cmds
+import maya.mel as mel
+
+try:
+    import numpy as np
+except ImportError:
+    np = None # range mode needs NumPy
+
+
+# scriptJob events after which the cached keys no longer match the scene
+CACHE_EVENTS = ["SelectionChanged", "timeChanged", "Undo", "Redo", "SceneOpened", "NewSceneOpened"]
+
+# at most one scene write per display frame (~60 Hz) while the slider moves
+WRITE_INTERVAL_MS = 16
+
+TOOL_TITLE = "AnimationTweaker"
+WINDOW_OBJECT = "animationTweakerWindow"
+SLIDER_RANGE = (-25, 125)
+
+# Designer layout the window was originally loaded from, kept for benchmark_startup
+UI_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "yfu_animation_tweaker.ui")
+
+CURVE_TYPES = {
+    "animCurveTA": oma.MFnAnimCurve.kAnimCurveTA,
+    "animCurveTL": oma.MFnAnimCurve.kAnimCurveTL,
+    "animCurveTT": oma.MFnAnimCurve.kAnimCurveTT,
+    "animCurveTU": oma.MFnAnimCurve.kAnimCurveTU,
+}
+
+
+class TweenCache(object):
+    """
+    Animated attributes of the selection with their previous/next key values.
 
+    Built once per selection, current time or drag, so a slider tick is
+    plain arithmetic plus one batched write. Values are kept in internal
+    units (radians, cm) straight from the anim curves, and written back
+    through MPlug so no unit conversion is needed.
 
-def paSlider_update():
-    paSlider_value = ui.paSlider.value() 
-    ui.paSpinBox.setValue(paSlider_value) # sync spinbox value to slider
-    if ui.autoUpdateButton.isChecked():
-        feed_value_back()
-    
+    Attributes keyed through an animation layer or a pairBlend have no
+    curve on their input; they are evaluated with getAttr and written
+    with setAttr like the original tool did.
+    """
 
-def paSpinBox_update():
-    paSpinbox_value = ui.paSpinBox.value()
-    ui.paSlider.setValue(paSpinbox_value) # sync slider value to spinbox
+    def __init__(self):
+        self.valid = False
+        self.current_time = None
+        self.plugs = []       # MPlug per animated attribute
+        self.names = []       # "obj.attr" per animated attribute, for setKeyframe
+        self.previous = []    # value at the previous key
+        self.delta = []       # next key value - previous key value
+        self.blended = []     # ("obj.attr", previous value, delta) keyed through a blend node, UI units
+        self.job_ids = []
 
+    def invalidate(self, *_):
+        self.valid = False
 
-def manual_update():
-    feed_value_back()
-    
+    def start_jobs(self):
+        """Invalidate the cache whenever selection, time or undo state changes"""
+        self.kill_jobs()
+        self.job_ids = [cmds.scriptJob(event=[event, self.invalidate]) for event in CACHE_EVENTS]
 
-def feed_value_back():
+    def kill_jobs(self, *_):
+        for job_id in self.job_ids:
+            if cmds.scriptJob(exists=job_id):
+                cmds.scriptJob(kill=job_id, force=True)
+        self.job_ids = []
 
-    #get info
-    currentTime = cmds.currentTime(query=True)
-    previousKey = cmds.findKeyframe(timeSlider=True, which="previous")
-    nextKey = cmds.findKeyframe(timeSlider=True, which="next")
-    paSlider_value = ui.paSlider.value()
+    def build(self):
+        """Collect animated attributes and their bracketing key values; returns False if nothing to tween"""
+        self.valid = False
+        self.plugs = []
+        self.names = []
+        self.previous = []
+        self.delta = []
+        self.blended = []
 
-    # check if object has key needed
-    if previousKey is None or nextKey is None:
-        print("Skipping: Missing previous or next keyframe.")
-        return
+        self.current_time = cmds.currentTime(query=True)
+        previousKey = cmds.findKeyframe(timeSlider=True, which="previous")
+        nextKey = cmds.findKeyframe(timeSlider=True, which="next")
 
-    # get selected objects
-    selected = cmds.ls(sl=True)
-    if not selected:
-        print("No object selected.")
-        return
+        # check if object has key needed
+        if previousKey is None or nextKey is None:
+            print("Skipping: Missing previous or next keyframe.")
+            return False
 
-    for obj in selected: # list all selected objects
-       
-        keyable_attributes = cmds.listAttr(obj, k=True) or [] # pic up all attribute that has animation
-        attributesHasKey = [
-            attr for attr in keyable_attributes
-            if cmds.keyframe(obj, attribute=attr, query=True, kc=True) > 0
-        ]
+        # get selected objects
+        selected = cmds.ls(sl=True)
+        if not selected:
+            print("No object selected.")
+            return False
 
-        if not attributesHasKey:
-            print(f"No keyable attributes found for {obj}.")
-            continue
+        # [destination plug, anim curve, ...] for every curve driving the selection, in one call
+        connections = cmds.listConnections(
+            selected, type="animCurve", source=True, destination=False, connections=True, plugs=False
+        ) or []
 
-        for attr in attributesHasKey: # lise all attribute
-            attr_full = f"{obj}.{attr}"  # resume full name
+        keyable = {}
+        unit = om.MTime.uiUnit()
+        previousTime = om.MTime(previousKey, unit)
+        nextTime = om.MTime(nextKey, unit)
+        selection = om.MSelectionList()
+
+        for attr_full, curve in zip(connections[::2], connections[1::2]):
+            obj, attr = attr_full.split(".", 1)
+            if obj not in keyable:
+                keyable[obj] = set(cmds.listAttr(obj, k=True) or [])
+            if attr not in keyable[obj]:
+                continue
+
+            selection.clear()
+            selection.add(curve)
+            selection.add(attr_full)
+            curve_fn = oma.MFnAnimCurve(selection.getDependNode(0))
+            if not curve_fn.isTimeInput:
+                continue  # driven keys, not tweenable in time
+
+            previousValue = curve_fn.evaluate(previousTime)
+            self.plugs.append(selection.getPlug(1))
+            self.names.append(attr_full)
+            self.previous.append(previousValue)
+            self.delta.append(curve_fn.evaluate(nextTime) - previousValue)
+
+        # keyframe resolves curves behind animation layers and pairBlends; only objects
+        # with such curves are searched attribute by attribute
+        direct = set(connections[1::2])
+        found = set(self.names)
+        for obj in selected:
+            curves = cmds.keyframe(obj, query=True, name=True) or []
+            if all(curve in direct or cmds.nodeType(curve) not in CURVE_TYPES for curve in curves):
+                continue
+
+            for attr in cmds.listAttr(obj, k=True) or []:
+                attr_full = "{0}.{1}".format(obj, attr)
+                if attr_full in found:
+                    continue
+                attr_curves = cmds.keyframe(obj, attribute=attr, query=True, name=True) or []
+                if not any(cmds.nodeType(curve) in CURVE_TYPES for curve in attr_curves):
+                    continue
 
-            try:
-                # get info
                 previousValue = cmds.getAttr(attr_full, time=previousKey)
                 nextValue = cmds.getAttr(attr_full, time=nextKey)
-                diffence = previousValue + (nextValue - previousValue) * (paSlider_value / 100)
-
-                # feed value back
-                cmds.setAttr(attr_full, diffence)
-                cmds.setKeyframe(attr_full, time=currentTime)
-                print(f"Updated {attr_full} to {diffence} at frame {currentTime}")
-            except Exception as e:
-                print(f"Error processing {attr_full}: {e}")
-
-
-# get maya window
-mw_ptr = omui.MQtUtil.mainWindow()
-mayaMainWindow = wrapInstance(int(mw_ptr), QMainWindow)
-
-
-root_widget = QWidget()
-loader = QUiLoader()
-file = QFile(r"C:\Docs\yfu_animation_tweaker.ui") # UI fil CHANGE HERE
-file.open(QFile.ReadOnly)
-ui = loader.load(file)
-file.close()
-
-# set ui slider value range
-ui.paSlider.setMinimum(-25)
-ui.paSlider.setMaximum(125)
-ui.paSpinBox.setMinimum(-25)
-ui.paSpinBox.setMaximum(125)
-
-# default checkbox checked
-ui.autoUpdateButton.setChecked(True)
-
-# ui.name.signal.runCODE
-# live update, usualy a button in the end runs all the changes
-ui.paSlider.valueChanged.connect(paSlider_update)
-ui.paSpinBox.valueChanged.connect(paSpinBox_update)
-#ui.paSlider.valueChanged.connect(feed_value_back)
-ui.updateButton.clicked.connect(manual_update)
-
-# set pop up window
-ui.setWindowTitle('AnimationTweaker') # name window
-ui.setWindowFlags(Qt.Window|Qt.WindowStaysOnTopHint) # Make this widget a parented standalone window
-ui.show()
+                if not isinstance(previousValue, (int, float)) or not isinstance(nextValue, (int, float)):
+                    continue
+                self.blended.append((attr_full, previousValue, nextValue - previousValue))
+
+        if not self.plugs and not self.blended:
+            print("No animated attributes found on the selection.")
+            return False
+
+        self.valid = True
+        return True
+
+    def ensure(self):
+        """Rebuild if invalidated; returns False if there is nothing to tween"""
+        return self.valid or self.build()
+
+    def apply(self, percent):
+        """Write previous + (next - previous) * percent to every cached attribute and key it"""
+        if not self.ensure():
+            return
+
+        weight = percent / 100.0
+        modifier = om.MDGModifier()
+        for plug, previousValue, delta in zip(self.plugs, self.previous, self.delta):
+            modifier.newPlugValueDouble(plug, previousValue + delta * weight)
+        modifier.doIt()
+
+        for attr_full, previousValue, delta in self.blended:
+            cmds.setAttr(attr_full, previousValue + delta * weight)
+
+        # one undoable key command for all attributes, keying the values just set
+        cmds.setKeyframe(self.names + [attr_full for attr_full, _, _ in self.blended], time=self.current_time)
+
+
+def get_tween_range():
+    """Return the highlighted time slider range, or the playback range"""
+    slider = mel.eval("$tmp = $gPlayBackSlider")
+    if cmds.timeControl(slider, query=True, rangeVisible=True):
+        start, end = cmds.timeControl(slider, query=True, rangeArray=True)
+        return start, end - 1 # rangeArray end is exclusive
+    return cmds.playbackOptions(query=True, minTime=True), cmds.playbackOptions(query=True, maxTime=True)
+
+
+def tween_between_anchors(curve_ids, values, targets, anchors, percent):
+    """
+    Tween every target key between the nearest anchor keys before and after it.
+
+    Arrays are flat over all curves, sorted by curve then time. Anchors are
+    found for all keys at once with running max/min over anchor indices, so
+    the whole range is one vectorized pass. Returns (key indices, new values)
+    for targets with an anchor on both sides on their own curve.
+    """
+    count = len(values)
+    indices = np.arange(count)
+
+    # nearest anchor strictly before / after each key
+    previous = np.maximum.accumulate(np.where(anchors, indices, -1))
+    previous = np.concatenate(([-1], previous[:-1]))
+    following = np.minimum.accumulate(np.where(anchors, indices, count)[::-1])[::-1]
+    following = np.concatenate((following[1:], [count]))
+
+    keys = np.flatnonzero(targets & (previous >= 0) & (following < count))
+    before = previous[keys]
+    after = following[keys]
+
+    same_curve = (curve_ids[before] == curve_ids[keys]) & (curve_ids[after] == curve_ids[keys])
+    keys, before, after = keys[same_curve], before[same_curve], after[same_curve]
+
+    return keys, values[before] + (values[after] - values[before]) * (percent / 100.0)
+
+
+class RangeTweenCache(TweenCache):
+    """
+    Keys of the selection's curves inside a time range, for tweening them all at once.
+
+    Targets are the breakdown keys in the range (or every key when
+    breakdowns_only is off), each tweened between its own bracketing keys.
+    The original keys are read once per drag, so repeated slider ticks
+    recompute from the same values. Each changed curve is written with one
+    copyKey/pasteKey from a temporary curve holding the new keys.
+    """
+
+    def __init__(self):
+        super(RangeTweenCache, self).__init__()
+        self.breakdowns_only = True
+        self.curves = []     # (curve name, curve type, weighted, first window key index, keys) per curve
+        self.curve_ids = None
+        self.values = None
+        self.targets = None
+        self.anchors = None
+
+    def build(self):
+        self.valid = False
+        self.curves = []
+
+        if np is None:
+            print("Range mode needs NumPy.")
+            return False
+
+        selected = cmds.ls(sl=True)
+        if not selected:
+            print("No object selected.")
+            return False
+
+        start, end = get_tween_range()
+        unit = om.MTime.uiUnit()
+        curves = cmds.keyframe(selected, query=True, name=True) or []
+
+        curve_ids = []
+        values = []
+        targets = []
+        anchors = []
+        selection = om.MSelectionList()
+
+        for curve in dict.fromkeys(curves):
+            curve_type = CURVE_TYPES.get(cmds.nodeType(curve))
+            if curve_type is None:
+                continue # driven keys, not tweenable in time
+
+            selection.clear()
+            selection.add(curve)
+            curve_fn = oma.MFnAnimCurve(selection.getDependNode(0))
+            first, last = self.key_window(curve_fn, start, end, unit)
+            if first > last:
+                continue
+
+            keys = []
+            for index in range(first, last + 1):
+                time = curve_fn.input(index).asUnits(unit)
+                breakdown = curve_fn.isBreakdown(index)
+                in_angle, in_weight = curve_fn.getTangentAngleWeight(index, True)
+                out_angle, out_weight = curve_fn.getTangentAngleWeight(index, False)
+                keys.append((
+                    time, curve_fn.inTangentType(index), curve_fn.outTangentType(index),
+                    in_angle, in_weight, out_angle, out_weight,
+                    curve_fn.tangentsLocked(index), curve_fn.weightsLocked(index), breakdown
+                ))
+
+                curve_ids.append(len(self.curves))
+                values.append(curve_fn.value(index))
+                is_target = start <= time <= end and (breakdown or not self.breakdowns_only)
+                targets.append(is_target)
+                anchors.append(not breakdown if self.breakdowns_only else True)
+
+            self.curves.append((curve, curve_type, curve_fn.isWeighted, first, keys))
+
+        if not any(targets):
+            print("No {0}keys to tween between {1:g} and {2:g}.".format(
+                "breakdown " if self.breakdowns_only else "", start, end
+            ))
+            return False
+
+        self.curve_ids = np.array(curve_ids)
+        self.values = np.array(values, dtype=float)
+        self.targets = np.array(targets, dtype=bool)
+        self.anchors = np.array(anchors, dtype=bool)
+        self.valid = True
+        return True
+
+    def key_window(self, curve_fn, start, end, unit):
+        """Key indices covering [start, end], widened to the nearest anchor on each side"""
+        count = curve_fn.numKeys
+        if not count:
+            return 0, -1
+
+        first = curve_fn.findClosest(om.MTime(start, unit))
+        if curve_fn.input(first).asUnits(unit) >= start and first > 0:
+            first -= 1
+        last = curve_fn.findClosest(om.MTime(end, unit))
+        if curve_fn.input(last).asUnits(unit) <= end and last < count - 1:
+            last += 1
+
+        if self.breakdowns_only:
+            while first > 0 and curve_fn.isBreakdown(first):
+                first -= 1
+            while last < count - 1 and curve_fn.isBreakdown(last):
+                last += 1
+        return first, last
+
+    def apply(self, percent):
+        """Tween every target key in the range and write each changed curve in one paste"""
+        if not self.ensure():
+            return
+
+        keys, new_values = tween_between_anchors(self.curve_ids, self.values, self.targets, self.anchors, percent)
+        if not len(keys):
+            return
+
+        values = self.values.copy()
+        values[keys] = new_values
+        offsets = np.concatenate(([0], np.cumsum([len(curve[4]) for curve in self.curves])))
+        changed_curves = np.unique(self.curve_ids[keys])
+        changed_keys = self.curve_ids[keys]
+
+        for curve_id in changed_curves.tolist():
+            positions = keys[changed_keys == curve_id] - offsets[curve_id]
+            low, high = int(positions.min()), int(positions.max())
+            self.write_curve(curve_id, low, high, values[offsets[curve_id] + low:offsets[curve_id] + high + 1])
+
+    def write_curve(self, curve_id, low, high, values):
+        """Stage keys low..high of a curve on a temporary curve and paste them over the originals"""
+        curve, curve_type, weighted, _, keys = self.curves[curve_id]
+        unit = om.MTime.uiUnit()
+
+        temp_fn = oma.MFnAnimCurve()
+        temp_curve = temp_fn.create(curve_type)
+        try:
+            temp_fn.setIsWeighted(weighted)
+            for index, (key, value) in enumerate(zip(keys[low:high + 1], values.tolist())):
+                time, in_type, out_type, in_angle, in_weight, out_angle, out_weight, locked, weights_locked, breakdown = key
+                temp_fn.addKey(om.MTime(time, unit), value, in_type, out_type)
+                temp_fn.setTangentsLocked(index, False)
+                temp_fn.setTangent(index, in_angle, in_weight, True)
+                temp_fn.setTangent(index, out_angle, out_weight, False)
+                temp_fn.setInTangentType(index, in_type)
+                temp_fn.setOutTangentType(index, out_type)
+                temp_fn.setTangentsLocked(index, locked)
+                temp_fn.setWeightsLocked(index, weights_locked)
+                temp_fn.setIsBreakdown(index, breakdown)
+
+            cmds.copyKey(om.MFnDependencyNode(temp_curve).name())
+            cmds.pasteKey(curve, time=(keys[low][0],), option="replace")
+        finally:
+            modifier = om.MDGModifier()
+            modifier.deleteNode(temp_curve)
+            modifier.doIt()
+
+
+class UpdateScheduler(object):
+    """
+    Coalesce slider values into at most one scene write per display frame.
+
+    schedule() only stores the latest value and starts a single-shot timer;
+    values replaced before the timer fires are counted as skipped. A drag
+    between begin_gesture() and end_gesture() is one undo chunk.
+    """
+
+    def __init__(self, write, interval=WRITE_INTERVAL_MS, on_stats=None):
+        self.write = write
+        self.on_stats = on_stats
+        self.pending = None
+        self.in_gesture = False
+        self.writes = 0
+        self.skipped = 0
+
+        self.timer = QtCore.QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.flush)
+
+    def schedule(self, value):
+        if self.pending is not None:
+            self.skipped += 1 # latest value wins
+        self.pending = value
+        if not self.timer.isActive():
+            self.timer.start()
+        self.report()
+
+    def flush(self):
+        self.timer.stop()
+        if self.pending is None:
+            return
+        value = self.pending
+        self.pending = None
+        self.writes += 1
+        self.write(value)
+        self.report()
+
+    def begin_gesture(self):
+        self.flush()
+        if not self.in_gesture:
+            cmds.undoInfo(openChunk=True, chunkName="animationTweakerDrag")
+            self.in_gesture = True
+        self.writes = 0
+        self.skipped = 0
+        self.report()
+
+    def end_gesture(self, *_):
+        self.flush() # the release value always lands
+        if self.in_gesture:
+            self.in_gesture = False
+            cmds.undoInfo(closeChunk=True)
+
+    def cancel(self, *_):
+        """Drop any pending value and close an open drag chunk, e.g. when the window goes away"""
+        self.timer.stop()
+        self.pending = None
+        if self.in_gesture:
+            self.in_gesture = False
+            cmds.undoInfo(closeChunk=True)
+
+    def report(self):
+        if self.on_stats:
+            self.on_stats(self.writes, self.skipped)
+
+
+def _maya_main_window():
+    pointer = omui.MQtUtil.mainWindow()
+    return wrapInstance(int(pointer), QtWidgets.QWidget) if pointer else None
+
+
+class AnimationTweakerWindow(QtWidgets.QWidget):
+    """Tween slider window, laid out in code"""
+
+    def __init__(self, parent=None):
+        super(AnimationTweakerWindow, self).__init__(parent)
+        self.setObjectName(WINDOW_OBJECT)
+        self.setWindowTitle(TOOL_TITLE) # name window
+        self.setWindowFlags(QtCore.Qt.Window | QtCore.Qt.WindowStaysOnTopHint) # Make this widget a parented standalone window
+        self.setAttribute(QtCore.Qt.WA_DeleteOnClose)
+        self.resize(370, 150)
+
+        # cached keys for the live slider, coalesced writes with one undo chunk per drag
+        self.tween_cache = TweenCache()
+        self.range_cache = RangeTweenCache()
+        self.scheduler = UpdateScheduler(self.feed_value_back, on_stats=self.update_stats_label)
+
+        self.build_ui()
+        self.update_stats_label(0, 0)
+
+    def build_ui(self):
+        layout = QtWidgets.QVBoxLayout(self)
+
+        # slider and spinbox, -25..125 percent
+        self.paSlider = QtWidgets.QSlider(QtCore.Qt.Horizontal)
+        self.paSpinBox = QtWidgets.QDoubleSpinBox()
+        for widget in [self.paSlider, self.paSpinBox]:
+            widget.setMinimum(SLIDER_RANGE[0])
+            widget.setMaximum(SLIDER_RANGE[1])
+        slider_row = QtWidgets.QHBoxLayout()
+        slider_row.addWidget(self.paSlider)
+        slider_row.addWidget(self.paSpinBox)
+        layout.addLayout(slider_row)
+
+        # write counter, auto update and manual update
+        self.statsLabel = QtWidgets.QLabel()
+        self.statsLabel.setStyleSheet("color: gray;")
+        self.autoUpdateButton = QtWidgets.QCheckBox("Auto Update")
+        self.autoUpdateButton.setChecked(True) # default checkbox checked
+        self.updateButton = QtWidgets.QPushButton("Update")
+        update_row = QtWidgets.QHBoxLayout()
+        update_row.addWidget(self.statsLabel, 1)
+        update_row.addWidget(self.autoUpdateButton)
+        update_row.addWidget(self.updateButton)
+        layout.addLayout(update_row)
+
+        # range mode: tween every breakdown in the highlighted (or playback) range
+        self.rangeModeBox = QtWidgets.QCheckBox("Range")
+        self.rangeModeBox.setToolTip("Tween all keys in the highlighted time slider range, or the playback range")
+        self.rangeModeBox.setEnabled(np is not None)
+        self.breakdownsOnlyBox = QtWidgets.QCheckBox("Breakdowns only")
+        self.breakdownsOnlyBox.setChecked(True)
+        self.breakdownsOnlyBox.setToolTip("Off: every key in the range is tweened between its neighbour keys")
+        range_row = QtWidgets.QHBoxLayout()
+        range_row.addWidget(self.rangeModeBox)
+        range_row.addWidget(self.breakdownsOnlyBox)
+        range_row.addStretch(1)
+        layout.addLayout(range_row)
+
+        # live update, usualy a button in the end runs all the changes
+        self.paSlider.valueChanged.connect(self.paSlider_update)
+        self.paSpinBox.valueChanged.connect(self.paSpinBox_update)
+        self.paSlider.sliderPressed.connect(self.slider_pressed)
+        self.paSlider.sliderReleased.connect(self.scheduler.end_gesture)
+        self.updateButton.clicked.connect(self.manual_update)
+        self.rangeModeBox.toggled.connect(self.invalidate_caches)
+        self.breakdownsOnlyBox.toggled.connect(self.invalidate_caches)
+
+    def showEvent(self, event):
+        self.tween_cache.start_jobs()
+        self.range_cache.start_jobs()
+        super(AnimationTweakerWindow, self).showEvent(event)
+
+    def closeEvent(self, event):
+        # stop the scriptJobs with the window and never leave a drag's undo chunk open
+        self.tween_cache.kill_jobs()
+        self.range_cache.kill_jobs()
+        self.scheduler.cancel()
+        super(AnimationTweakerWindow, self).closeEvent(event)
+
+    def update_stats_label(self, writes, skipped):
+        self.statsLabel.setText(f"Writes: {writes}  Skipped: {skipped}")
+
+    def active_cache(self):
+        """Range cache in range mode, else the current frame cache"""
+        if self.rangeModeBox.isChecked():
+            self.range_cache.breakdowns_only = self.breakdownsOnlyBox.isChecked()
+            return self.range_cache
+        return self.tween_cache
+
+    def invalidate_caches(self, *_):
+        self.tween_cache.invalidate()
+        self.range_cache.invalidate()
+
+    def slider_pressed(self):
+        self.invalidate_caches() # rebuild once per drag
+        self.scheduler.begin_gesture()
+
+    def paSlider_update(self):
+        paSlider_value = self.paSlider.value()
+        self.paSpinBox.setValue(paSlider_value) # sync spinbox value to slider
+        if self.autoUpdateButton.isChecked():
+            self.scheduler.schedule(paSlider_value)
+
+    def paSpinBox_update(self):
+        paSpinbox_value = self.paSpinBox.value()
+        self.paSlider.setValue(int(round(paSpinbox_value))) # sync slider value to spinbox
+
+    def manual_update(self):
+        self.invalidate_caches() # pick up key edits made since the last update
+        self.feed_value_back()
+
+    def feed_value_back(self, paSlider_value=None):
+        if paSlider_value is None:
+            paSlider_value = self.paSlider.value()
+
+        # keys and attributes come from the cache, rebuilt only when invalidated
+        cache = self.active_cache()
+        try:
+            cache.apply(paSlider_value)
+        except Exception as e:
+            print(f"Error updating tween: {e}")
+            cache.invalidate()
+
+
+def load_ui_file(path=UI_FILE):
+    """Build the original Designer layout through QUiLoader, as the tool used to at import time"""
+    try:
+        from PySide6.QtUiTools import QUiLoader
+    except ImportError:
+        from PySide2.QtUiTools import QUiLoader
+
+    ui_file = QtCore.QFile(path)
+    ui_file.open(QtCore.QFile.ReadOnly)
+    try:
+        return QUiLoader().load(ui_file)
+    finally:
+        ui_file.close()
+
+
+def benchmark_startup(runs=10, ui_path=UI_FILE):
+    """
+    Time building the window in code against loading the .ui through QUiLoader.
+
+    Widgets are built hidden and deleted again; prints and returns the
+    average milliseconds per build for both paths.
+    """
+    def average(build):
+        start = time.perf_counter()
+        for _ in range(runs):
+            widget = build()
+            widget.deleteLater()
+        QtWidgets.QApplication.processEvents()
+        return (time.perf_counter() - start) * 1000.0 / runs
+
+    results = {"code": average(AnimationTweakerWindow)}
+    if os.path.isfile(ui_path):
+        results["quiloader"] = average(lambda: load_ui_file(ui_path))
+
+    print("Startup, average of {0} builds:".format(runs))
+    print("  Layout in code: {0:.2f} ms".format(results["code"]))
+    if "quiloader" in results:
+        print("  QUiLoader:      {0:.2f} ms ({1:.1f}x)".format(
+            results["quiloader"], results["quiloader"] / max(results["code"], 1e-9)
+        ))
+    else:
+        print("  QUiLoader:      skipped, no .ui file at " + ui_path)
+    return results
+
+
+_WINDOW = None
+
+
+def show():
+    """Open the tool, replacing a window that is already open"""
+    global _WINDOW
+    try:
+        if _WINDOW:
+            _WINDOW.close()
+            _WINDOW.deleteLater()
+    except Exception:
+        pass
+    _WINDOW = AnimationTweakerWindow(_maya_main_window())
+    _WINDOW.show()
+    _WINDOW.raise_()
+    _WINDOW.activateWindow()
+    return _WINDOW
+
+
+if __name__ == "__main__":
+    show()
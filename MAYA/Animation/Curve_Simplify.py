@@ -0,0 +1,330 @@
+"""Error-bounded key reduction for dense anim curves.
+
+Removes keys a curve doesn't need: every dropped key stays within a
+per-channel tolerance of the line between the keys that are kept
+(Ramer-Douglas-Peucker, evaluated for all segments at once in NumPy).
+Remaining keys get linear tangents by default so the bound holds exactly.
+
+Run in Maya's Script Editor for the UI, or call from other tools:
+
+    import Curve_Simplify
+    Curve_Simplify.simplify_curves(curves, time_range=(1001, 1200))
+"""
+
+import time
+
+import maya.cmds as cmds
+
+import numpy as np
+
+
+# Default tolerance per channel kind (scene units, degrees, scale factor)
+TOLERANCES = {
+    "translate": 0.01,
+    "rotate": 0.05,
+    "scale": 0.001,
+    "other": 0.001,
+}
+
+CHANNEL_KINDS = ["translate", "rotate", "scale", "other"]
+
+
+# ------------------------------------------------------------
+# Reduction
+# ------------------------------------------------------------
+
+def simplify_mask(times, values, tolerance):
+    """
+    Return a boolean mask of the keys to keep.
+
+    The first and last key are always kept. Each pass finds, for every
+    segment between kept keys, the key furthest from the segment's line and
+    keeps it if it is beyond tolerance; all segments are processed together.
+    """
+    times = np.asarray(times, dtype=float)
+    values = np.asarray(values, dtype=float)
+    count = len(values)
+
+    keep = np.zeros(count, dtype=bool)
+    if count == 0:
+        return keep
+
+    keep[0] = True
+    keep[-1] = True
+    if count < 3:
+        return keep
+
+    indices = np.arange(count)
+
+    while True:
+        kept = np.flatnonzero(keep)
+
+        # Segment of every key: between kept[segment] and kept[segment + 1]
+        segment = np.searchsorted(kept, indices, side="right") - 1
+        segment = np.minimum(segment, len(kept) - 2)
+
+        left = kept[segment]
+        right = kept[segment + 1]
+        span = times[right] - times[left]
+        weight = np.where(span > 0, (times - times[left]) / np.where(span > 0, span, 1.0), 0.0)
+        error = np.abs(values - (values[left] + (values[right] - values[left]) * weight))
+        error[keep] = 0.0
+
+        # Largest error per segment, then the first key reaching it
+        segment_max = np.maximum.reduceat(error, kept[:-1])
+        candidates = np.flatnonzero((error > tolerance) & (error == segment_max[segment]))
+        if not len(candidates):
+            break
+
+        _, first = np.unique(segment[candidates], return_index=True)
+        keep[candidates[first]] = True
+
+    return keep
+
+
+def get_channel_kind(curve):
+    """Return translate, rotate, scale or other for the attribute an anim curve drives"""
+    if cmds.nodeType(curve) == "animCurveTA":
+        return "rotate"
+
+    plugs = cmds.listConnections(curve + ".output", plugs=True, source=False) or []
+    for plug in plugs:
+        attr = plug.split(".")[-1]
+        for kind in ["translate", "rotate", "scale"]:
+            if attr.startswith(kind):
+                return kind
+
+    if cmds.nodeType(curve) == "animCurveTL":
+        return "translate"
+
+    return "other"
+
+
+def index_ranges(indices):
+    """Collapse sorted indices into (first, last) runs"""
+    ranges = []
+    for index in indices:
+        if ranges and ranges[-1][1] == index - 1:
+            ranges[-1] = (ranges[-1][0], index)
+        else:
+            ranges.append((index, index))
+    return ranges
+
+
+def simplify_curve(curve, tolerance=None, time_range=None, linear_tangents=True):
+    """
+    Reduce the keys of one anim curve in place.
+
+    Reads all keys in one query per array, decides which to keep in NumPy
+    and removes the rest with one cutKey call. Returns (keys before, keys after).
+    """
+    if tolerance is None:
+        tolerance = TOLERANCES[get_channel_kind(curve)]
+
+    query = {"query": True}
+    if time_range:
+        query["time"] = tuple(time_range)
+
+    times = cmds.keyframe(curve, timeChange=True, **query) or []
+    values = cmds.keyframe(curve, valueChange=True, **query) or []
+    if len(times) < 3:
+        return len(times), len(times)
+
+    keep = simplify_mask(times, values, tolerance)
+    removed = np.flatnonzero(~keep)
+
+    if len(removed):
+        # Kept keys sit between the runs, so each run can be cut by its time span
+        cmds.cutKey(
+            curve,
+            time=[(times[first], times[last]) for first, last in index_ranges(removed.tolist())],
+            option="keys",
+            clear=True
+        )
+
+    if linear_tangents:
+        cmds.keyTangent(curve, time=(times[0], times[-1]), inTangentType="linear", outTangentType="linear")
+
+    return len(times), int(keep.sum())
+
+
+def get_curves(nodes=None):
+    """Return anim curves from the graph editor selection, or driving the given/selected nodes"""
+    if nodes is None:
+        curves = cmds.keyframe(query=True, selected=True, name=True) or []
+        if curves:
+            return list(dict.fromkeys(curves))
+        nodes = cmds.ls(selection=True)
+
+    if not nodes:
+        return []
+
+    return list(dict.fromkeys(cmds.keyframe(nodes, query=True, name=True) or []))
+
+
+def simplify_curves(curves=None, tolerances=None, time_range=None, linear_tangents=True, verbose=True):
+    """
+    Reduce every curve with the tolerance of its channel kind, in one undo chunk.
+
+    tolerances overrides entries of TOLERANCES, e.g. {"rotate": 0.1}.
+    Returns (keys before, keys after) summed over all curves.
+    """
+    if curves is None:
+        curves = get_curves()
+
+    limits = dict(TOLERANCES)
+    limits.update(tolerances or {})
+
+    before = 0
+    after = 0
+    start = time.perf_counter()
+
+    cmds.undoInfo(openChunk=True, chunkName="simplify_curves")
+    try:
+        for curve in curves:
+            curve_before, curve_after = simplify_curve(
+                curve,
+                limits[get_channel_kind(curve)],
+                time_range=time_range,
+                linear_tangents=linear_tangents
+            )
+            before += curve_before
+            after += curve_after
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    if verbose:
+        print("Simplified {0} curves: {1} -> {2} keys ({3:.1%} removed) in {4:.3f}s".format(
+            len(curves), before, after, 1.0 - float(after) / max(before, 1), time.perf_counter() - start
+        ))
+
+    return before, after
+
+
+# ------------------------------------------------------------
+# Benchmark
+# ------------------------------------------------------------
+
+def simplify_mask_recursive(times, values, tolerance):
+    """Reference RDP, one segment at a time, used to check and time simplify_mask"""
+    keep = [False] * len(values)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(values) - 1)]
+
+    while stack:
+        left, right = stack.pop()
+        span = times[right] - times[left]
+        best_error = tolerance
+        best_index = None
+        for index in range(left + 1, right):
+            weight = (times[index] - times[left]) / span if span else 0.0
+            error = abs(values[index] - (values[left] + (values[right] - values[left]) * weight))
+            if error > best_error:
+                best_error = error
+                best_index = index
+        if best_index is not None:
+            keep[best_index] = True
+            stack.append((left, best_index))
+            stack.append((best_index, right))
+
+    return np.array(keep)
+
+
+def synthetic_curve(key_count=10000, seed=0):
+    """Build a dense baked-looking curve: smooth motion, holds and a little noise"""
+    rng = np.random.default_rng(seed)
+    times = np.arange(key_count, dtype=float)
+    values = np.sin(times * 0.01) * 20.0 + np.sin(times * 0.003) * 45.0
+    values += rng.normal(0.0, 0.002, key_count)
+
+    # Hold a few stretches like a prop resting on a table
+    for start in range(0, key_count, max(key_count // 5, 1)):
+        values[start:start + key_count // 20] = values[start]
+
+    return times, values
+
+
+def benchmark_simplify(key_count=10000, curve_count=9, tolerance=0.05, compare=True):
+    """
+    Time simplify_mask on synthetic dense curves.
+
+    Runs without touching the scene. With compare=True the one-segment-at-
+    a-time reference is timed too and the kept keys are checked to match.
+    """
+    curves = [synthetic_curve(key_count, seed) for seed in range(curve_count)]
+
+    start = time.perf_counter()
+    masks = [simplify_mask(times, values, tolerance) for times, values in curves]
+    vectorized = time.perf_counter() - start
+
+    kept = sum(int(mask.sum()) for mask in masks)
+    total = key_count * curve_count
+    print("Vectorized: {0} curves x {1} keys -> {2} keys ({3:.1%} removed) in {4:.3f}s".format(
+        curve_count, key_count, kept, 1.0 - float(kept) / total, vectorized
+    ))
+
+    results = {"vectorized": vectorized, "keys_before": total, "keys_after": kept}
+
+    if compare:
+        start = time.perf_counter()
+        references = [simplify_mask_recursive(times.tolist(), values.tolist(), tolerance) for times, values in curves]
+        reference = time.perf_counter() - start
+
+        matches = all((mask == ref).all() for mask, ref in zip(masks, references))
+        print("Reference:  {0:.3f}s ({1:.1f}x slower), results match: {2}".format(
+            reference, reference / max(vectorized, 1e-9), matches
+        ))
+        results["reference"] = reference
+        results["matches"] = matches
+
+    return results
+
+
+# ------------------------------------------------------------
+# UI
+# ------------------------------------------------------------
+
+def show_ui():
+    """Create a small window with per-channel tolerances"""
+    if cmds.window("curveSimplifyWin", exists=True):
+        cmds.deleteUI("curveSimplifyWin")
+
+    window = cmds.window("curveSimplifyWin", title="Curve Simplify", width=260)
+    cmds.columnLayout(adjustableColumn=True, rowSpacing=5, columnAttach=("both", 10))
+
+    cmds.separator(height=10, style="none")
+    cmds.text(label="Tolerances", align="left", font="boldLabelFont")
+    cmds.separator(height=5, style="in")
+
+    fields = {}
+    for kind in CHANNEL_KINDS:
+        fields[kind] = cmds.floatFieldGrp(
+            label=kind.capitalize(),
+            value1=TOLERANCES[kind],
+            precision=4,
+            columnWidth2=(80, 100),
+            columnAlign=(1, "left")
+        )
+
+    linear_field = cmds.checkBox(label="Linear tangents (exact bound)", value=True)
+
+    def run(*_):
+        tolerances = dict(
+            (kind, cmds.floatFieldGrp(field, query=True, value1=True))
+            for kind, field in fields.items()
+        )
+        curves = get_curves()
+        if not curves:
+            cmds.warning("Select anim curves or animated objects.")
+            return
+        simplify_curves(curves, tolerances, linear_tangents=cmds.checkBox(linear_field, query=True, value=True))
+
+    cmds.separator(height=10, style="none")
+    cmds.button(label="Simplify Selected", height=40, command=run)
+    cmds.separator(height=10, style="none")
+
+    cmds.showWindow(window)
+
+
+if __name__ == "__main__":
+    show_ui()
@@ -1,4 +1,56 @@
+import csv
+import json
+import math
+import os
+import time
+from contextlib import contextmanager
+
 import maya.cmds as cmds
+import maya.api.OpenMaya as om
+import maya.api.OpenMayaAnim as oma
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import Curve_Simplify
+except ImportError:
+    Curve_Simplify = None
+
+
+BAKE_MODES = ["fast", "safe", "adaptive"]
+
+ROTATE_ORDERS = ["xyz", "yzx", "zxy", "xzy", "yxz", "zyx"]
+
+TRANSLATE_ATTRS = ["translateX", "translateY", "translateZ"]
+ROTATE_ATTRS = ["rotateX", "rotateY", "rotateZ"]
+SCALE_ATTRS = ["scaleX", "scaleY", "scaleZ"]
+TRANSFORM_ATTRS = TRANSLATE_ATTRS + ROTATE_ATTRS + SCALE_ATTRS
+
+# Progress is reported at most every PROGRESS_INTERVAL seconds or PROGRESS_STEP percent
+PROGRESS_INTERVAL = 0.25
+PROGRESS_STEP = 5
+
+# Adaptive mode drops keys that stay within this distance (scene units, degrees or scale)
+ADAPTIVE_TOLERANCE = 0.001
+
+# Upstream nodes whose motion can't be traced to anim curves; adaptive mode samples every frame for these
+ADAPTIVE_DENSE_TYPES = ["expression", "cacheFile", "AlembicNode", "gpuCache", "mocapServo",
+                        "constraint", "ikHandle", "ikEffector", "motionPath"]
+
+# Adaptive keys are checked against a dense sample every ADAPTIVE_CHECK_STEP frames
+ADAPTIVE_CHECK_STEP = 4
+
+TIME_ANIM_CURVE_TYPES = ["animCurveTL", "animCurveTA", "animCurveTU", "animCurveTT"]
+
+# (mode, redraw) runs compared by benchmark_bake
+BENCHMARK_RUNS = [("fast", False), ("adaptive", False), ("safe", False), ("safe", True)]
+
+# Timing of every bake run in this session, see print_bake_timings()
+BAKE_TIMINGS = []
+
 
 def create_ui():
     """Create the baking tool UI with improved spacing"""
@@ -6,7 +58,7 @@ def create_ui():
         cmds.deleteUI("bakeWin")
     
     # Create main window with margins
-    window = cmds.window("bakeWin", title="Force Baking Tool", width=420, height=320)
+    window = cmds.window("bakeWin", title="Force Baking Tool", width=420, height=520)
     main_layout = cmds.columnLayout(
         adjustableColumn=True, 
         rowSpacing=5,
@@ -67,12 +119,64 @@ def create_ui():
     cmds.button(label="Get Range", command=lambda _: set_time_range(start_field, end_field))
     cmds.setParent("..")
     
+    # Bake mode: fast samples matrices without moving the timeline, safe steps frame by frame,
+    # adaptive only keys frames where the parent changes
+    cmds.separator(height=5, style="none")
+    cmds.radioButtonGrp(
+        "modeField",
+        label="Mode:",
+        labelArray3=["Fast", "Safe", "Adaptive"],
+        numberOfRadioButtons=3,
+        select=1,
+        columnWidth4=(80, 100, 100, 100),
+        columnAlign=(1, "left")
+    )
+    cmds.floatFieldGrp(
+        "toleranceField",
+        label="Adaptive Tolerance:",
+        value1=ADAPTIVE_TOLERANCE,
+        precision=4,
+        columnWidth2=(120, 80),
+        columnAlign=(1, "left")
+    )
+    
+    # Pausing the viewport keeps heavy scenes from redrawing while the bake runs
+    cmds.checkBox("suspendField", label="Suspend viewport while baking", value=True)
+    cmds.checkBox(
+        "simplifyField",
+        label="Simplify curves after baking",
+        value=False,
+        enable=Curve_Simplify is not None
+    )
+    
     # Add vertical space before bake button
     cmds.separator(height=15, style="none")
     
 	# Bake button
     bake_button = cmds.button(label="Bake", height=40, command=lambda _: bake_animation())
 
+    # Add vertical space between sections
+    cmds.separator(height=15, style="none")
+    
+    # Batch section: many parent/child pairs baked in one pass over the range
+    cmds.text(label="Batch Pairs (parent > child)", align="left", font="boldLabelFont")
+    cmds.separator(height=5, style="in")
+    
+    cmds.textScrollList("pairList", height=100, allowMultiSelection=True)
+    
+    cmds.rowLayout(
+        numberOfColumns=4,
+        columnWidth4=(100, 100, 100, 100),
+        columnAttach=[(1, "both", 2), (2, "both", 2), (3, "both", 2), (4, "both", 2)]
+    )
+    cmds.button(label="Add Selected", command=lambda _: add_selected_pair())
+    cmds.button(label="Load File", command=lambda _: load_pairs_from_dialog())
+    cmds.button(label="Remove", command=lambda _: remove_selected_pairs())
+    cmds.button(label="Clear", command=lambda _: cmds.textScrollList("pairList", edit=True, removeAll=True))
+    cmds.setParent("..")
+    
+    cmds.button(label="Bake All Pairs", height=40, command=lambda _: bake_batch())
+
     # Add vertical space before status
     cmds.separator(height=10, style="none")
     
@@ -100,34 +204,366 @@ def set_time_range(start_field, end_field):
     update_status("Set frame range to {0}-{1}".format(int(start), int(end)))
 
 def update_status(message):
-    """Update the status field with a message"""
+    """Update the status field with a message, or print it when running without the UI"""
+    if not cmds.textField("statusField", exists=True):
+        print(message)
+        return
     cmds.textField("statusField", edit=True, text=message)
 
-def bake_animation():
-    """Bake animation from parent to child"""
-    # Get values from UI
-    parent_name = cmds.textField("parentField", query=True, text=True)
-    child_name = cmds.textField("childField", query=True, text=True)
-    start_frame = cmds.intField("startField", query=True, value=True)
-    end_frame = cmds.intField("endField", query=True, value=True)
-    
-    # Validate inputs
-    if not parent_name or not child_name:
-        update_status("Error: Please select parent and child objects")
+PAIR_SEPARATOR = " > "
+
+def add_selected_pair():
+    """Add a pair from the selection: first selected is parent, second is child"""
+    selection = cmds.ls(selection=True)
+    if len(selection) != 2:
+        update_status("Error: Select a parent then a child")
         return
-    
-    if not cmds.objExists(child_name):
-        update_status("Error: Child object does not exist")
+    cmds.textScrollList("pairList", edit=True, append=PAIR_SEPARATOR.join(selection))
+    update_status("Added pair: {0} > {1}".format(selection[0], selection[1]))
+
+def remove_selected_pairs():
+    """Remove highlighted pairs from the batch list"""
+    selected = cmds.textScrollList("pairList", query=True, selectItem=True) or []
+    for item in selected:
+        cmds.textScrollList("pairList", edit=True, removeItem=item)
+
+def load_pairs_from_dialog():
+    """Pick a JSON or CSV mapping file and add its pairs to the batch list"""
+    filepath = cmds.fileDialog2(
+        fileMode=1,
+        caption="Load Bake Pairs",
+        fileFilter="Pair Files (*.json *.csv);;All Files (*.*)"
+    )
+    if not filepath:
         return
-    
-    if not cmds.objExists(parent_name):
-        update_status("Error: Parent object does not exist")
+
+    try:
+        pairs = load_bake_pairs(filepath[0])
+    except Exception as e:
+        update_status("Error: " + str(e))
         return
-    
-    if start_frame >= end_frame:
-        update_status("Error: Invalid frame range")
+
+    for parent_name, child_name in pairs:
+        cmds.textScrollList("pairList", edit=True, append=parent_name + PAIR_SEPARATOR + child_name)
+    update_status("Loaded {0} pairs".format(len(pairs)))
+
+def load_bake_pairs(filepath):
+    """
+    Read (parent, child) pairs from a JSON or CSV file.
+
+    JSON may be a list of [parent, child] lists, a list of
+    {"parent": ..., "child": ...} objects, or a {child: parent} dict.
+    CSV rows are parent,child; a header row naming those columns is skipped.
+    """
+    pairs = []
+
+    if os.path.splitext(filepath)[1].lower() == ".csv":
+        with open(filepath, "r", newline="") as f:
+            for row in csv.reader(f):
+                row = [cell.strip() for cell in row]
+                if len(row) < 2 or not row[0] or row[0].startswith("#"):
+                    continue
+                if row[0].lower() == "parent" and row[1].lower() == "child":
+                    continue
+                pairs.append((row[0], row[1]))
+        return pairs
+
+    with open(filepath, "r") as f:
+        data = json.load(f)
+
+    if isinstance(data, dict):
+        return [(parent_name, child_name) for child_name, parent_name in data.items()]
+
+    for entry in data:
+        if isinstance(entry, dict):
+            pairs.append((entry["parent"], entry["child"]))
+        else:
+            pairs.append((entry[0], entry[1]))
+    return pairs
+
+def get_batch_pairs():
+    """Return the (parent, child) pairs listed in the batch UI"""
+    items = cmds.textScrollList("pairList", query=True, allItems=True) or []
+    return [tuple(item.split(PAIR_SEPARATOR, 1)) for item in items]
+
+def get_bake_mode():
+    """Return the bake mode selected in the UI"""
+    if not cmds.radioButtonGrp("modeField", exists=True):
+        return BAKE_MODES[0]
+    index = cmds.radioButtonGrp("modeField", query=True, select=True)
+    return BAKE_MODES[max(index, 1) - 1]
+
+def get_adaptive_tolerance():
+    """Return the adaptive tolerance set in the UI"""
+    if not cmds.floatFieldGrp("toleranceField", exists=True):
+        return ADAPTIVE_TOLERANCE
+    return max(cmds.floatFieldGrp("toleranceField", query=True, value1=True), 0.0)
+
+def get_simplify():
+    """Return whether the UI asks for a curve simplification pass after the bake"""
+    if not cmds.checkBox("simplifyField", exists=True):
+        return False
+    return cmds.checkBox("simplifyField", query=True, value=True)
+
+def get_suspend_viewport():
+    """Return whether the UI asks for the viewport to be suspended"""
+    if not cmds.checkBox("suspendField", exists=True):
+        return True
+    return cmds.checkBox("suspendField", query=True, value=True)
+
+class ProgressReporter(object):
+    """
+    Throttled progress reporting for long loops.
+
+    update() is cheap to call every iteration; the callback only fires
+    when `interval` seconds have passed or progress moved `step` percent.
+    """
+
+    def __init__(self, total, label="Baking", interval=PROGRESS_INTERVAL, step=PROGRESS_STEP, callback=None):
+        self.total = max(total, 1)
+        self.label = label
+        self.interval = interval
+        self.step = step
+        self.callback = callback or update_status
+        self.last_time = time.perf_counter()
+        self.last_percent = -step
+        self.reports = 0
+
+    def update(self, done, frame=None):
+        """Report progress if the time or percentage threshold was crossed"""
+        percent = int(done * 100 / self.total)
+        now = time.perf_counter()
+
+        if now - self.last_time < self.interval and percent - self.last_percent < self.step:
+            return
+
+        self.last_time = now
+        self.last_percent = percent
+        self.reports += 1
+
+        if frame is None:
+            self.callback("{0}... {1}%".format(self.label, percent))
+        else:
+            self.callback("{0}... {1}% (Frame {2})".format(self.label, percent, frame))
+
+@contextmanager
+def suspend_viewport(enabled=True):
+    """
+    Pause viewport evaluation and redraw for the duration of the block.
+
+    Uses the ogs pause toggle, falling back to refresh(suspend=True). The
+    previous state is always restored, even if the bake fails.
+    """
+    if not enabled or cmds.about(batch=True):
+        yield
         return
-    
+
+    paused_with_ogs = False
+    suspended = False
+
+    try:
+        try:
+            if not cmds.ogs(query=True, pause=True):
+                cmds.ogs(pause=True)
+                paused_with_ogs = True
+        except RuntimeError:
+            cmds.refresh(suspend=True)
+            suspended = True
+
+        yield
+
+    finally:
+        if paused_with_ogs and cmds.ogs(query=True, pause=True):
+            cmds.ogs(pause=True)
+        if suspended:
+            cmds.refresh(suspend=False)
+        if paused_with_ogs or suspended:
+            cmds.refresh(force=True)
+
+def get_plug(attribute):
+    """Return an MPlug for a node.attribute string"""
+    selection = om.MSelectionList()
+    selection.add(attribute)
+    return selection.getPlug(0)
+
+def sample_matrices(plugs, frames, progress=None):
+    """
+    Sample matrix plugs over a list of frames without moving the timeline.
+
+    Every plug is evaluated in the same DG context per frame, so several
+    matrices cost one pass over the range. Returns an array shaped
+    (plug, frame, 4, 4).
+    """
+    unit = om.MTime.uiUnit()
+    samples = np.empty((len(plugs), len(frames), 16))
+
+    for frame_index, frame in enumerate(frames):
+        context = om.MDGContext(om.MTime(frame, unit))
+        for plug_index, plug in enumerate(plugs):
+            data = om.MFnMatrixData(plug.asMObject(context))
+            samples[plug_index, frame_index] = tuple(data.matrix())
+
+        if progress:
+            progress.update(frame_index + 1, frame)
+
+    return samples.reshape(len(plugs), len(frames), 4, 4)
+
+def axis_rotation_matrices(angles, axis):
+    """Build row-vector rotation matrices around one axis (radians)"""
+    cos = np.cos(angles)
+    sin = np.sin(angles)
+    second = (axis + 1) % 3
+    third = (axis + 2) % 3
+
+    matrices = np.zeros(angles.shape + (3, 3))
+    matrices[..., axis, axis] = 1.0
+    matrices[..., second, second] = cos
+    matrices[..., third, third] = cos
+    matrices[..., second, third] = sin
+    matrices[..., third, second] = -sin
+    return matrices
+
+def euler_to_matrix(rotations, rotate_order="xyz"):
+    """Convert (..., 3) euler angles in radians to Maya row-vector rotation matrices"""
+    matrices = np.broadcast_to(np.eye(3), rotations.shape[:-1] + (3, 3))
+    for axis_name in rotate_order:
+        axis = "xyz".index(axis_name)
+        matrices = matrices @ axis_rotation_matrices(rotations[..., axis], axis)
+    return matrices
+
+def matrix_to_euler(matrices, rotate_order="xyz"):
+    """
+    Extract euler angles in radians from (..., 3, 3) rotation matrices.
+
+    Works for all six Maya rotation orders; gimbal-locked frames put the
+    whole rotation on the last axis.
+    """
+    first, second, third = ["xyz".index(axis_name) for axis_name in rotate_order]
+    parity = 1.0 if (second - first) % 3 == 1 else -1.0
+    column = np.swapaxes(matrices, -1, -2)
+
+    rotations = np.zeros(matrices.shape[:-2] + (3,))
+    sine = np.clip(-parity * column[..., third, first], -1.0, 1.0)
+    locked = np.abs(sine) > 1.0 - 1e-9
+
+    rotations[..., second] = np.arcsin(sine)
+    rotations[..., first] = np.where(
+        locked, 0.0, np.arctan2(parity * column[..., third, second], column[..., third, third])
+    )
+    rotations[..., third] = np.where(
+        locked,
+        np.arctan2(-parity * column[..., first, second], column[..., second, second]),
+        np.arctan2(parity * column[..., second, first], column[..., first, first])
+    )
+    return rotations
+
+def euler_filter(rotations, rotate_order="xyz"):
+    """
+    Remove euler flips from a (frame, 3) rotation array in radians.
+
+    Each frame picks whichever of the two equivalent euler solutions is
+    closest to the previous frame, then unwraps it by whole turns.
+    """
+    first, second, third = ["xyz".index(axis_name) for axis_name in rotate_order]
+    alternate = rotations.copy()
+    alternate[:, first] += math.pi
+    alternate[:, second] = math.pi - rotations[:, second]
+    alternate[:, third] += math.pi
+
+    filtered = rotations.copy()
+    turn = 2.0 * math.pi
+    for frame_index in range(1, len(rotations)):
+        previous = filtered[frame_index - 1]
+        best = None
+        for candidate in (rotations[frame_index], alternate[frame_index]):
+            candidate = candidate - turn * np.round((candidate - previous) / turn)
+            error = np.abs(candidate - previous).sum()
+            if best is None or error < best[0]:
+                best = (error, candidate)
+        filtered[frame_index] = best[1]
+
+    return filtered
+
+def decompose_matrices(matrices, rotate_order="xyz", rotate_axis=None, joint_orient=None):
+    """
+    Decompose (frame, 4, 4) local matrices into translate, rotate and scale arrays.
+
+    Rotation is returned in radians with rotate axis and joint orient removed,
+    ready to be written to the rotate channels.
+    """
+    translate = matrices[:, 3, :3].copy()
+    upper = matrices[:, :3, :3]
+
+    scale = np.linalg.norm(upper, axis=2)
+    scale = np.where(scale < 1e-12, 1e-12, scale)
+    flipped = np.linalg.det(upper) < 0.0
+    scale[flipped, 0] *= -1.0
+    rotation = upper / scale[:, :, None]
+
+    # Maya joints compose as rotateAxis * rotate * jointOrient
+    if rotate_axis is not None:
+        rotation = euler_to_matrix(np.asarray(rotate_axis)).T @ rotation
+    if joint_orient is not None:
+        rotation = rotation @ euler_to_matrix(np.asarray(joint_orient)).T
+
+    rotate = euler_filter(matrix_to_euler(rotation, rotate_order), rotate_order)
+    return translate, rotate, scale
+
+def get_curve_type(attribute):
+    """Return the MFnAnimCurve type a transform channel is keyed with"""
+    if attribute in TRANSLATE_ATTRS:
+        return oma.MFnAnimCurve.kAnimCurveTL
+    if attribute in ROTATE_ATTRS:
+        return oma.MFnAnimCurve.kAnimCurveTA
+    return oma.MFnAnimCurve.kAnimCurveTU
+
+def write_curve_keys(node, attribute, frames, values, tangent=None):
+    """
+    Write all keys of one channel with one copyKey and one pasteKey call.
+
+    The keys (internal units) are built with a single addKeys call on a
+    temporary curve outside the undo queue; pasteKey replaces the range on
+    the channel through the undo queue, so the bake undoes like safe mode.
+    """
+    if tangent is None:
+        tangent = oma.MFnAnimCurve.kTangentGlobal
+
+    unit = om.MTime.uiUnit()
+    temp_fn = oma.MFnAnimCurve()
+    temp_curve = temp_fn.create(get_curve_type(attribute))
+
+    try:
+        temp_fn.addKeys(
+            om.MTimeArray([om.MTime(frame, unit) for frame in frames]),
+            om.MDoubleArray(values),
+            tangent,
+            tangent,
+            True
+        )
+        cmds.copyKey(om.MFnDependencyNode(temp_curve).name())
+        cmds.pasteKey(node, attribute=attribute, time=(frames[0],), option="replace")
+    finally:
+        modifier = om.MDGModifier()
+        modifier.deleteNode(temp_curve)
+        modifier.doIt()
+
+def has_pivot_offsets(node):
+    """Return True if a transform has pivots that the fast decomposition ignores"""
+    for attr in ["rotatePivot", "scalePivot", "rotatePivotTranslate", "scalePivotTranslate"]:
+        if cmds.attributeQuery(attr, node=node, exists=True):
+            if any(abs(value) > 1e-6 for value in cmds.getAttr(node + "." + attr)[0]):
+                return True
+    return False
+
+def bake_safe(pairs, start_frame, end_frame, redraw=False, progress=None):
+    """
+    Bake by stepping the timeline once, matching every pair with xform and keying each frame.
+
+    redraw=True refreshes the viewport on every frame like the original
+    tool did; it is kept for visual checks and timing comparisons.
+    """
+    progress = progress or ProgressReporter(end_frame - start_frame + 1)
+
     # Store current time
     current_time = cmds.currentTime(query=True)
     
@@ -136,30 +572,456 @@ def bake_animation():
         for frame in range(int(start_frame), int(end_frame) + 1):
             cmds.currentTime(frame)
             
-            # Get parent's world matrix
-            parent_matrix = cmds.xform(parent_name, query=True, matrix=True, worldSpace=True)
-            
-            # Set child's world matrix to match parent
-            cmds.xform(child_name, matrix=parent_matrix, worldSpace=True)
-            
-            # Set keyframes for all transform attributes
-            cmds.setKeyframe(child_name, attribute=["translateX", "translateY", "translateZ"])
-            cmds.setKeyframe(child_name, attribute=["rotateX", "rotateY", "rotateZ"])
-            cmds.setKeyframe(child_name, attribute=["scaleX", "scaleY", "scaleZ"])
+            for parent_name, child_name in pairs:
+                # Get parent's world matrix
+                parent_matrix = cmds.xform(parent_name, query=True, matrix=True, worldSpace=True)
+                
+                # Set child's world matrix to match parent
+                cmds.xform(child_name, matrix=parent_matrix, worldSpace=True)
+                
+                # Set keyframes for all transform attributes
+                cmds.setKeyframe(child_name, attribute=["translateX", "translateY", "translateZ"])
+                cmds.setKeyframe(child_name, attribute=["rotateX", "rotateY", "rotateZ"])
+                cmds.setKeyframe(child_name, attribute=["scaleX", "scaleY", "scaleZ"])
             
             # Update progress
-            progress = int((frame - start_frame) / (end_frame - start_frame) * 100)
-            update_status("Baking... {0}% (Frame {1})".format(progress, frame))
-            cmds.refresh()
+            progress.update(frame - start_frame + 1, frame)
+            if redraw:
+                cmds.refresh()
         
-        update_status("Success! Baked {0} frames".format(end_frame - start_frame + 1))
+    finally:
+        # Restore original time
+        cmds.currentTime(current_time)
+
+def get_joint_offsets(child_name):
+    """Return the child's rotate order, rotate axis and joint orient (radians)"""
+    rotate_order = ROTATE_ORDERS[cmds.getAttr(child_name + ".rotateOrder")]
+    rotate_axis = [math.radians(value) for value in cmds.getAttr(child_name + ".rotateAxis")[0]]
+    joint_orient = None
+    if cmds.objectType(child_name, isAType="joint"):
+        joint_orient = [math.radians(value) for value in cmds.getAttr(child_name + ".jointOrient")[0]]
+    return rotate_order, rotate_axis, joint_orient
+
+def bake_fast(pairs, start_frame, end_frame, progress=None):
+    """
+    Bake by sampling matrices for the whole range and writing each curve once.
+
+    The timeline never moves: every parent's world matrix and every child's
+    parent inverse matrix are evaluated together per frame through a DG
+    context, so N pairs still cost one pass over the range. Matrices are
+    decomposed in NumPy and the keys of all children are written at the end
+    with one pasteKey call per channel, so the bake is undoable.
+
+    Children are sampled before any keys are written, so a child should not
+    also drive another pair in the same batch.
+    """
+    frames = list(range(int(start_frame), int(end_frame) + 1))
+
+    plugs = []
+    for parent_name, child_name in pairs:
+        plugs.append(get_plug(parent_name + ".worldMatrix[0]"))
+        plugs.append(get_plug(child_name + ".parentInverseMatrix[0]"))
+
+    samples = sample_matrices(plugs, frames, progress or ProgressReporter(len(frames), "Sampling"))
+
+    baked = []
+    for index, (parent_name, child_name) in enumerate(pairs):
+        local = samples[index * 2] @ samples[index * 2 + 1]
+        translate, rotate, scale = decompose_matrices(local, *get_joint_offsets(child_name))
+        baked.append((child_name, np.concatenate([translate, rotate, scale], axis=1)))
+
+    # Clear existing keys in the range so the new keys replace them
+    children = [child_name for child_name, _ in baked]
+    cmds.cutKey(children, attribute=TRANSFORM_ATTRS, time=(start_frame, end_frame), option="keys", clear=True)
+
+    for child_name, channels in baked:
+        for index, attr in enumerate(TRANSFORM_ATTRS):
+            write_curve_keys(child_name, attr, frames, channels[:, index].tolist())
+
+    return len(frames) * len(TRANSFORM_ATTRS) * len(pairs)
+
+def get_dag_ancestors(node):
+    """Return all DAG parents of a node, nearest first"""
+    ancestors = []
+    parent = cmds.listRelatives(node, parent=True, fullPath=True)
+    while parent:
+        ancestors.append(parent[0])
+        parent = cmds.listRelatives(parent[0], parent=True, fullPath=True)
+    return ancestors
+
+def get_ik_joints():
+    """Return the long names of every joint solved by an IK handle"""
+    joints = set()
+    for handle in cmds.ls(type="ikHandle") or []:
+        joints.update(cmds.ls(cmds.ikHandle(handle, query=True, jointList=True) or [], long=True))
+    return joints
+
+def get_upstream_curves(parent_name, child_name):
+    """
+    Return the time-based anim curves driving a pair, or None if unknown.
+
+    Covers the parent, its DAG ancestors and the child's DAG ancestors.
+    None means something upstream moves them without curves of its own
+    (expressions, caches, constraints, IK) and every frame has to be
+    sampled. IK handles are not in the history of the joints they solve,
+    so those joints are looked up separately.
+    """
+    nodes = [parent_name] + get_dag_ancestors(parent_name) + get_dag_ancestors(child_name)
+
+    if get_ik_joints().intersection(cmds.ls(nodes, long=True)):
+        return None
+
+    history = cmds.listHistory(nodes) or []
+
+    if cmds.ls(history, type=ADAPTIVE_DENSE_TYPES):
+        return None
+
+    return cmds.ls(history, type=TIME_ANIM_CURVE_TYPES) or []
+
+def get_constant_intervals(curve):
+    """
+    Return (times, flat) for one anim curve.
+
+    flat[i] is True when the curve holds its value between key i and key
+    i + 1: equal values with flat or stepped tangents. Two extra entries
+    cover pre and post infinity.
+    """
+    times = np.array(cmds.keyframe(curve, query=True, timeChange=True) or [])
+    values = np.array(cmds.keyframe(curve, query=True, valueChange=True) or [])
+
+    if len(times) < 2:
+        flat = np.ones(len(times) + 1, dtype=bool)
+    else:
+        out_angles = np.array(cmds.keyTangent(curve, query=True, outAngle=True))
+        in_angles = np.array(cmds.keyTangent(curve, query=True, inAngle=True))
+        out_types = cmds.keyTangent(curve, query=True, outTangentType=True)
+
+        stepped = np.array([tangent_type in ("step", "stepnext") for tangent_type in out_types])
+        same_value = np.abs(np.diff(values)) < 1e-9
+        flat_tangents = (np.abs(out_angles[:-1]) < 1e-6) & (np.abs(in_angles[1:]) < 1e-6)
+        flat = np.concatenate([[True], same_value & (flat_tangents | stepped[:-1]), [True]])
+
+    # Anything but constant infinity keeps changing outside the keyed range
+    flat[0] = flat[0] and cmds.getAttr(curve + ".preInfinity") == 0
+    flat[-1] = flat[-1] and cmds.getAttr(curve + ".postInfinity") == 0
+    return times, flat
+
+def get_adaptive_frames(parent_name, child_name, start_frame, end_frame):
+    """
+    Return the frames worth sampling for a pair.
+
+    The union of upstream key times splits the range into segments. A
+    segment where every upstream curve holds still only needs its two end
+    frames; every other segment is sampled on each integer frame.
+    """
+    dense = [float(frame) for frame in range(int(start_frame), int(end_frame) + 1)]
+    curves = get_upstream_curves(parent_name, child_name)
+
+    if curves is None:
+        return dense
+    if not curves:
+        return [float(start_frame), float(end_frame)]
+
+    curve_data = [get_constant_intervals(curve) for curve in curves]
+
+    key_times = np.unique(np.concatenate([times for times, _ in curve_data] + [[start_frame, end_frame]]).astype(float))
+    key_times = key_times[(key_times >= start_frame) & (key_times <= end_frame)]
+
+    middles = (key_times[:-1] + key_times[1:]) * 0.5
+    constant = np.ones(len(middles), dtype=bool)
+    for times, flat in curve_data:
+        constant &= flat[np.searchsorted(times, middles)]
+
+    frames = set(key_times.tolist())
+    for segment_start, segment_end in zip(key_times[:-1][~constant], key_times[1:][~constant]):
+        frames.update(dense[int(math.ceil(segment_start - start_frame)):int(math.floor(segment_end - start_frame)) + 1])
+
+    return sorted(frames)
+
+def reduce_held_keys(values, tolerance):
+    """
+    Return indices of the samples needed to reproduce a channel with linear keys.
+
+    Runs of samples that stay within tolerance of the run's first value
+    collapse to their first and last sample; every moving sample is kept.
+    """
+    keep = [0]
+    anchor = values[0]
+
+    for index in range(1, len(values)):
+        if abs(values[index] - anchor) > tolerance:
+            if keep[-1] != index - 1:
+                keep.append(index - 1)
+            keep.append(index)
+            anchor = values[index]
+
+    if keep[-1] != len(values) - 1:
+        keep.append(len(values) - 1)
+
+    return keep
+
+def sample_local_matrices(pairs, frames, progress=None):
+    """Return each parent's world matrix in its child's parent space, shaped (pair, frame, 4, 4)"""
+    plugs = []
+    for parent_name, child_name in pairs:
+        plugs.append(get_plug(parent_name + ".worldMatrix[0]"))
+        plugs.append(get_plug(child_name + ".parentInverseMatrix[0]"))
+
+    samples = sample_matrices(plugs, frames, progress or ProgressReporter(len(frames), "Sampling"))
+    return samples[0::2] @ samples[1::2]
+
+def bake_adaptive(pairs, start_frame, end_frame, tolerance=ADAPTIVE_TOLERANCE, progress=None):
+    """
+    Bake only the frames where the parent actually changes.
+
+    Frames are chosen from the upstream anim curves of each pair and
+    sampled in one shared pass like the fast engine, together with a
+    coarse check every ADAPTIVE_CHECK_STEP frames. A pair whose keys miss
+    a check sample by more than the tolerance is sampled on every frame
+    instead. Each channel then drops keys that stay within tolerance.
+    Keys are linear so held stretches are exact. Returns the number of
+    keys written.
+    """
+    pair_frames = [get_adaptive_frames(parent_name, child_name, start_frame, end_frame) for parent_name, child_name in pairs]
+    dense = [float(frame) for frame in range(int(start_frame), int(end_frame) + 1)]
+    check_frames = set(dense[::ADAPTIVE_CHECK_STEP] + [dense[-1]])
+
+    frames = sorted(check_frames.union(*pair_frames))
+    frame_index = dict((frame, index) for index, frame in enumerate(frames))
+    samples = sample_local_matrices(pairs, frames, progress)
+
+    # Rotation channels are radians internally, the tolerance is given in degrees
+    tolerances = [tolerance] * 3 + [math.radians(tolerance)] * 3 + [tolerance] * 3
+
+    baked = []
+    missed = []
+    for index, (parent_name, child_name) in enumerate(pairs):
+        checked = sorted(check_frames.union(pair_frames[index]))
+        translate, rotate, scale = decompose_matrices(
+            samples[index][[frame_index[frame] for frame in checked]], *get_joint_offsets(child_name)
+        )
+        channels = np.concatenate([translate, rotate, scale], axis=1)
+
+        # Linear keys on the chosen frames must reproduce every check sample
+        keyed = np.searchsorted(checked, pair_frames[index])
+        error = max(
+            np.abs(np.interp(checked, pair_frames[index], channels[keyed, column]) - channels[:, column]).max()
+            - tolerances[column]
+            for column in range(len(TRANSFORM_ATTRS))
+        )
+        if error > 0.0:
+            missed.append(index)
+            continue
+
+        baked.append((child_name, pair_frames[index], channels[keyed]))
+
+    if missed:
+        missed_pairs = [pairs[index] for index in missed]
+        print("Adaptive bake missed motion on {0}, sampling every frame.".format(
+            ", ".join(child_name for _, child_name in missed_pairs)
+        ))
+
+        samples = sample_local_matrices(missed_pairs, dense)
+        for index, (parent_name, child_name) in enumerate(missed_pairs):
+            translate, rotate, scale = decompose_matrices(samples[index], *get_joint_offsets(child_name))
+            baked.append((child_name, dense, np.concatenate([translate, rotate, scale], axis=1)))
+
+    children = [child_name for child_name, _, _ in baked]
+    cmds.cutKey(children, attribute=TRANSFORM_ATTRS, time=(start_frame, end_frame), option="keys", clear=True)
+
+    key_count = 0
+
+    for child_name, child_frames, channels in baked:
+        for index, attr in enumerate(TRANSFORM_ATTRS):
+            keep = reduce_held_keys(channels[:, index], tolerances[index])
+            write_curve_keys(
+                child_name,
+                attr,
+                [child_frames[row] for row in keep],
+                channels[keep, index].tolist(),
+                oma.MFnAnimCurve.kTangentLinear
+            )
+            key_count += len(keep)
+
+    return key_count
+
+def validate_pair(parent_name, child_name):
+    """Return an error message for an invalid pair, or None"""
+    if not parent_name or not child_name:
+        return "Please select parent and child objects"
+    
+    if not cmds.objExists(child_name):
+        return "Child object does not exist: " + child_name
+    
+    if not cmds.objExists(parent_name):
+        return "Parent object does not exist: " + parent_name
+    
+    return None
+
+def bake_animation(mode=None):
+    """Bake animation from parent to child"""
+    # Get values from UI
+    parent_name = cmds.textField("parentField", query=True, text=True)
+    child_name = cmds.textField("childField", query=True, text=True)
+    
+    bake_pairs_from_ui([(parent_name, child_name)], mode)
+
+def bake_batch(mode=None):
+    """Bake every pair listed in the batch UI in one pass"""
+    pairs = get_batch_pairs()
+    if not pairs:
+        update_status("Error: No pairs in the batch list")
+        return
+    
+    bake_pairs_from_ui(pairs, mode)
+
+def bake_pairs_from_ui(pairs, mode=None):
+    """Validate pairs against the UI frame range and bake them"""
+    start_frame = cmds.intField("startField", query=True, value=True)
+    end_frame = cmds.intField("endField", query=True, value=True)
+    mode = mode or get_bake_mode()
+    suspend = get_suspend_viewport()
+    tolerance = get_adaptive_tolerance()
+    simplify = get_simplify()
+    
+    # Validate inputs
+    for parent_name, child_name in pairs:
+        error = validate_pair(parent_name, child_name)
+        if error:
+            update_status("Error: " + error)
+            return
+    
+    if start_frame >= end_frame:
+        update_status("Error: Invalid frame range")
+        return
+    
+    try:
+        run_bake(pairs, start_frame, end_frame, mode, suspend=suspend, tolerance=tolerance, simplify=simplify)
+        timing = BAKE_TIMINGS[-1]
+        if len(pairs) == 1:
+            message = "Success! Baked {0} frames in {1:.2f}s".format(end_frame - start_frame + 1, timing["seconds"])
+        else:
+            message = "Success! Baked {0} pairs over {1} frames in {2:.2f}s".format(
+                len(pairs), end_frame - start_frame + 1, timing["seconds"]
+            )
+        if mode == "adaptive" or simplify:
+            message += ", {0} keys ({1:.0%} of dense)".format(timing["keys"], timing["key_ratio"])
+        update_status(message)
         
     except Exception as e:
         update_status("Error: " + str(e))
-        
+
+def run_bake(pairs, start_frame, end_frame, mode="fast", redraw=False, suspend=True,
+             tolerance=ADAPTIVE_TOLERANCE, simplify=False, simplify_tolerances=None):
+    """
+    Bake (parent, child) pairs over a frame range.
+
+    Pairs the fast and adaptive engines can't match exactly (no NumPy,
+    child pivot offsets) are baked in safe mode. simplify runs
+    Curve_Simplify over the baked range as a final step. The run's timing
+    and key counts are appended to BAKE_TIMINGS. Returns the modes used
+    per child.
+    """
+    sampled_pairs = []
+    safe_pairs = []
+
+    for parent_name, child_name in pairs:
+        if mode == "safe":
+            safe_pairs.append((parent_name, child_name))
+        elif np is None:
+            print("NumPy not available, using safe bake for {0}.".format(child_name))
+            safe_pairs.append((parent_name, child_name))
+        elif has_pivot_offsets(child_name):
+            print("{0} has pivot offsets, using safe bake.".format(child_name))
+            safe_pairs.append((parent_name, child_name))
+        else:
+            sampled_pairs.append((parent_name, child_name))
+
+    start = time.perf_counter()
+    key_count = 0
+
+    # One undo step for the whole bake, whichever engines ran
+    cmds.undoInfo(openChunk=True, chunkName="forceBake")
+    try:
+        with suspend_viewport(suspend and not redraw):
+            if sampled_pairs and mode == "adaptive":
+                key_count += bake_adaptive(sampled_pairs, start_frame, end_frame, tolerance)
+            elif sampled_pairs:
+                key_count += bake_fast(sampled_pairs, start_frame, end_frame)
+            if safe_pairs:
+                bake_safe(safe_pairs, start_frame, end_frame, redraw=redraw)
+                key_count += int(end_frame - start_frame + 1) * len(TRANSFORM_ATTRS) * len(safe_pairs)
+
+        if simplify:
+            if Curve_Simplify is None:
+                print("Curve_Simplify not found, skipping simplification.")
+            else:
+                children = [child_name for _, child_name in pairs]
+                curves = cmds.keyframe(children, attribute=TRANSFORM_ATTRS, query=True, name=True) or []
+                _, key_count = Curve_Simplify.simplify_curves(
+                    curves,
+                    simplify_tolerances,
+                    time_range=(start_frame, end_frame)
+                )
     finally:
-        # Restore original time
-        cmds.currentTime(current_time)
+        cmds.undoInfo(closeChunk=True)
+
+    dense_keys = int(end_frame - start_frame + 1) * len(TRANSFORM_ATTRS) * len(pairs)
+
+    BAKE_TIMINGS.append({
+        "mode": mode,
+        "simplify": bool(simplify and Curve_Simplify),
+        "redraw": redraw,
+        "suspend": suspend and not redraw,
+        "pairs": len(pairs),
+        "safe_pairs": len(safe_pairs),
+        "frames": int(end_frame - start_frame + 1),
+        "keys": key_count,
+        "key_ratio": float(key_count) / max(dense_keys, 1),
+        "seconds": time.perf_counter() - start,
+    })
+
+    if mode == "adaptive":
+        print("Adaptive bake: {0} keys instead of {1} ({2:.1%} fewer)".format(
+            key_count, dense_keys, 1.0 - BAKE_TIMINGS[-1]["key_ratio"]
+        ))
+
+    modes = dict((child_name, mode) for _, child_name in sampled_pairs)
+    modes.update((child_name, "safe") for _, child_name in safe_pairs)
+    return modes
+
+def print_bake_timings():
+    """Print every bake run recorded in this session"""
+    for entry in BAKE_TIMINGS:
+        print("{mode:<8} redraw={redraw!s:<5} suspend={suspend!s:<5} pairs={pairs:<3} "
+              "frames={frames:<6} keys={keys:<8} {seconds:.3f}s".format(**entry))
+
+def benchmark_bake(pairs, start_frame, end_frame, runs=None):
+    """
+    Time bake modes, with and without per-frame redraw, on the same pairs and range.
+
+    Each run replaces the keys of the previous one.
+    Example:
+        benchmark_bake([("hand_ctrl", "prop_grp")], 1, 2000)
+    """
+    results = {}
+
+    for mode, redraw in runs or BENCHMARK_RUNS:
+        used_modes = run_bake(pairs, start_frame, end_frame, mode, redraw=redraw)
+        label = mode + ("+redraw" if redraw else "")
+        results[label] = BAKE_TIMINGS[-1]["seconds"]
+
+        print("{0:<12} ({1} pairs, {2} safe): {3:.3f}s, {4} keys".format(
+            label, len(pairs), list(used_modes.values()).count("safe"), results[label], BAKE_TIMINGS[-1]["keys"]
+        ))
+
+    slowest = max(results.values())
+    for label, seconds in results.items():
+        if seconds > 0:
+            print("{0:<12} {1:.1f}x faster than slowest".format(label, slowest / seconds))
+
+    return results
 
-# Create the UI
-create_ui()
\ No newline at end of file
+# Create the UI (skipped under mayapy so the bake functions can be imported headless)
+if not cmds.about(batch=True):
+    create_ui()
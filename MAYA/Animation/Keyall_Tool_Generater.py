@@ -1,5 +1,21 @@
 import maya.cmds as cmds
-import maya.mel as mel
+
+import Keyset_Registry
+
+def prompt_keyset_name(default):
+    """Ask for the key set name, None if cancelled"""
+    result = cmds.promptDialog(
+        title="Key Set Name",
+        message="Name:",
+        text=default,
+        button=["OK", "Cancel"],
+        defaultButton="OK",
+        cancelButton="Cancel",
+        dismissString="Cancel"
+    )
+    if result != "OK":
+        return None
+    return cmds.promptDialog(query=True, text=True).strip() or None
 
 def generate_keyframe_tool():
     """
@@ -10,8 +26,6 @@ def generate_keyframe_tool():
         cmds.warning("Please select at least one object!")
         return
 
-    selected_objects_str = str(selected_objects)
-
     def confirm_selection(*_):
         selected_attrs = []
         select_only_mode = cmds.checkBox(select_only_cb, query=True, value=True)
@@ -32,54 +46,38 @@ def generate_keyframe_tool():
             cmds.warning("No channels selected!")
             return
 
-        if select_only:
-            script_content = f"""
+        name = prompt_keyset_name(selected_objects[0].split("|")[-1].split(":")[-1])
+        if not name:
+            return
 
-def select_stored_objects():
-    stored_objects = {selected_objects_str}
-    if not stored_objects:
-        cmds.warning("No objects stored in the tool!")
-        return
-    cmds.select(stored_objects, replace=True)
-    print("Objects selected.")
+        replacing = name in Keyset_Registry.load_registry(force=True)
+        if replacing:
+            overwrite = cmds.confirmDialog(
+                title="Key Set Exists",
+                message=f"Replace key set '{name}'?",
+                button=["Replace", "Cancel"],
+                defaultButton="Replace",
+                cancelButton="Cancel",
+                dismissString="Cancel"
+            )
+            if overwrite != "Replace":
+                return
+
+        # The set is stored as data; the button only holds a one-line call
+        Keyset_Registry.add_keyset(name, selected_objects, selected_attrs, select_only=select_only)
+
+        # Existing buttons for the name read the new data on their next press
+        if replacing:
+            cmds.confirmDialog(title="Success", message=f"Key set '{name}' updated!", button=["OK"])
+            return
 
-select_stored_objects()
-"""
-            tool_label = "Set"
+        if select_only:
             tool_annotation = "Select only the stored objects"
         else:
-            script_content = f"""
-import maya.cmds as cmds
-
-def add_keyframes_to_objects():
-    selected_objects = {selected_objects_str}
-    attrs_to_key = {selected_attrs}
-    if not selected_objects:
-        cmds.warning("No objects stored in the tool!")
-        return
+            tool_annotation = "Add keyframes to the stored objects"
 
-    for obj in selected_objects:
-        for attr in attrs_to_key:
-            cmds.setKeyframe(obj, attribute=attr)
-
-    cmds.select(selected_objects, replace=True)
-    print("Keyframes added and objects reselected!")
-
-add_keyframes_to_objects()
-"""
-            tool_label = "Keyframe Tool"
-            tool_annotation = "Tool to add keyframes to specific objects"
-
-        current_shelf = mel.eval('tabLayout -q -selectTab $gShelfTopLevel')
-        cmds.shelfButton(
-            label=tool_label,
-            command=script_content,
-            annotation=tool_annotation,
-            image="pythonFamily.png",
-            sourceType="Python",
-            parent=current_shelf
-        )
-        cmds.confirmDialog(title="Success", message=f"{tool_label} added to the shelf!", button=["OK"])
+        Keyset_Registry.add_shelf_button(name, annotation=tool_annotation)
+        cmds.confirmDialog(title="Success", message=f"Key set '{name}' added to the shelf!", button=["OK"])
 
     # UI
     if cmds.window("KeyframeToolWin", exists=True):
@@ -0,0 +1,206 @@
+"""Key sets stored as data, run from one-line shelf buttons.
+
+A key set is a list of objects (UUID plus long name as a fallback) and the
+attributes to key on them, or a plain selection set. All key sets live in one
+JSON file in the user's Maya app dir; it is read the first time a button is
+pressed and again only when the file changes on disk.
+
+Shelf buttons made by Keyall_Tool_Generater just call:
+
+    import Keyset_Registry
+    Keyset_Registry.run("arm_L")
+"""
+
+import json
+import os
+
+import maya.cmds as cmds
+import maya.mel as mel
+
+
+REGISTRY_OPTION = "keysetRegistryFile"
+REGISTRY_FILE = "keysets.json"
+REGISTRY_VERSION = 1
+
+# Parsed registry and the (mtime, size) of the file it came from
+_CACHE = {"path": None, "stamp": None, "keysets": {}}
+
+
+# ------------------------------------------------------------
+# Registry file
+# ------------------------------------------------------------
+
+def get_registry_path():
+    """Return the registry file, from the optionVar or the user app dir"""
+    if cmds.optionVar(exists=REGISTRY_OPTION):
+        return cmds.optionVar(query=REGISTRY_OPTION)
+    return os.path.join(cmds.internalVar(userAppDir=True), REGISTRY_FILE)
+
+
+def set_registry_path(path):
+    """Point every key set button at another registry file (e.g. a shared one)"""
+    cmds.optionVar(stringValue=(REGISTRY_OPTION, path))
+    _CACHE["path"] = None
+
+
+def file_stamp(path):
+    """Return (mtime, size) of a file, or None if it doesn't exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime, stat.st_size
+
+
+def load_registry(force=False):
+    """
+    Return {name: key set} from the registry file.
+
+    The file is parsed once and kept; later calls only stat it, so a button
+    press costs one os.stat unless the file was edited in the meantime.
+    """
+    path = get_registry_path()
+    stamp = file_stamp(path)
+    if not force and path == _CACHE["path"] and stamp == _CACHE["stamp"]:
+        return _CACHE["keysets"]
+
+    keysets = {}
+    if stamp is not None:
+        try:
+            with open(path, "r") as handle:
+                keysets = json.load(handle).get("keysets", {})
+        except (IOError, OSError, ValueError) as error:
+            cmds.warning("Could not read key set registry {0}: {1}".format(path, error))
+
+    _CACHE.update(path=path, stamp=stamp, keysets=keysets)
+    return keysets
+
+
+def save_registry(keysets):
+    """Write all key sets back to the registry file"""
+    path = get_registry_path()
+    folder = os.path.dirname(path)
+    if folder and not os.path.isdir(folder):
+        os.makedirs(folder)
+
+    # Write next to the file and swap, so a half-written registry is never read
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as handle:
+        json.dump({"version": REGISTRY_VERSION, "keysets": keysets}, handle, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+    _CACHE.update(path=path, stamp=file_stamp(path), keysets=keysets)
+
+
+def list_keysets():
+    """Return the names of all stored key sets"""
+    return sorted(load_registry())
+
+
+def get_stored_nodes(objects):
+    """Return [uuid, long name] for each object"""
+    stored = []
+    for obj in objects:
+        uuid = cmds.ls(obj, uuid=True)
+        stored.append([uuid[0] if uuid else "", cmds.ls(obj, long=True)[0]])
+    return stored
+
+
+def add_keyset(name, objects, attrs=None, select_only=False):
+    """Store (or replace) a key set for the given objects"""
+    if not select_only and not attrs:
+        raise ValueError("A key set needs attributes unless it only selects")
+
+    keysets = dict(load_registry(force=True))
+    keysets[name] = {
+        "nodes": get_stored_nodes(objects),
+        "attrs": [] if select_only else list(attrs),
+        "select_only": bool(select_only),
+    }
+    save_registry(keysets)
+    return keysets[name]
+
+
+def remove_keyset(name):
+    """Delete a key set; its shelf buttons will warn when pressed"""
+    keysets = dict(load_registry(force=True))
+    if keysets.pop(name, None) is None:
+        return False
+    save_registry(keysets)
+    return True
+
+
+# ------------------------------------------------------------
+# Running
+# ------------------------------------------------------------
+
+def resolve_stored_nodes(stored):
+    """
+    Return the long names of stored nodes.
+
+    Nodes are found by UUID in one ls call, by name only for UUIDs that no
+    longer exist (deleted and re-imported, new reference...).
+    """
+    # ls with an empty list would return every node in the scene
+    uuids = [uuid for uuid, _ in stored if uuid]
+    nodes = (cmds.ls(uuids, long=True) or []) if uuids else []
+
+    # Counting nodes is not enough: one UUID can match several nodes
+    # (a reference loaded twice) while another matches none
+    found = set(cmds.ls(nodes, uuid=True) or []) if nodes else set()
+    for uuid, name in stored:
+        if uuid and uuid in found:
+            continue
+        matches = cmds.ls(name.split("|")[-1], long=True) or []
+        if matches:
+            if matches[0] not in nodes:
+                nodes.append(matches[0])
+        else:
+            print("Stored object not found: " + name)
+    return nodes
+
+
+def run(name):
+    """Key (or just select) the objects of a key set"""
+    keyset = load_registry().get(name)
+    if keyset is None:
+        cmds.warning("No key set named '{0}' in {1}".format(name, get_registry_path()))
+        return []
+
+    nodes = resolve_stored_nodes(keyset["nodes"])
+    if not nodes:
+        cmds.warning("No objects of key set '{0}' found!".format(name))
+        return []
+
+    if keyset.get("select_only"):
+        cmds.select(nodes, replace=True)
+        print("Objects selected.")
+        return nodes
+
+    # One setKeyframe over every plug
+    cmds.setKeyframe([node + "." + attr for node in nodes for attr in keyset["attrs"]])
+
+    cmds.select(nodes, replace=True)
+    print("Keyframes added and objects reselected!")
+    return nodes
+
+
+def shelf_command(name):
+    """Return the one-line command a shelf button runs for a key set"""
+    return "import Keyset_Registry; Keyset_Registry.run({0!r})".format(name)
+
+
+def add_shelf_button(name, label=None, annotation=None, shelf=None):
+    """Add a button running the key set to the current (or given) shelf"""
+    if shelf is None:
+        shelf = mel.eval("tabLayout -q -selectTab $gShelfTopLevel")
+
+    return cmds.shelfButton(
+        label=label or name,
+        imageOverlayLabel=name[:6],
+        command=shelf_command(name),
+        annotation=annotation or "Key set: " + name,
+        image="pythonFamily.png",
+        sourceType="python",
+        parent=shelf
+    )
@@ -0,0 +1,434 @@
+"""Headless batch runner for Mocap_Setup and Force_Baking_Tool.
+
+Runs the mocap prep and/or the bake over every .ma/.mb scene in a
+directory, spreading the files over a pool of mayapy worker processes.
+Each file gets its own process, so a hung scene is killed by the per-file
+timeout without taking the rest of the batch down.
+
+Run from a shell (the controller itself does not need Maya):
+
+    python Mocap_Batch_Runner.py D:/deliveries/take_03 --prep --workers 4
+    python Mocap_Batch_Runner.py scenes --bake-pairs props.json --timeout 600
+
+Use --fake-maya to dry-run the pool, timeouts and report with a stand-in
+maya.cmds instead of mayapy.
+"""
+
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SCENE_EXTENSIONS = {
+    ".ma": "mayaAscii",
+    ".mb": "mayaBinary",
+}
+
+RESULT_MARKER = "@@BATCH_RESULT@@"
+
+DEFAULT_OUTPUT_FOLDER = "processed"
+
+
+# ------------------------------------------------------------
+# Fake maya.cmds
+# ------------------------------------------------------------
+
+class FakeCmds(types.ModuleType):
+    """
+    Stand-in for maya.cmds that records every call.
+
+    Queries return simple defaults: one root joint, a 1-100 playback range
+    and no keys. Enough to drive the tools end to end without Maya.
+    """
+
+    DEFAULTS = {
+        "about": True,
+        "objExists": True,
+        "currentTime": 1.0,
+        "findKeyframe": 1.0,
+        "getAttr": 0,
+        "listRelatives": [],
+    }
+
+    def __init__(self):
+        super(FakeCmds, self).__init__("maya.cmds")
+        self.calls = []
+
+    def ls(self, *args, **kwargs):
+        self.calls.append(("ls", args, kwargs))
+        if kwargs.get("type") == "joint":
+            return ["|root_jnt"]
+        return []
+
+    def playbackOptions(self, *args, **kwargs):
+        self.calls.append(("playbackOptions", args, kwargs))
+        if kwargs.get("query") or kwargs.get("q"):
+            return 100.0 if kwargs.get("max") else 1.0
+        return None
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        def command(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self.DEFAULTS.get(name)
+
+        return command
+
+
+def install_fake_maya():
+    """Register fake maya, maya.cmds and maya.standalone modules"""
+    fake_cmds = FakeCmds()
+
+    maya = types.ModuleType("maya")
+    standalone = types.ModuleType("maya.standalone")
+    standalone.initialize = lambda *args, **kwargs: None
+    standalone.uninitialize = lambda *args, **kwargs: None
+    api = types.ModuleType("maya.api")
+
+    maya.cmds = fake_cmds
+    maya.standalone = standalone
+    maya.api = api
+
+    sys.modules["maya"] = maya
+    sys.modules["maya.cmds"] = fake_cmds
+    sys.modules["maya.standalone"] = standalone
+    sys.modules["maya.api"] = api
+
+    # The fast bake engine needs the API; fake runs use the safe bake
+    for name in ["OpenMaya", "OpenMayaAnim"]:
+        module = types.ModuleType("maya.api." + name)
+        setattr(api, name, module)
+        sys.modules["maya.api." + name] = module
+
+    return fake_cmds
+
+
+# ------------------------------------------------------------
+# Worker (runs inside mayapy, one scene per process)
+# ------------------------------------------------------------
+
+def process_scene(scene, output, prep=True, root_joint=None, pairs=None,
+                  start_frame=None, end_frame=None, mode="fast", simplify=False,
+                  prep_start=None, rest_frame=None, filter_method=None, lock_feet=False):
+    """Open a scene, run the requested steps and save it to output"""
+    import maya.cmds as cmds
+
+    if SCRIPT_DIR not in sys.path:
+        sys.path.insert(0, SCRIPT_DIR)
+
+    result = {"scene": scene, "output": output, "steps": {}}
+
+    start = time.perf_counter()
+    cmds.file(scene, open=True, force=True, prompt=False)
+    result["steps"]["open"] = time.perf_counter() - start
+
+    if prep:
+        import Mocap_Setup
+
+        start = time.perf_counter()
+        roots = [root_joint] if root_joint else Mocap_Setup.find_root_joints()
+        if not roots:
+            raise RuntimeError("No root joint found")
+
+        joints = Mocap_Setup.run_motion_prep(
+            roots[0],
+            simplify=simplify,
+            start_frame=Mocap_Setup.START_FRAME if prep_start is None else prep_start,
+            rest_frame=Mocap_Setup.REST_FRAME if rest_frame is None else rest_frame,
+            filter_method=filter_method,
+            lock_feet=lock_feet
+        )
+        result["steps"]["prep"] = time.perf_counter() - start
+        result["prep_stages"] = Mocap_Setup.PREP_TIMINGS[-1] if Mocap_Setup.PREP_TIMINGS else {}
+        result["root_joint"] = roots[0]
+        result["joints"] = len(joints or [])
+
+    if pairs:
+        import Force_Baking_Tool
+
+        if start_frame is None:
+            start_frame = cmds.playbackOptions(query=True, min=True)
+        if end_frame is None:
+            end_frame = cmds.playbackOptions(query=True, max=True)
+
+        start = time.perf_counter()
+        modes = Force_Baking_Tool.run_bake(pairs, start_frame, end_frame, mode, simplify=simplify)
+        result["steps"]["bake"] = time.perf_counter() - start
+        result["baked"] = modes
+
+    start = time.perf_counter()
+    output_dir = os.path.dirname(output)
+    if output_dir and not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+    cmds.file(rename=output)
+    cmds.file(save=True, force=True, type=SCENE_EXTENSIONS[os.path.splitext(output)[1].lower()])
+    result["steps"]["save"] = time.perf_counter() - start
+
+    return result
+
+
+def run_worker(args):
+    """Entry point of one worker process; prints a single result line"""
+    if args.fake_maya:
+        install_fake_maya()
+        args.mode = "safe"
+
+    import maya.standalone
+    maya.standalone.initialize(name="python")
+
+    try:
+        pairs = None
+        if args.bake_pairs:
+            if SCRIPT_DIR not in sys.path:
+                sys.path.insert(0, SCRIPT_DIR)
+            import Force_Baking_Tool
+            pairs = Force_Baking_Tool.load_bake_pairs(args.bake_pairs)
+
+        result = process_scene(
+            args.worker,
+            args.output,
+            prep=args.prep,
+            root_joint=args.root,
+            pairs=pairs,
+            start_frame=args.start,
+            end_frame=args.end,
+            mode=args.mode,
+            simplify=args.simplify,
+            prep_start=args.prep_start,
+            rest_frame=args.rest_frame,
+            filter_method=args.filter,
+            lock_feet=args.lock_feet
+        )
+        result["status"] = "ok"
+
+    except Exception as e:
+        result = {"scene": args.worker, "status": "failed", "error": str(e)}
+
+    print(RESULT_MARKER + json.dumps(result))
+    sys.stdout.flush()
+
+    try:
+        maya.standalone.uninitialize()
+    except Exception:
+        pass
+
+    return 0 if result["status"] == "ok" else 1
+
+
+# ------------------------------------------------------------
+# Controller (plain Python, no Maya needed)
+# ------------------------------------------------------------
+
+def find_scenes(directory, recursive=False):
+    """Return every .ma/.mb file in a directory"""
+    pattern = os.path.join(directory, "**" if recursive else "", "*")
+    scenes = [
+        path for path in glob.glob(pattern, recursive=recursive)
+        if os.path.splitext(path)[1].lower() in SCENE_EXTENSIONS
+    ]
+    return sorted(scenes)
+
+
+def find_mayapy():
+    """Guess the mayapy executable from MAYA_LOCATION, falling back to PATH"""
+    location = os.environ.get("MAYA_LOCATION")
+    if location:
+        for name in ["mayapy.exe", "mayapy"]:
+            path = os.path.join(location, "bin", name)
+            if os.path.isfile(path):
+                return path
+    return "mayapy"
+
+
+def build_worker_command(interpreter, scene, output, args):
+    """Build the command line that processes one scene in its own process"""
+    command = [interpreter, os.path.abspath(__file__), "--worker", scene, "--output", output, "--mode", args.mode]
+
+    if args.prep:
+        command.append("--prep")
+    if args.root:
+        command += ["--root", args.root]
+    if args.prep_start is not None:
+        command += ["--prep-start", str(args.prep_start)]
+    if args.rest_frame is not None:
+        command += ["--rest-frame", str(args.rest_frame)]
+    if args.filter:
+        command += ["--filter", args.filter]
+    if args.lock_feet:
+        command.append("--lock-feet")
+    if args.bake_pairs:
+        command += ["--bake-pairs", os.path.abspath(args.bake_pairs)]
+    if args.start is not None:
+        command += ["--start", str(args.start)]
+    if args.end is not None:
+        command += ["--end", str(args.end)]
+    if args.simplify:
+        command.append("--simplify")
+    if args.fake_maya:
+        command.append("--fake-maya")
+
+    return command
+
+
+def run_scene_process(command, scene, timeout):
+    """Run one worker process and turn its outcome into a report entry"""
+    start = time.perf_counter()
+
+    try:
+        completed = subprocess.run(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            timeout=timeout
+        )
+    except subprocess.TimeoutExpired:
+        return {
+            "scene": scene,
+            "status": "timeout",
+            "error": "Timed out after {0}s".format(timeout),
+            "seconds": time.perf_counter() - start,
+        }
+
+    result = None
+    for line in completed.stdout.splitlines():
+        if line.startswith(RESULT_MARKER):
+            result = json.loads(line[len(RESULT_MARKER):])
+
+    if result is None:
+        result = {
+            "scene": scene,
+            "status": "failed",
+            "error": (completed.stderr or completed.stdout or "No result from worker").strip()[-2000:],
+        }
+
+    result["returncode"] = completed.returncode
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def run_batch(args):
+    """Process every scene over a pool of workers and write the JSON report"""
+    output_dir = args.output_dir or os.path.join(args.scenes, DEFAULT_OUTPUT_FOLDER)
+
+    # Never pick up scenes written by a previous run
+    output_prefix = os.path.abspath(output_dir) + os.sep
+    scenes = [
+        scene for scene in find_scenes(args.scenes, args.recursive)
+        if not os.path.abspath(scene).startswith(output_prefix)
+    ]
+    if not scenes:
+        print("No .ma/.mb scenes found in " + args.scenes)
+        return 1
+
+    interpreter = sys.executable if args.fake_maya else (args.mayapy or find_mayapy())
+
+    print("Processing {0} scenes with {1} workers".format(len(scenes), args.workers))
+
+    batch_start = time.perf_counter()
+    results = []
+
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = {}
+        for scene in scenes:
+            output = os.path.abspath(os.path.join(output_dir, os.path.relpath(scene, args.scenes)))
+            scene = os.path.abspath(scene)
+            command = build_worker_command(interpreter, scene, output, args)
+            futures[pool.submit(run_scene_process, command, scene, args.timeout)] = scene
+
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print("[{0}/{1}] {2}: {3} ({4:.1f}s)".format(
+                len(results), len(scenes), result["status"], futures[future], result["seconds"]
+            ))
+
+    results.sort(key=lambda item: item["scene"])
+
+    report = {
+        "scenes_dir": os.path.abspath(args.scenes),
+        "output_dir": os.path.abspath(output_dir),
+        "workers": args.workers,
+        "timeout": args.timeout,
+        "total_seconds": time.perf_counter() - batch_start,
+        "ok": sum(1 for item in results if item["status"] == "ok"),
+        "failed": sum(1 for item in results if item["status"] == "failed"),
+        "timeout_count": sum(1 for item in results if item["status"] == "timeout"),
+        "files": results,
+    }
+
+    report_path = args.report or os.path.join(output_dir, "batch_report.json")
+    report_dir = os.path.dirname(report_path)
+    if report_dir and not os.path.isdir(report_dir):
+        os.makedirs(report_dir)
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print("Done: {0} ok, {1} failed, {2} timed out. Report: {3}".format(
+        report["ok"], report["failed"], report["timeout_count"], report_path
+    ))
+
+    return 0 if report["ok"] == len(results) else 1
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Batch mocap prep and baking over a directory of Maya scenes.")
+
+    parser.add_argument("scenes", nargs="?", help="Directory containing .ma/.mb scenes")
+    parser.add_argument("--recursive", action="store_true", help="Search sub-directories for scenes")
+    parser.add_argument("--output-dir", help="Where processed scenes are saved (default: <scenes>/processed)")
+    parser.add_argument("--report", help="JSON summary path (default: <output-dir>/batch_report.json)")
+
+    parser.add_argument("--prep", action="store_true", help="Run Mocap_Setup.run_motion_prep")
+    parser.add_argument("--root", help="Root joint for the prep (default: first top-level joint)")
+    parser.add_argument("--prep-start", type=float, help="Frame the take is moved to (default: 1001)")
+    parser.add_argument("--rest-frame", type=float, help="Frame of the zero rotation rest pose (default: 990)")
+    parser.add_argument("--filter", choices=["butterworth", "savgol"], help="Smooth the prepped joints with Mocap_Filter")
+    parser.add_argument("--lock-feet", action="store_true", help="Pin ankle and ball joints on ground contacts")
+    parser.add_argument("--bake-pairs", help="JSON/CSV parent/child mapping for Force_Baking_Tool")
+    parser.add_argument("--start", type=float, help="Bake start frame (default: playback start)")
+    parser.add_argument("--end", type=float, help="Bake end frame (default: playback end)")
+    parser.add_argument("--mode", default="fast", choices=["fast", "safe", "adaptive"], help="Bake mode")
+    parser.add_argument("--simplify", action="store_true", help="Run Curve_Simplify on the result")
+
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2), help="Parallel mayapy processes")
+    parser.add_argument("--timeout", type=float, default=900.0, help="Seconds allowed per scene")
+    parser.add_argument("--mayapy", help="mayapy executable (default: MAYA_LOCATION/bin/mayapy)")
+    parser.add_argument("--fake-maya", action="store_true", help="Use a stand-in maya.cmds instead of mayapy")
+
+    # Internal: set by the controller when launching a worker
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+
+    args = parser.parse_args(argv)
+
+    if not args.worker:
+        if not args.scenes:
+            parser.error("a scenes directory is required")
+        if not args.prep and not args.bake_pairs:
+            parser.error("nothing to do: pass --prep and/or --bake-pairs")
+
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.worker:
+        return run_worker(args)
+
+    return run_batch(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
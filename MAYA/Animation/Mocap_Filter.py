@@ -0,0 +1,740 @@
+"""Noise filtering and foot locking for dense mocap curves.
+
+Works on every channel of a skeleton at once in NumPy: Euler unrolling,
+zero-phase Butterworth or Savitzky-Golay smoothing with per joint
+settings, and foot contact detection that pins the ankle and ball joints
+through a two bone IK solve on the leg.
+
+Run in Maya's Script Editor for the UI, or call from other tools:
+
+    import Mocap_Filter
+    Mocap_Filter.filter_joints(joints, method="butterworth", settings={"Hips": 4.0}, lock_feet=True)
+
+Keys are built through the API on temporary curves and pasted back with
+copyKey/pasteKey, so filtering is undoable.
+"""
+
+import re
+import time
+
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+import maya.api.OpenMayaAnim as oma
+
+import numpy as np
+
+try:
+    from scipy import signal
+except ImportError:
+    signal = None
+
+
+FILTER_METHODS = ["butterworth", "savgol"]
+
+# Default per method: cutoff in Hz for Butterworth, window in frames for Savitzky-Golay
+DEFAULT_SETTINGS = {
+    "butterworth": 6.0,
+    "savgol": 9,
+}
+SAVGOL_ORDER = 3
+
+FILTERED_ATTRS = ["translateX", "translateY", "translateZ", "rotateX", "rotateY", "rotateZ"]
+ROTATE_ATTRS = ["rotateX", "rotateY", "rotateZ"]
+
+# Foot contacts: height above the joint's lowest point (scene units), speed (units per second)
+CONTACT_HEIGHT = 2.0
+CONTACT_SPEED = 20.0
+CONTACT_MIN_FRAMES = 4
+LOCK_BLEND_FRAMES = 6
+
+ANKLE_PATTERN = re.compile(r"(ankle|foot)$", re.IGNORECASE)
+BALL_PATTERN = re.compile(r"(ball|toe)", re.IGNORECASE)
+
+TIME_CURVE_TYPES = ["animCurveTA", "animCurveTL", "animCurveTU", "animCurveTT"]
+
+
+# ------------------------------------------------------------
+# Filters
+# ------------------------------------------------------------
+
+def unroll_degrees(values):
+    """Remove 360 degree jumps between frames, for all (frames, channels) at once"""
+    steps = np.diff(values, axis=0)
+    steps -= 360.0 * np.round(steps / 360.0)
+    unrolled = np.empty_like(values)
+    unrolled[0] = values[0]
+    np.cumsum(steps, axis=0, out=unrolled[1:])
+    unrolled[1:] += values[0]
+    return unrolled
+
+
+def butterworth_coefficients(cutoff, fps):
+    """Second order low-pass Butterworth (b, a) through the bilinear transform"""
+    k = np.tan(np.pi * min(cutoff, 0.45 * fps) / fps)
+    norm = 1.0 / (1.0 + np.sqrt(2.0) * k + k * k)
+    b0 = k * k * norm
+    return (
+        np.array([b0, 2.0 * b0, b0]),
+        np.array([1.0, 2.0 * (k * k - 1.0) * norm, (1.0 - np.sqrt(2.0) * k + k * k) * norm])
+    )
+
+
+def iir_filter(values, b, a):
+    """Run a second order filter down the frames, every channel in the same step"""
+    filtered = np.empty_like(values)
+
+    # Start from the steady state of the first frame, so there is no ramp in
+    x1 = x2 = y1 = y2 = values[0].copy()
+    for index in range(len(values)):
+        x0 = values[index]
+        y0 = b[0] * x0 + b[1] * x1 + b[2] * x2 - a[1] * y1 - a[2] * y2
+        filtered[index] = y0
+        x2, x1 = x1, x0
+        y2, y1 = y1, y0
+    return filtered
+
+
+def odd_extension(values, length):
+    """Pad both ends by point reflection, which keeps position and slope at the ends"""
+    length = min(length, len(values) - 1)
+    if length < 1:
+        return values, 0
+    front = 2.0 * values[0] - values[length:0:-1]
+    back = 2.0 * values[-1] - values[-2:-length - 2:-1]
+    return np.concatenate((front, values, back)), length
+
+
+def butterworth(values, cutoff, fps):
+    """Zero-phase Butterworth low-pass over (frames, channels)"""
+    b, a = butterworth_coefficients(cutoff, fps)
+    if signal is not None:
+        return signal.filtfilt(b, a, values, axis=0)
+
+    padded, length = odd_extension(values, max(9, int(round(fps / cutoff))))
+    filtered = iir_filter(padded, b, a)
+    filtered = iir_filter(filtered[::-1], b, a)[::-1]
+    return filtered[length:length + len(values)]
+
+
+def savgol_coefficients(window, order=SAVGOL_ORDER):
+    """Smoothing weights of a Savitzky-Golay window (least squares polynomial at the centre)"""
+    half = window // 2
+    positions = np.arange(-half, half + 1, dtype=float)
+    return np.linalg.pinv(np.vander(positions, order + 1, increasing=True))[0]
+
+
+def savgol(values, window, order=SAVGOL_ORDER):
+    """Savitzky-Golay smoothing over (frames, channels)"""
+    window = max(int(window) | 1, order + 2 | 1)
+    if len(values) < window:
+        return values.copy()
+    if signal is not None:
+        return signal.savgol_filter(values, window, order, axis=0)
+
+    padded, _ = odd_extension(values, window // 2)
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window, axis=0)
+    return windows @ savgol_coefficients(window, order)
+
+
+def smooth(values, method, settings, fps):
+    """
+    Smooth (frames, channels) with one setting per channel.
+
+    Channels sharing a setting are filtered together in one pass.
+    """
+    smoothed = values.copy()
+    for setting in np.unique(settings):
+        columns = np.flatnonzero(settings == setting)
+        if method == "butterworth":
+            smoothed[:, columns] = butterworth(values[:, columns], setting, fps)
+        elif method == "savgol":
+            smoothed[:, columns] = savgol(values[:, columns], setting)
+        else:
+            raise ValueError("Unknown filter method: " + method)
+    return smoothed
+
+
+# ------------------------------------------------------------
+# Foot contacts
+# ------------------------------------------------------------
+
+def remove_short_runs(mask, min_frames):
+    """Clear runs of True shorter than min_frames"""
+    if min_frames <= 1 or not mask.any():
+        return mask
+
+    edges = np.flatnonzero(np.diff(np.concatenate(([False], mask, [False])).astype(int)))
+    starts, ends = edges[0::2], edges[1::2]
+    short = (ends - starts) < min_frames
+
+    marks = np.zeros(len(mask) + 1, dtype=int)
+    np.add.at(marks, starts[short], 1)
+    np.add.at(marks, ends[short], -1)
+    return mask & (np.cumsum(marks)[:-1] == 0)
+
+
+def detect_contacts(positions, fps, up_axis=1, height=CONTACT_HEIGHT, speed=CONTACT_SPEED,
+                    min_frames=CONTACT_MIN_FRAMES):
+    """
+    Return a per frame contact mask for a joint's world positions (frames, 3).
+
+    A frame is in contact when the joint is within height of its lowest
+    point (5th percentile, robust to spikes) and its horizontal speed is
+    below speed. Contacts shorter than min_frames are dropped.
+    """
+    heights = positions[:, up_axis]
+    low = heights < np.percentile(heights, 5) + height
+
+    ground = [axis for axis in range(3) if axis != up_axis]
+    velocity = np.gradient(positions[:, ground], axis=0) * fps
+    slow = np.linalg.norm(velocity, axis=1) < speed
+
+    return remove_short_runs(low & slow, min_frames)
+
+
+def lock_corrections(ankle, ball, ankle_contacts, ball_contacts, blend=LOCK_BLEND_FRAMES):
+    """
+    Return the (frames, 3) offset that moves the ankle so the foot stays planted.
+
+    During ankle contacts the ankle is held where the contact started; during
+    ball-only contacts the ball is held instead, so the foot pivots on the
+    toes. A contact that switches joint carries its offset over, and after
+    each contact the offset fades out over blend frames.
+    """
+    count = len(ankle)
+    corrections = np.zeros((count, 3))
+    kind = np.where(ankle_contacts, 1, np.where(ball_contacts, 2, 0))
+    if not kind.any():
+        return corrections
+
+    starts = np.flatnonzero(np.diff(np.concatenate(([0], kind))) != 0)
+    ends = np.concatenate((starts[1:], [count]))
+
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        if not kind[start]:
+            continue
+        pinned = ankle if kind[start] == 1 else ball
+        carried = corrections[start - 1] if start and kind[start - 1] else 0.0
+        corrections[start:end] = pinned[start] + carried - pinned[start:end]
+
+    # Fade out after every contact
+    contacts = kind > 0
+    indices = np.arange(count)
+    last = np.maximum.accumulate(np.where(contacts, indices, -1))
+    after = ~contacts & (last >= 0)
+    weights = np.clip(1.0 - (indices - last) / float(blend + 1), 0.0, 1.0) * after
+    corrections[after] = corrections[last[after]] * weights[after, None]
+    return corrections
+
+
+def axis_angle_matrices(axes, angles):
+    """Column-vector rotation matrices about unit axes (n, 3) by angles (n,), Rodrigues"""
+    cross = np.zeros(axes.shape[:-1] + (3, 3))
+    cross[..., 0, 1] = -axes[..., 2]
+    cross[..., 0, 2] = axes[..., 1]
+    cross[..., 1, 0] = axes[..., 2]
+    cross[..., 1, 2] = -axes[..., 0]
+    cross[..., 2, 0] = -axes[..., 1]
+    cross[..., 2, 1] = axes[..., 0]
+
+    sin = np.sin(angles)[..., None, None]
+    cos = np.cos(angles)[..., None, None]
+    return np.eye(3) + sin * cross + (1.0 - cos) * (cross @ cross)
+
+
+def normalize(vectors, fallback):
+    lengths = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.where(lengths > 1e-9, vectors / np.maximum(lengths, 1e-12), fallback)
+
+
+def two_bone_ik(hip, knee, ankle, target, bend_normal):
+    """
+    Solve a hip-knee-ankle chain so the ankle reaches target, every frame at once.
+
+    Returns (knee bend, hip swing) as column-vector world rotations: the knee
+    rotates about its own bend axis to get the hip-ankle distance right,
+    then the whole leg swings about the hip onto the target. bend_normal is
+    used where the leg is straight and the bend axis is undefined.
+    """
+    upper = hip - knee
+    lower = ankle - knee
+    upper_length = np.linalg.norm(upper, axis=1)
+    lower_length = np.linalg.norm(lower, axis=1)
+
+    normal = normalize(np.cross(upper, lower), bend_normal)
+    distance = np.clip(
+        np.linalg.norm(target - hip, axis=1),
+        np.abs(upper_length - lower_length) + 1e-6,
+        upper_length + lower_length - 1e-6
+    )
+
+    current = np.arccos(np.clip(np.einsum("ij,ij->i", upper, lower) / (upper_length * lower_length), -1.0, 1.0))
+    wanted = np.arccos(np.clip(
+        (upper_length ** 2 + lower_length ** 2 - distance ** 2) / (2.0 * upper_length * lower_length), -1.0, 1.0
+    ))
+    bend = axis_angle_matrices(normal, wanted - current)
+
+    reached = knee + np.einsum("nij,nj->ni", bend, lower) - hip
+    wanted_direction = target - hip
+    axis = np.cross(reached, wanted_direction)
+    swing = axis_angle_matrices(
+        normalize(axis, np.array([1.0, 0.0, 0.0])),
+        np.arctan2(np.linalg.norm(axis, axis=1), np.einsum("ij,ij->i", reached, wanted_direction))
+    )
+    return bend, swing
+
+
+# ------------------------------------------------------------
+# Scene
+# ------------------------------------------------------------
+
+class ChannelTable(object):
+    """
+    Keys of many curves that share the same key times, as one (frames, channels) array.
+
+    values are in UI units (degrees for rotations); factors convert each
+    channel to the internal units the API writes.
+    """
+
+    def __init__(self, times, curves, plugs, factors, values):
+        self.times = times
+        self.curves = curves
+        self.plugs = plugs
+        self.factors = factors
+        self.values = values
+        self.columns = dict((plug, index) for index, plug in enumerate(plugs))
+
+    def column(self, node, attr):
+        return self.columns.get("{0}.{1}".format(node, attr))
+
+
+def read_channels(joints, attrs=FILTERED_ATTRS):
+    """
+    Read the keys of the joints' attrs into a ChannelTable.
+
+    Mocap curves are keyed on the same frames; curves keyed elsewhere
+    than the most common frame list are left out and reported.
+    """
+    groups = {}
+    for jnt in joints:
+        connections = cmds.listConnections(
+            ["{0}.{1}".format(jnt, attr) for attr in attrs],
+            type="animCurve", source=True, destination=False, connections=True, plugs=False
+        ) or []
+
+        # Rebuild plug names from the given joint path, listConnections shortens them
+        for plug, curve in zip(connections[::2], connections[1::2]):
+            if cmds.nodeType(curve) not in TIME_CURVE_TYPES:
+                continue
+            times = tuple(cmds.keyframe(curve, query=True, timeChange=True) or [])
+            if len(times) > 2:
+                groups.setdefault(times, []).append((jnt + "." + plug.split(".", 1)[1], curve))
+
+    if not groups:
+        return None
+
+    times, members = max(groups.items(), key=lambda item: len(item[1]))
+    skipped = sum(len(group) for group in groups.values()) - len(members)
+    if skipped:
+        print("{0} curves are keyed on other frames and were not filtered.".format(skipped))
+
+    values = np.empty((len(times), len(members)))
+    factors = np.empty(len(members))
+    angle = om.MAngle(1.0, om.MAngle.uiUnit()).asRadians()
+    distance = om.MDistance.uiToInternal(1.0)
+
+    for index, (plug, curve) in enumerate(members):
+        values[:, index] = cmds.keyframe(curve, query=True, valueChange=True)
+        curve_type = cmds.nodeType(curve)
+        factors[index] = angle if curve_type == "animCurveTA" else distance if curve_type == "animCurveTL" else 1.0
+
+    return ChannelTable(
+        np.array(times),
+        [curve for _, curve in members],
+        [plug for plug, _ in members],
+        factors,
+        values
+    )
+
+
+def write_channels(table, columns):
+    """
+    Replace all keys of the given columns' curves.
+
+    Each curve's keys are built with one addKeys call on a temporary curve
+    outside the undo queue, then pasted over the original with one
+    copyKey/pasteKey, which goes through the undo queue.
+    """
+    unit = om.MTime.uiUnit()
+    times = om.MTimeArray([om.MTime(t, unit) for t in table.times.tolist()])
+    first_time = (float(table.times[0]),)
+    tangent = oma.MFnAnimCurve.kTangentGlobal
+    selection = om.MSelectionList()
+
+    for column in columns:
+        selection.clear()
+        selection.add(table.curves[column])
+        curve_type = oma.MFnAnimCurve(selection.getDependNode(0)).animCurveType
+        values = om.MDoubleArray((table.values[:, column] * table.factors[column]).tolist())
+
+        temp_fn = oma.MFnAnimCurve()
+        temp_curve = temp_fn.create(curve_type)
+        try:
+            temp_fn.addKeys(times, values, tangent, tangent, False)
+            cmds.copyKey(temp_fn.name())
+            cmds.pasteKey(table.curves[column], time=first_time, option="replace")
+        finally:
+            modifier = om.MDGModifier()
+            modifier.deleteNode(temp_curve)
+            modifier.doIt()
+
+
+def sample_world_matrices(nodes, times):
+    """Sample worldMatrix of each node over times in one DG context per frame; (node, frame, 4, 4)"""
+    plugs = []
+    for node in nodes:
+        selection = om.MSelectionList()
+        selection.add(node + ".worldMatrix[0]")
+        plugs.append(selection.getPlug(0))
+
+    unit = om.MTime.uiUnit()
+    samples = np.empty((len(plugs), len(times), 16))
+    for frame_index, frame in enumerate(times):
+        context = om.MDGContext(om.MTime(frame, unit))
+        for plug_index, plug in enumerate(plugs):
+            samples[plug_index, frame_index] = tuple(om.MFnMatrixData(plug.asMObject(context)).matrix())
+    return samples.reshape(len(plugs), len(times), 4, 4)
+
+
+def find_feet(joints):
+    """Return (ankle, ball) pairs found by joint name"""
+    feet = []
+    for jnt in joints:
+        if not ANKLE_PATTERN.search(jnt.split("|")[-1].split(":")[-1]):
+            continue
+        children = cmds.listRelatives(jnt, children=True, type="joint", fullPath=True) or []
+        balls = [child for child in children if BALL_PATTERN.search(child.split("|")[-1])]
+        if balls:
+            feet.append((jnt, balls[0]))
+    return feet
+
+
+def euler_matrix(node, attr):
+    """Rotation matrix (row-vector, 3x3) of a node's xyz angle attribute such as jointOrient"""
+    x, y, z = [om.MAngle(value, om.MAngle.uiUnit()).asRadians() for value in cmds.getAttr(node + "." + attr)[0]]
+    return np.array(tuple(om.MEulerRotation(x, y, z).asMatrix())).reshape(4, 4)[:3, :3]
+
+
+def orientation(matrices):
+    """Rotation part of (n, 4, 4) world matrices with any scale removed"""
+    rotations = matrices[:, :3, :3]
+    return rotations / np.linalg.norm(rotations, axis=2, keepdims=True)
+
+
+def set_rotation_channels(table, joint, rotations, frames):
+    """
+    Write joint-local rotations (n, 3, 3) into the table's rotate channels at frames.
+
+    Rotate axis and joint orient are taken out first, then each matrix is
+    decomposed in the joint's rotate order, closest to the existing angles.
+    """
+    columns = [table.column(joint, attr) for attr in ROTATE_ATTRS]
+    rotate_axis = euler_matrix(joint, "rotateAxis")
+    joint_orient = euler_matrix(joint, "jointOrient")
+    order = cmds.getAttr(joint + ".rotateOrder")
+
+    # Maya joint rotation: rotateAxis * rotate * jointOrient
+    rotations = rotate_axis.T @ rotations @ joint_orient.T
+    factors = table.factors[columns]
+    matrix = np.eye(4)
+
+    for frame, rotation in zip(frames.tolist(), rotations):
+        matrix[:3, :3] = rotation
+        previous = om.MEulerRotation(*(table.values[frame, columns] * factors), order=order)
+        euler = om.MEulerRotation.decompose(om.MMatrix(matrix.ravel().tolist()), order).closestSolution(previous)
+        table.values[frame, columns] = np.array([euler.x, euler.y, euler.z]) / factors
+
+    return columns
+
+
+def lock_foot(table, ankle, ball, fps, up_axis, height, speed, min_frames, blend):
+    """
+    Pin one foot on its contacts by re-solving hip and knee rotations.
+
+    Returns the number of contact frames, and the table columns it changed.
+    """
+    knee = cmds.listRelatives(ankle, parent=True, type="joint", fullPath=True)
+    hip = cmds.listRelatives(knee, parent=True, type="joint", fullPath=True) if knee else None
+    if not hip:
+        print("Skipping foot lock for {0}: no hip and knee joints above it.".format(ankle))
+        return 0, []
+    knee, hip = knee[0], hip[0]
+
+    if any(table.column(jnt, attr) is None for jnt in [hip, knee, ankle] for attr in ROTATE_ATTRS):
+        print("Skipping foot lock for {0}: leg rotations are not keyed on every frame.".format(ankle))
+        return 0, []
+
+    parent = cmds.listRelatives(hip, parent=True, fullPath=True)
+    nodes = [hip, knee, ankle, ball] + (parent or [])
+    matrices = sample_world_matrices(nodes, table.times)
+    positions = matrices[:, :, 3, :3]
+
+    ankle_contacts = detect_contacts(positions[2], fps, up_axis, height, speed, min_frames)
+    ball_contacts = detect_contacts(positions[3], fps, up_axis, height, speed, min_frames)
+    corrections = lock_corrections(positions[2], positions[3], ankle_contacts, ball_contacts, blend)
+
+    frames = np.flatnonzero(np.linalg.norm(corrections, axis=1) > 1e-6)
+    if not len(frames):
+        return 0, []
+
+    hip_rotation = orientation(matrices[0, frames])
+    knee_rotation = orientation(matrices[1, frames])
+    ankle_rotation = orientation(matrices[2, frames])
+    parent_rotation = orientation(matrices[4, frames]) if parent else np.broadcast_to(np.eye(3), hip_rotation.shape)
+
+    bend, swing = two_bone_ik(
+        positions[0, frames],
+        positions[1, frames],
+        positions[2, frames],
+        positions[2, frames] + corrections[frames],
+        knee_rotation[:, 2]
+    )
+
+    # Row-vector world rotations: a world space rotation R applies as W * R^T
+    new_hip = hip_rotation @ np.swapaxes(swing, 1, 2)
+    new_knee = knee_rotation @ np.swapaxes(swing @ bend, 1, 2)
+
+    columns = []
+    columns += set_rotation_channels(table, hip, new_hip @ np.swapaxes(parent_rotation, 1, 2), frames)
+    columns += set_rotation_channels(table, knee, new_knee @ np.swapaxes(new_hip, 1, 2), frames)
+    columns += set_rotation_channels(table, ankle, ankle_rotation @ np.swapaxes(new_knee, 1, 2), frames)
+
+    return int((ankle_contacts | ball_contacts).sum()), columns
+
+
+def get_fps():
+    """Frames per second of the scene's time unit"""
+    return om.MTime(1.0, om.MTime.kSeconds).asUnits(om.MTime.uiUnit())
+
+
+def filter_joints(joints, method="butterworth", settings=None, default=None, unroll=True,
+                  lock_feet=False, feet=None, height=CONTACT_HEIGHT, speed=CONTACT_SPEED,
+                  min_frames=CONTACT_MIN_FRAMES, blend=LOCK_BLEND_FRAMES, verbose=True):
+    """
+    Filter the translate and rotate curves of the joints in one pass.
+
+    method is "butterworth" (settings are cutoffs in Hz) or "savgol"
+    (settings are window lengths in frames), or None to only unroll and
+    lock. settings maps joint names (without namespace) to their own value,
+    the rest use default. With lock_feet, feet (ankle, ball) pairs, found by
+    name if not given, are pinned on their ground contacts afterwards.
+    Returns a dict of stage timings and counts.
+    """
+    stats = {}
+    start = time.perf_counter()
+
+    table = read_channels(joints)
+    if table is None:
+        cmds.warning("No dense translate or rotate curves found on the joints.")
+        return stats
+    stats["read"] = time.perf_counter() - start
+
+    fps = get_fps()
+    changed = np.zeros(len(table.plugs), dtype=bool)
+
+    if unroll:
+        start = time.perf_counter()
+        rotate_columns = np.array([plug.rsplit(".", 1)[1] in ROTATE_ATTRS for plug in table.plugs])
+        table.values[:, rotate_columns] = unroll_degrees(table.values[:, rotate_columns])
+        changed |= rotate_columns
+        stats["unroll"] = time.perf_counter() - start
+
+    if method:
+        start = time.perf_counter()
+        if default is None:
+            default = DEFAULT_SETTINGS[method]
+        by_joint = dict((name.split(":")[-1], value) for name, value in (settings or {}).items())
+        channel_settings = np.array([
+            by_joint.get(plug.rsplit(".", 1)[0].split("|")[-1].split(":")[-1], default) for plug in table.plugs
+        ], dtype=float)
+        table.values = smooth(table.values, method, channel_settings, fps)
+        changed[:] = True
+        stats["smooth"] = time.perf_counter() - start
+
+    # Every curve write of this call is one undo step
+    cmds.undoInfo(openChunk=True, chunkName="mocapFilter")
+    try:
+        start = time.perf_counter()
+        write_channels(table, np.flatnonzero(changed))
+        stats["write"] = time.perf_counter() - start
+
+        if lock_feet:
+            start = time.perf_counter()
+            up_axis = "xyz".index(cmds.upAxis(query=True, axis=True))
+            contact_frames = 0
+            locked = []
+            for ankle, ball in (feet if feet is not None else find_feet(joints)):
+                frames, columns = lock_foot(table, ankle, ball, fps, up_axis, height, speed, min_frames, blend)
+                contact_frames += frames
+                locked += columns
+            write_channels(table, sorted(set(locked)))
+            stats["foot lock"] = time.perf_counter() - start
+            stats["contact_frames"] = contact_frames
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    stats["curves"] = len(table.curves)
+    stats["frames"] = len(table.times)
+
+    if verbose:
+        print("Filtered {0} curves x {1} frames:".format(stats["curves"], stats["frames"]))
+        for name in ["read", "unroll", "smooth", "write", "foot lock"]:
+            if name in stats:
+                print("  {0:<10} {1:.3f}s".format(name, stats[name]))
+        if "contact_frames" in stats:
+            print("  {0} foot contact frames locked".format(stats["contact_frames"]))
+
+    return stats
+
+
+# ------------------------------------------------------------
+# Benchmark
+# ------------------------------------------------------------
+
+def synthetic_take(joint_count=100, frame_count=20000, fps=120.0, seed=0):
+    """
+    Build a noisy take without Maya: rotation channels (frames, joints * 3)
+    in degrees with wrap-around jumps, and a walking foot (frames, 3).
+    """
+    rng = np.random.default_rng(seed)
+    seconds = np.arange(frame_count) / fps
+
+    phases = rng.uniform(0.0, 2.0 * np.pi, joint_count * 3)
+    speeds = rng.uniform(0.2, 2.0, joint_count * 3)
+    rotations = 60.0 * np.sin(seconds[:, None] * speeds + phases) + rng.normal(0.0, 0.5, (frame_count, joint_count * 3))
+
+    # Some channels spin through +-180 like an unfiltered solve
+    rotations[:, ::7] += 90.0 * seconds[:, None]
+    rotations = (rotations + 180.0) % 360.0 - 180.0
+
+    # Foot: one second steps, planted half the time, with a little slide and noise
+    stride = seconds % 1.0
+    swing = stride >= 0.5
+    foot = np.zeros((frame_count, 3))
+    foot[:, 0] = np.floor(seconds) * 60.0 + np.where(swing, (stride - 0.5) * 120.0, 0.0) + stride * 0.5
+    foot[:, 1] = np.where(swing, 10.0 * np.sin((stride - 0.5) * 2.0 * np.pi), 0.0)
+    foot += rng.normal(0.0, 0.05, foot.shape)
+
+    return rotations, foot
+
+
+def benchmark_filters(joint_count=100, frame_count=20000, fps=120.0):
+    """
+    Time every filter stage on a synthetic take, without touching the scene.
+
+    The foot lock part times contact detection, lock offsets and the leg
+    IK solve on a synthetic leg; writing back to curves is not included.
+    """
+    rotations, foot = synthetic_take(joint_count, frame_count, fps)
+    channels = rotations.shape[1]
+    results = {"joints": joint_count, "frames": frame_count, "scipy": signal is not None}
+
+    def timed(name, function):
+        start = time.perf_counter()
+        value = function()
+        results[name] = time.perf_counter() - start
+        return value
+
+    unrolled = timed("unroll", lambda: unroll_degrees(rotations))
+    cutoffs = np.where(np.arange(channels) < channels // 2, 4.0, 8.0)
+    timed("butterworth", lambda: smooth(unrolled, "butterworth", cutoffs, fps))
+    windows = np.where(np.arange(channels) < channels // 2, 9, 15)
+    timed("savgol", lambda: smooth(unrolled, "savgol", windows, fps))
+
+    contacts = timed("contacts", lambda: detect_contacts(foot, fps))
+    corrections = timed("lock", lambda: lock_corrections(foot, foot + [10.0, 0.0, 0.0], contacts, contacts))
+
+    # Slightly bent leg of two 40 unit bones standing above the foot
+    ankle = foot
+    knee = ankle + [8.0, 39.2, 0.0]
+    hip = knee + [-8.0, 39.2, 0.0]
+    bend_normal = np.array([0.0, 0.0, 1.0])
+    target = ankle + corrections
+    bend, swing = timed("ik", lambda: two_bone_ik(hip, knee, ankle, target, bend_normal))
+
+    solved = hip + np.einsum("nij,nj->ni", swing, knee + np.einsum("nij,nj->ni", bend, ankle - knee) - hip)
+    results["ik_error"] = float(np.abs(solved - target).max())
+    results["contact_frames"] = int(contacts.sum())
+
+    print("{0} joints x {1} frames ({2} rotate channels), SciPy: {3}".format(
+        joint_count, frame_count, channels, "yes" if signal is not None else "no"
+    ))
+    for name in ["unroll", "butterworth", "savgol", "contacts", "lock", "ik"]:
+        print("  {0:<12} {1:.3f}s".format(name, results[name]))
+    print("  {0} contact frames, max IK error {1:.2e}".format(results["contact_frames"], results["ik_error"]))
+
+    return results
+
+
+# ------------------------------------------------------------
+# UI
+# ------------------------------------------------------------
+
+def show_ui():
+    """Create a small window to filter the selected skeleton"""
+    if cmds.window("mocapFilterWin", exists=True):
+        cmds.deleteUI("mocapFilterWin")
+
+    window = cmds.window("mocapFilterWin", title="Mocap Filter", width=280)
+    cmds.columnLayout(adjustableColumn=True, rowSpacing=5, columnAttach=("both", 10))
+
+    cmds.separator(height=10, style="none")
+    method_field = cmds.radioButtonGrp(
+        label="Filter",
+        labelArray3=["Butterworth", "Savitzky-Golay", "None"],
+        numberOfRadioButtons=3,
+        select=1,
+        columnWidth4=(60, 90, 100, 50),
+        columnAlign=(1, "left")
+    )
+    setting_field = cmds.floatFieldGrp(
+        label="Cutoff Hz / window",
+        value1=DEFAULT_SETTINGS["butterworth"],
+        columnWidth2=(120, 80),
+        columnAlign=(1, "left")
+    )
+    unroll_field = cmds.checkBox(label="Unroll Euler angles", value=True)
+    lock_field = cmds.checkBox(label="Lock feet on contacts", value=False)
+
+    def set_default(*_):
+        method = [None, "butterworth", "savgol", None][cmds.radioButtonGrp(method_field, query=True, select=True)]
+        if method:
+            cmds.floatFieldGrp(setting_field, edit=True, value1=DEFAULT_SETTINGS[method])
+
+    cmds.radioButtonGrp(method_field, edit=True, changeCommand=set_default)
+
+    def run(*_):
+        roots = cmds.ls(selection=True, type="joint", long=True)
+        if not roots:
+            cmds.warning("Select the root joint.")
+            return
+        joints = list(dict.fromkeys(
+            (cmds.listRelatives(roots, allDescendents=True, type="joint", fullPath=True) or []) + roots
+        ))
+        filter_joints(
+            joints,
+            method=[None, "butterworth", "savgol", None][cmds.radioButtonGrp(method_field, query=True, select=True)],
+            default=cmds.floatFieldGrp(setting_field, query=True, value1=True),
+            unroll=cmds.checkBox(unroll_field, query=True, value=True),
+            lock_feet=cmds.checkBox(lock_field, query=True, value=True)
+        )
+
+    cmds.separator(height=10, style="none")
+    cmds.button(label="Filter Selected Skeleton", height=40, command=run)
+    cmds.separator(height=10, style="none")
+
+    cmds.showWindow(window)
+
+
+if __name__ == "__main__":
+    show_ui()
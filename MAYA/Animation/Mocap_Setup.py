@@ -1,46 +1,514 @@
+import csv
+import math
+import os
+import time
+import zipfile
+from contextlib import contextmanager
+
 import maya.cmds as cmds
+import maya.api.OpenMaya as om
+import maya.api.OpenMayaAnim as oma
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import Curve_Simplify
+except ImportError:
+    Curve_Simplify = None
+
+try:
+    import Mocap_Filter
+except ImportError:
+    Mocap_Filter = None
+
+START_FRAME = 1001
+REST_FRAME = 990
+
+TIME_CURVE_TYPES = ["animCurveTA", "animCurveTL", "animCurveTU", "animCurveTT"]
+
+# One dict of stage seconds per run_motion_prep call
+PREP_TIMINGS = []
+
+# Frames read per chunk while ingesting a take; bounds the memory used
+INGEST_CHUNK = 2000
+
+ROTATE_ORDERS = ["xyz", "yzx", "zxy", "xzy", "yxz", "zyx"]
+
+BVH_CHANNELS = {
+    "Xposition": "translateX",
+    "Yposition": "translateY",
+    "Zposition": "translateZ",
+    "Xrotation": "rotateX",
+    "Yrotation": "rotateY",
+    "Zrotation": "rotateZ",
+}
 
 def get_all_descendants(joint):
     descendants = cmds.listRelatives(joint, allDescendents=True, type="joint", fullPath=True) or []
     descendants.append(joint)
     return list(set(descendants))  # Prevent duplication
 
-def move_animation_to_1001(joints):
-    current_frame = int(cmds.currentTime(q=True))
-    offset = 1001 - current_frame
-    cmds.select(joints, replace=True)
-    
-    # Get keyframe time range
-    min_time = cmds.findKeyframe(joints, which="first")
-    max_time = cmds.findKeyframe(joints, which="last")
-
-    if min_time is not None and max_time is not None:
-        cmds.keyframe(joints, edit=True, time=(min_time, max_time), relative=True, timeChange=offset)
-
-def delete_before_1001(joints):
-    cmds.cutKey(joints, time=(1, 1000), option="keys")
-
-def insert_zero_rotation_key_at_990(joints):
-    for jnt in joints:
-        for attr in ["rotateX", "rotateY", "rotateZ"]:
-            cmds.setKeyframe(jnt, time=990, attribute=attr, value=0)
-
-def run_motion_prep():
-    selection = cmds.ls(selection=True, type="joint")
-    if not selection:
-        cmds.warning("Please select the root joint.")
+def collect_curves(joints):
+    """Return every time based anim curve driving the joints, in one query"""
+    curves = cmds.keyframe(joints, query=True, name=True) or []
+    return cmds.ls(list(dict.fromkeys(curves)), type=TIME_CURVE_TYPES) or []
+
+def shift_curves(curves, offset):
+    """Move all keys of the curves by offset frames in one edit"""
+    if curves and offset:
+        cmds.keyframe(curves, edit=True, relative=True, timeChange=offset, option="over")
+
+def trim_curves(curves, start_frame=START_FRAME):
+    """Delete keys before start_frame on all curves in one cut"""
+    if not curves:
         return
-    
-    root_joint = selection[0]
-    all_joints = get_all_descendants(root_joint)
+    first = cmds.findKeyframe(curves, which="first")
+    if first is not None and first <= start_frame - 1:
+        cmds.cutKey(curves, time=(first, start_frame - 1), option="keys", clear=True)
+
+def insert_rest_pose(joints, rest_frame=REST_FRAME):
+    """Key zero rotation on every joint at rest_frame with one setKeyframe call"""
+    plugs = ["{0}.{1}".format(jnt, attr) for jnt in joints for attr in ["rotateX", "rotateY", "rotateZ"]]
+    if plugs:
+        cmds.setKeyframe(plugs, time=rest_frame, value=0)
+
+# ------------------------------------------------------------
+# Take ingest
+# ------------------------------------------------------------
+
+def strip_namespace(name):
+    return name.split("|")[-1].split(":")[-1]
+
+class BvhReader(object):
+    """
+    Streams the motion of a BVH file.
+
+    The hierarchy is parsed up front for channel names, rotation orders
+    and the frame rate; motion lines are read only when chunks() is
+    iterated.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.channels = []       # (joint, attribute) per column
+        self.rotate_orders = {}  # joint: Maya rotate order
+        self.frame_count = None
+        self.frame_time = None
+        self.frame_rate = None   # take frames per second, from Frame Time
+        self.data_offset = None
+        self.parse_header()
+
+    def parse_header(self):
+        joint = None
+        with open(self.path, "r") as f:
+            while True:
+                line = f.readline()
+                if not line:
+                    raise ValueError("No MOTION section in " + self.path)
+                tokens = line.split()
+                if not tokens:
+                    continue
+
+                if tokens[0] in ("ROOT", "JOINT"):
+                    joint = tokens[1]
+                elif tokens[0] == "End":
+                    joint = None
+                elif tokens[0] == "CHANNELS" and joint:
+                    names = tokens[2:2 + int(tokens[1])]
+                    self.channels += [(joint, BVH_CHANNELS[name]) for name in names]
+                    # BVH lists rotations outermost first, Maya orders name the first applied axis first
+                    axes = "".join(name[0].lower() for name in names if name.endswith("rotation"))
+                    if len(axes) == 3:
+                        self.rotate_orders[joint] = axes[::-1]
+                elif tokens[0] == "Frames:":
+                    self.frame_count = int(tokens[1])
+                elif tokens[:2] == ["Frame", "Time:"]:
+                    self.frame_time = float(tokens[2])
+                    if self.frame_time > 0.0:
+                        self.frame_rate = 1.0 / self.frame_time
+                    self.data_offset = f.tell()
+                    return
+
+    def chunks(self, chunk_size=INGEST_CHUNK):
+        """Yield (take frame numbers, values[frames, channels]) a chunk at a time"""
+        frame = 0
+        with open(self.path, "r") as f:
+            f.seek(self.data_offset)
+            while True:
+                lines = [line for line in (f.readline() for _ in range(chunk_size)) if line.strip()]
+                if not lines:
+                    return
+                values = np.loadtxt(lines, dtype=float, ndmin=2)
+                yield np.arange(frame, frame + len(values), dtype=float), values
+                frame += len(values)
+
+class CsvReader(object):
+    """
+    Streams a CSV of joint channels.
+
+    The header names one column per channel as joint.attribute, with an
+    optional leading frame column; without it rows count from frame 0.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rotate_orders = {}
+        self.frame_rate = None  # frames are scene frames
+        with open(path, "r", newline="") as f:
+            header = [cell.strip() for cell in next(csv.reader(f))]
+        self.has_frames = header[0].lower() == "frame"
+        self.channels = [tuple(name.rsplit(".", 1)) for name in header[1 if self.has_frames else 0:]]
+
+    def chunks(self, chunk_size=INGEST_CHUNK):
+        frame = 0
+        with open(self.path, "r", newline="") as f:
+            reader = csv.reader(f)
+            next(reader)
+            while True:
+                rows = [row for row in (next(reader, None) for _ in range(chunk_size)) if row]
+                if not rows:
+                    return
+                values = np.array(rows, dtype=float)
+                if self.has_frames:
+                    frames, values = values[:, 0], values[:, 1:]
+                else:
+                    frames = np.arange(frame, frame + len(values), dtype=float)
+                frame += len(values)
+                yield frames, values
+
+class NpzReader(object):
+    """
+    Streams an NPZ take: "channels" (joint.attribute names), "data"
+    (frames x channels, C order) and optionally "frames".
+
+    Rows of data are read straight from the archive member, so the array
+    is never loaded whole.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rotate_orders = {}
+        self.frame_rate = None  # frames are scene frames
+        with zipfile.ZipFile(path) as archive:
+            names = archive.namelist()
+            with archive.open("channels.npy") as f:
+                self.channels = [tuple(str(name).rsplit(".", 1)) for name in np.load(f)]
+            self.has_frames = "frames.npy" in names
+
+    def chunks(self, chunk_size=INGEST_CHUNK):
+        with zipfile.ZipFile(self.path) as archive:
+            frames = None
+            if self.has_frames:
+                with archive.open("frames.npy") as f:
+                    frames = np.load(f)
+
+            with archive.open("data.npy") as f:
+                version = np.lib.format.read_magic(f)
+                if version == (1, 0):
+                    shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+                else:
+                    shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+                if fortran_order or len(shape) != 2:
+                    raise ValueError("NPZ data must be a C order frames x channels array: " + self.path)
+
+                row_bytes = shape[1] * dtype.itemsize
+                frame = 0
+                while frame < shape[0]:
+                    count = min(chunk_size, shape[0] - frame)
+                    values = np.frombuffer(f.read(count * row_bytes), dtype=dtype).reshape(count, shape[1])
+                    if frames is not None:
+                        chunk_frames = np.asarray(frames[frame:frame + count], dtype=float)
+                    else:
+                        chunk_frames = np.arange(frame, frame + count, dtype=float)
+                    frame += count
+                    yield chunk_frames, values.astype(float)
+
+TAKE_READERS = {
+    ".bvh": BvhReader,
+    ".csv": CsvReader,
+    ".npz": NpzReader,
+}
+
+def open_take(path):
+    """Return a reader for a .bvh, .csv or .npz take"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in TAKE_READERS:
+        raise ValueError("Unsupported take format: " + path)
+    return TAKE_READERS[extension](path)
+
+def ingest_take(path, joints, start_frame=START_FRAME, source_frame=0, chunk_size=INGEST_CHUNK,
+                linear_scale=1.0, set_rotate_orders=True):
+    """
+    Key a take from disk directly onto the joints.
+
+    The file is read chunk_size frames at a time and every chunk is appended
+    to temporary anim curves with one MFnAnimCurve.addKeys call per channel,
+    so reading memory stays flat however long the take is. The curves are
+    then pasted onto the channels with copyKey/pasteKey, which keeps the
+    ingest undoable. Take frame source_frame lands on start_frame and
+    earlier frames are never keyed. Channels are matched to joints by name
+    without namespace; existing curves on those channels are replaced.
+    Rotations are read in degrees, translations in scene units times
+    linear_scale.
+
+    Takes that carry a frame rate (BVH Frame Time) are resampled to the
+    scene rate, keying every scene frame by linear interpolation; CSV and
+    NPZ frames are taken as scene frames. Returns the created curve names.
+    """
+    if np is None:
+        raise RuntimeError("Take ingest needs NumPy.")
+
+    reader = open_take(path)
+    by_name = dict((strip_namespace(jnt), jnt) for jnt in joints)
+
+    columns = []
+    targets = []
+    unmatched = set()
+    for column, (joint, attr) in enumerate(reader.channels):
+        target = by_name.get(strip_namespace(joint))
+        if target is None:
+            unmatched.add(joint)
+            continue
+        columns.append(column)
+        targets.append((target, attr))
+
+    if unmatched:
+        print("Take joints without a match, skipped: " + ", ".join(sorted(unmatched)))
+    if not targets:
+        cmds.warning("No channels of {0} match the joints.".format(path))
+        return []
+
+    if set_rotate_orders:
+        for joint, order in reader.rotate_orders.items():
+            target = by_name.get(strip_namespace(joint))
+            if target:
+                cmds.setAttr(target + ".rotateOrder", ROTATE_ORDERS.index(order))
+
+    plugs = ["{0}.{1}".format(target, attr) for target, attr in targets]
+
+    # Replace existing animation in one delete
+    old_curves = cmds.listConnections(plugs, type="animCurve", source=True, destination=False) or []
+    if old_curves:
+        cmds.delete(list(set(old_curves)))
+
+    selection = om.MSelectionList()
+    for plug in plugs:
+        selection.add(plug)
+
+    # Keys are staged on unconnected curves outside the undo queue
+    temp_fns = []
+    factors = []
+    angular = []
+    for index in range(len(plugs)):
+        temp_fn = oma.MFnAnimCurve()
+        curve_type = temp_fn.timedAnimCurveTypeForPlug(selection.getPlug(index))
+        temp_fn.create(curve_type)
+        temp_fns.append(temp_fn)
+        angular.append(curve_type == oma.MFnAnimCurve.kAnimCurveTA)
+        if curve_type == oma.MFnAnimCurve.kAnimCurveTA:
+            factors.append(math.radians(1.0))
+        elif curve_type == oma.MFnAnimCurve.kAnimCurveTL:
+            factors.append(linear_scale * om.MDistance.uiToInternal(1.0))
+        else:
+            factors.append(1.0)
+
+    columns = np.array(columns)
+    factors = np.array(factors)
+    angular = np.array(angular)
+    unit = om.MTime.uiUnit()
+    tangent = oma.MFnAnimCurve.kTangentGlobal
+
+    # Take frames per scene frame; 1.0 keys every take frame as it is
+    step = 1.0
+    scene_rate = om.MTime(1.0, om.MTime.kSeconds).asUnits(unit)
+    if reader.frame_rate and abs(reader.frame_rate - scene_rate) > 1e-3:
+        step = reader.frame_rate / scene_rate
+        print("Resampling {0} from {1:g} fps to the scene's {2:g} fps.".format(
+            os.path.basename(path), reader.frame_rate, scene_rate
+        ))
+
+    previous = None  # last take row of the previous chunk, to interpolate across chunks
+    next_key = 0     # next scene frame to key, counted from start_frame
+    keyed = 0
+    first_frame = None
+    curves = []
+
+    try:
+        for frames, values in reader.chunks(chunk_size):
+            values = values[:, columns] * factors
+
+            if step == 1.0:
+                keep = frames >= source_frame
+                values = values[keep]
+                scene_frames = frames[keep] - source_frame + start_frame
+            else:
+                if previous is not None:
+                    frames = np.concatenate([[previous[0]], frames])
+                    values = np.concatenate([previous[1][None], values])
+
+                # Unwrapped from the carried row, so angles blend the short way round
+                # and stay continuous from chunk to chunk
+                values[:, angular] = np.unwrap(values[:, angular], axis=0)
+                previous = (frames[-1], values[-1])
+
+                last_key = int(math.floor((frames[-1] - source_frame) / step + 1e-9))
+                indices = np.arange(next_key, last_key + 1)
+                next_key = max(next_key, last_key + 1)
+                positions = source_frame + indices * step
+                inside = positions >= frames[0]
+                if not inside.any():
+                    continue
+
+                values = np.column_stack([np.interp(positions[inside], frames, column) for column in values.T])
+                scene_frames = indices[inside] + start_frame
+
+            if not len(values):
+                continue
+
+            if first_frame is None:
+                first_frame = float(scene_frames[0])
+
+            times = om.MTimeArray([om.MTime(t, unit) for t in scene_frames.tolist()])
+            for temp_fn, channel in zip(temp_fns, values.T):
+                temp_fn.addKeys(times, om.MDoubleArray(channel.tolist()), tangent, tangent, True)
+            keyed += len(times)
+
+        if keyed:
+            for temp_fn, (target, attr) in zip(temp_fns, targets):
+                cmds.copyKey(temp_fn.name())
+                cmds.pasteKey(target, attribute=attr, time=(first_frame,), option="replace")
+            curves = cmds.listConnections(plugs, type="animCurve", source=True, destination=False) or []
+    finally:
+        modifier = om.MDGModifier()
+        for temp_fn in temp_fns:
+            modifier.deleteNode(temp_fn.object())
+        modifier.doIt()
+
+    print("Ingested {0}: {1} frames on {2} channels from frame {3}.".format(
+        os.path.basename(path), keyed, len(plugs), start_frame
+    ))
+    return curves
+
+class StageTimer(object):
+    """Wall time per named pipeline stage"""
+
+    def __init__(self):
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, time.perf_counter() - start))
+
+    def as_dict(self):
+        return dict(self.stages)
+
+    def report(self, title="Mocap prep"):
+        total = sum(seconds for _, seconds in self.stages)
+        print("{0}: {1:.3f}s".format(title, total))
+        for name, seconds in self.stages:
+            print("  {0:<10} {1:.3f}s".format(name, seconds))
+
+def find_root_joints():
+    """Return joints that have no joint parent"""
+    roots = []
+    for jnt in cmds.ls(type="joint", long=True) or []:
+        parent = cmds.listRelatives(jnt, parent=True, type="joint")
+        if not parent:
+            roots.append(jnt)
+    return roots
+
+def simplify_joint_curves(joints, tolerances=None):
+    """Run Curve_Simplify over every anim curve on the joints"""
+    if Curve_Simplify is None:
+        cmds.warning("Curve_Simplify not found, skipping simplification.")
+        return None
+    curves = cmds.keyframe(joints, query=True, name=True) or []
+    return Curve_Simplify.simplify_curves(curves, tolerances)
+
+def filter_joint_curves(joints, method="butterworth", settings=None, lock_feet=False):
+    """Run Mocap_Filter over the joints: Euler unroll, smoothing and optional foot lock"""
+    if Mocap_Filter is None:
+        cmds.warning("Mocap_Filter not found (needs NumPy), skipping filtering.")
+        return None
+    return Mocap_Filter.filter_joints(joints, method=method, settings=settings, lock_feet=lock_feet)
+
+def run_motion_prep(root_joint=None, simplify=False, simplify_tolerances=None,
+                    start_frame=START_FRAME, rest_frame=REST_FRAME, source_frame=None, take=None,
+                    filter_method=None, filter_settings=None, lock_feet=False):
+    """
+    Move the take so source_frame (default: current frame) lands on start_frame,
+    delete keys before start_frame and key a zero rotation rest pose at rest_frame.
+
+    Stages work on the joints' anim curves in bulk: curves are collected once,
+    then shifted, trimmed and keyed with one command each. With take (a .bvh,
+    .csv or .npz path) the animation is streamed from the file instead, with
+    the offset and trim applied while keying; source_frame is then a take
+    frame (default 0). filter_method ("butterworth" or "savgol") and
+    lock_feet add a Mocap_Filter stage before the rest pose is keyed.
+    Stage timings are printed and appended to PREP_TIMINGS.
+    """
+    if root_joint is None:
+        selection = cmds.ls(selection=True, type="joint")
+        if not selection:
+            cmds.warning("Please select the root joint.")
+            return None
+        root_joint = selection[0]
+
+    if source_frame is None:
+        source_frame = 0 if take else int(cmds.currentTime(q=True))
+
+    timer = StageTimer()
+    cmds.undoInfo(openChunk=True, chunkName="mocapPrep")
+    try:
+        with timer.stage("collect"):
+            all_joints = get_all_descendants(root_joint)
+            curves = [] if take else collect_curves(all_joints)
+
+        if take:
+            with timer.stage("ingest"):
+                curves = ingest_take(take, all_joints, start_frame, source_frame)
+        else:
+            with timer.stage("shift"):
+                shift_curves(curves, start_frame - source_frame)
+
+            with timer.stage("trim"):
+                trim_curves(curves, start_frame)
+
+        if filter_method or lock_feet:
+            with timer.stage("filter"):
+                filter_joint_curves(all_joints, filter_method, filter_settings, lock_feet)
+
+        with timer.stage("rest pose"):
+            insert_rest_pose(all_joints, rest_frame)
+
+        if simplify:
+            with timer.stage("simplify"):
+                simplify_joint_curves(all_joints, simplify_tolerances)
+
+        with timer.stage("finish"):
+            cmds.select(all_joints)
+            cmds.currentTime(rest_frame)  # Move the playback head to the rest frame
+            cmds.playbackOptions(min=start_frame)  # Set playback range start
+    finally:
+        cmds.undoInfo(closeChunk=True)
 
-    move_animation_to_1001(all_joints)
-    delete_before_1001(all_joints)
-    insert_zero_rotation_key_at_990(all_joints)
+    timings = timer.as_dict()
+    timings.update({"joints": len(all_joints), "curves": len(curves)})
+    PREP_TIMINGS.append(timings)
 
-    cmds.select(all_joints)
-    cmds.currentTime(990)  # Move the playback head to frame 990
-    cmds.playbackOptions(min=1001)  # Set playback range start to 1001
-    print("Mocap prep complete: animation moved, early keys deleted, 990f zero rotation added.")
+    timer.report("Mocap prep ({0} joints, {1} curves)".format(len(all_joints), len(curves)))
+    print("Mocap prep complete: animation moved to {0}, earlier keys deleted, {1}f zero rotation added.".format(
+        start_frame, rest_frame
+    ))
+    return all_joints
 
-run_motion_prep()
+# Skipped under mayapy so the prep steps can be imported headless
+if not cmds.about(batch=True):
+    run_motion_prep()
@@ -1,94 +1,1179 @@
 import maya.cmds as cmds
+import maya.api.OpenMaya as om
+import maya.api.OpenMayaAnim as oma
+import csv
+import hashlib
 import json
+import mmap
 import os
+import sqlite3
+import struct
+import sys
+import time
+import zlib
+from array import array
+
+
+# Tangent settings stored per key next to time and value
+TANGENT_FIELDS = ["inTangentType", "outTangentType", "inAngle", "outAngle", "inWeight", "outWeight"]
+
+CURVE_TYPES = {
+    "animCurveTL": oma.MFnAnimCurve.kAnimCurveTL,
+    "animCurveTA": oma.MFnAnimCurve.kAnimCurveTA,
+    "animCurveTU": oma.MFnAnimCurve.kAnimCurveTU,
+    "animCurveTT": oma.MFnAnimCurve.kAnimCurveTT,
+}
+
+TANGENT_TYPES = {
+    "auto": oma.MFnAnimCurve.kTangentAuto,
+    "clamped": oma.MFnAnimCurve.kTangentClamped,
+    "fixed": oma.MFnAnimCurve.kTangentFixed,
+    "flat": oma.MFnAnimCurve.kTangentFlat,
+    "linear": oma.MFnAnimCurve.kTangentLinear,
+    "plateau": oma.MFnAnimCurve.kTangentPlateau,
+    "spline": oma.MFnAnimCurve.kTangentSmooth,
+    "step": oma.MFnAnimCurve.kTangentStep,
+    "stepnext": oma.MFnAnimCurve.kTangentStepNext,
+}
+
+# Binary pose file layout (little-endian):
+#   header   magic, version, flags, curve count
+#   table    per curve: name length, utf-8 name, key count, weighted, block offset, block size
+#   blocks   per curve: float64 arrays for FLOAT_FIELDS one after another, then
+#            uint8 in/out tangent type codes; each block zlib-compressed when flagged
+POSE_MAGIC = b"YPOS"
+POSE_VERSION = 1
+POSE_EXTENSION = ".pose"
+FLAG_COMPRESSED = 1
+
+HEADER = struct.Struct("<4sHHI")
+NAME_LENGTH = struct.Struct("<H")
+TABLE_ENTRY = struct.Struct("<IBQQ")
+
+FLOAT_FIELDS = ["time", "value", "inAngle", "outAngle", "inWeight", "outWeight"]
+FLOAT_DEFAULTS = {"inAngle": 0.0, "outAngle": 0.0, "inWeight": 1.0, "outWeight": 1.0}
+
+TANGENT_TYPE_NAMES = sorted(TANGENT_TYPES)
+NO_TANGENT_TYPE = 255
+
+LAST_COPY_FILE = "paste_pose_last" + POSE_EXTENSION
+
+# Pose library: poses live under LIBRARY_DIR/<character>/<name>.pose with a <name>.jpg thumbnail
+LIBRARY_INDEX = ".pose_index.sqlite"
+LIBRARY_FOLDER = "pose_library"
+THUMBNAIL_EXTENSION = ".jpg"
+THUMBNAIL_SIZE = (128, 128)
+
+# Name remapping on paste, stored as JSON in this optionVar
+REMAP_OPTION = "pastePoseRemap"
+REMAP_SECTIONS = ["namespaces", "prefixes", "suffixes", "names"]
+REMAP_FILE_FILTER = "Remap JSON (*.json);;Remap CSV (*.csv);;All Files (*.*)"
+UNMATCHED_REPORT_LIMIT = 20
+
+
+def read_curve_keys(curve, selected=True):
+    """
+    Read keys of one curve with a fixed number of queries, whatever the key count.
+
+    Times and values come back from a single keyframe query; each tangent
+    field is one keyTangent query over all the keys' indices.
+    """
+    flags = {"query": True}
+    if selected:
+        flags["selected"] = True
+
+    pairs = cmds.keyframe(curve, timeChange=True, valueChange=True, **flags) or []
+    if not pairs:
+        return []
+
+    indices = cmds.keyframe(curve, indexValue=True, **flags)
+    index_flag = [(index, index) for index in indices]
+
+    tangents = {}
+    for field in TANGENT_FIELDS:
+        tangents[field] = cmds.keyTangent(curve, query=True, index=index_flag, **{field: True})
+    weighted = bool(cmds.keyTangent(curve, query=True, weightedTangents=True)[0])
+
+    keys = []
+    for position in range(len(indices)):
+        entry = {"time": pairs[position * 2], "value": pairs[position * 2 + 1], "weighted": weighted}
+        for field in TANGENT_FIELDS:
+            entry[field] = tangents[field][position]
+        keys.append(entry)
+
+    return keys
 
 
 def copy_selected_keyframes(*_):
     """Copy only selected keyframes and save them into memory"""
-    selected_keys = cmds.keyframe(query=True, selected=True, name=True)
-    if not selected_keys:
+    selected_curves = cmds.keyframe(query=True, selected=True, name=True)
+    if not selected_curves:
         cmds.warning("No keyframes selected.")
         return None
 
     data = {}
-    for key in selected_keys:
-        curve = key.split(".")[0]
-        times = cmds.keyframe(key, query=True, selected=True, timeChange=True)
-        values = cmds.keyframe(key, query=True, selected=True, valueChange=True)
-
-        if curve not in data:
-            data[curve] = []
-        for t, v in zip(times, values):
-            data[curve].append({"time": t, "value": v})
-
-    # Save data into memory
-    cmds.optionVar(stringValue=("lastCopiedKeys", json.dumps(data)))
+    for curve in dict.fromkeys(selected_curves):
+        keys = read_curve_keys(curve)
+        if keys:
+            data[curve] = keys
+
+    # Save data to a binary file; the optionVar only keeps its path
+    path = get_last_copy_path()
+    write_pose_binary(path, data, compress=False)
+    cmds.optionVar(stringValue=("lastCopiedKeysFile", path))
+    if cmds.optionVar(exists="lastCopiedKeys"):
+        cmds.optionVar(remove="lastCopiedKeys")
     print("Copied selected keyframes.")
     return data
 
 
-def paste_keyframes_at_current_time(data=None, *_):
-    """Paste copied keyframes at the current time, keeping relative spacing"""
+def to_internal_value(value, curve_type):
+    """Convert a UI-unit key value to the internal unit the API expects"""
+    if curve_type == oma.MFnAnimCurve.kAnimCurveTA:
+        return om.MAngle(value, om.MAngle.uiUnit()).asRadians()
+    if curve_type == oma.MFnAnimCurve.kAnimCurveTL:
+        return om.MDistance(value, om.MDistance.uiUnit()).asCentimeters()
+    return value
+
+
+def build_temp_curve(curve_type, keys, time_offset):
+    """
+    Build an unconnected anim curve holding the keys shifted by time_offset.
+
+    Built through the API so it costs no command calls and never enters
+    the undo queue; delete it with delete_temp_curve.
+    """
+    unit = om.MTime.uiUnit()
+    times = om.MTimeArray([om.MTime(entry["time"] + time_offset, unit) for entry in keys])
+    values = om.MDoubleArray([to_internal_value(entry["value"], curve_type) for entry in keys])
+
+    curve_fn = oma.MFnAnimCurve()
+    temp_curve = curve_fn.create(curve_type)
+    curve_fn.addKeys(times, values, oma.MFnAnimCurve.kTangentGlobal, oma.MFnAnimCurve.kTangentGlobal)
+
+    if keys[0].get("weighted"):
+        curve_fn.setIsWeighted(True)
+
+    for index, entry in enumerate(keys):
+        # Angles first: the tangent types below decide whether Maya keeps them.
+        # Keys saved without tangent types keep the curve's default tangents.
+        if "inAngle" in entry and "inTangentType" in entry:
+            curve_fn.setTangent(index, om.MAngle(entry["inAngle"], om.MAngle.kDegrees), entry.get("inWeight", 1.0), True)
+            curve_fn.setTangent(index, om.MAngle(entry["outAngle"], om.MAngle.kDegrees), entry.get("outWeight", 1.0), False)
+        if entry.get("inTangentType") in TANGENT_TYPES:
+            curve_fn.setInTangentType(index, TANGENT_TYPES[entry["inTangentType"]])
+        if entry.get("outTangentType") in TANGENT_TYPES:
+            curve_fn.setOutTangentType(index, TANGENT_TYPES[entry["outTangentType"]])
+
+    return temp_curve
+
+
+def delete_temp_curve(temp_curve):
+    """Delete a curve made by build_temp_curve without touching the undo queue"""
+    modifier = om.MDGModifier()
+    modifier.deleteNode(temp_curve)
+    modifier.doIt()
+
+
+def paste_curve_keys(curve, keys, time_offset):
+    """
+    Paste all keys of one curve with one copyKey and one pasteKey call.
+
+    The keys are staged on a temporary curve, so pasteKey merges them with
+    full tangent information. This replaces Maya's key clipboard.
+    """
+    if not cmds.objExists(curve):
+        cmds.warning("Curve not found, skipped: " + curve)
+        return False
+
+    curve_type = CURVE_TYPES.get(cmds.nodeType(curve))
+    if curve_type is None:
+        cmds.warning("Not a time based anim curve, skipped: " + curve)
+        return False
+
+    keys = sorted(keys, key=lambda entry: entry["time"])
+    temp_curve = build_temp_curve(curve_type, keys, time_offset)
+
+    try:
+        temp_name = om.MFnDependencyNode(temp_curve).name()
+        cmds.copyKey(temp_name)
+        cmds.pasteKey(curve, time=(keys[0]["time"] + time_offset,), option="merge")
+    finally:
+        delete_temp_curve(temp_curve)
+
+    return True
+
+
+def paste_keyframes_at_current_time(data=None, remap=None, targets=None):
+    """
+    Paste copied keyframes at the current time, keeping relative spacing.
+
+    Curve names go through remap (a RemapRules, default: the saved remap
+    settings) first; targets limits the paste to those curves. Curves
+    without a match in the scene are skipped and reported together.
+    """
     # If called from button, data may be a bool, ignore it
     if not isinstance(data, dict):
-        if not cmds.optionVar(exists="lastCopiedKeys"):
+        data = load_last_copy()
+        if not data:
             cmds.warning("No copied keyframe data found.")
             return
-        data = json.loads(cmds.optionVar(query="lastCopiedKeys"))
+    if not isinstance(remap, RemapRules):
+        remap = get_remap_rules()
+
+    data, unmatched = remap_pose_data(data, remap)
+    if targets is not None:
+        targets = set(targets)
+        data = dict((curve, keys) for curve, keys in data.items() if curve in targets)
+
+    report_unmatched(unmatched)
+    if not data:
+        cmds.warning("No matching curves to paste onto.")
+        return
 
     current_time = cmds.currentTime(query=True)
     earliest_time = min(t["time"] for keys in data.values() for t in keys)
 
-    for curve, keys in data.items():
-        for entry in keys:
-            offset = entry["time"] - earliest_time
-            new_time = current_time + offset
-            cmds.setKeyframe(curve, time=new_time, value=entry["value"])
+    # One undo step for the whole pose
+    cmds.undoInfo(openChunk=True, chunkName="pastePose")
+    try:
+        for curve, keys in data.items():
+            if keys:
+                paste_curve_keys(curve, keys, current_time - earliest_time)
+    finally:
+        cmds.undoInfo(closeChunk=True)
 
     print("Pasted keyframes at current time.")
 
 
+class CommandCounter(object):
+    """Stand-in for maya.cmds that counts every command call"""
+
+    def __init__(self, module):
+        self.module = module
+        self.calls = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self.module, name)
+        if not callable(attr):
+            return attr
+
+        def counted(*args, **kwargs):
+            self.calls += 1
+            return attr(*args, **kwargs)
+
+        return counted
+
+
+def benchmark_copy_paste(*_):
+    """
+    Copy the selected keys, paste them at the current time and report command calls per key.
+
+    Example:
+        select keys in the Graph Editor, move to the paste frame, then
+        Paste_Pose_Tool.benchmark_copy_paste()
+    """
+    global cmds
+    original_cmds = cmds
+    counter = CommandCounter(original_cmds)
+    cmds = counter
+
+    try:
+        start = time.perf_counter()
+        data = copy_selected_keyframes()
+        copy_seconds = time.perf_counter() - start
+        copy_calls = counter.calls
+        if not data:
+            return None
+
+        counter.calls = 0
+        start = time.perf_counter()
+        paste_keyframes_at_current_time(data)
+        paste_seconds = time.perf_counter() - start
+        paste_calls = counter.calls
+    finally:
+        cmds = original_cmds
+
+    key_count = sum(len(keys) for keys in data.values())
+    print("{0} keys on {1} curves".format(key_count, len(data)))
+    print("Copy:  {0} calls ({1:.2f} per key) in {2:.3f}s".format(copy_calls, float(copy_calls) / key_count, copy_seconds))
+    print("Paste: {0} calls ({1:.2f} per key) in {2:.3f}s".format(paste_calls, float(paste_calls) / key_count, paste_seconds))
+
+    return {
+        "keys": key_count,
+        "curves": len(data),
+        "copy_calls": copy_calls,
+        "copy_seconds": copy_seconds,
+        "paste_calls": paste_calls,
+        "paste_seconds": paste_seconds,
+    }
+
+
+# ------------------------------------------------------------
+# Name remapping
+# ------------------------------------------------------------
+
+class RemapRules(object):
+    """
+    Rules that turn stored curve names into curve names in the scene.
+
+    namespaces: {old namespace: new namespace}, "" is the root namespace
+    prefixes / suffixes: {old: new} applied to the name without namespace
+    names: {stored curve: scene curve}, explicit and applied before the rest
+    """
+
+    def __init__(self, namespaces=None, prefixes=None, suffixes=None, names=None):
+        self.namespaces = dict(namespaces or {})
+        self.prefixes = dict(prefixes or {})
+        self.suffixes = dict(suffixes or {})
+        self.names = dict(names or {})
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**dict((section, data.get(section)) for section in REMAP_SECTIONS))
+
+    def to_dict(self):
+        return dict((section, getattr(self, section)) for section in REMAP_SECTIONS)
+
+    def update(self, other):
+        for section in REMAP_SECTIONS:
+            getattr(self, section).update(getattr(other, section))
+
+    def is_empty(self):
+        return not any(getattr(self, section) for section in REMAP_SECTIONS)
+
+    def compile(self, names):
+        """
+        Return {stored name: scene name} for all names.
+
+        Built once per paste: namespaces and explicit names are dict lookups,
+        prefix/suffix rules are tried longest first and the first match wins.
+        """
+        prefixes = sorted(self.prefixes.items(), key=lambda item: -len(item[0]))
+        suffixes = sorted(self.suffixes.items(), key=lambda item: -len(item[0]))
+        namespaces = self.namespaces
+        explicit = self.names
+
+        table = {}
+        for name in names:
+            if name in explicit:
+                table[name] = explicit[name]
+                continue
+
+            namespace, _, short = name.rpartition(":")
+            namespace = namespaces.get(namespace, namespace)
+
+            for old, new in prefixes:
+                if short.startswith(old):
+                    short = new + short[len(old):]
+                    break
+            for old, new in suffixes:
+                if short.endswith(old):
+                    short = short[:len(short) - len(old)] + new
+                    break
+
+            table[name] = namespace + ":" + short if namespace else short
+        return table
+
+
+def load_remap_file(filepath):
+    """
+    Read RemapRules from a JSON or CSV file.
+
+    JSON is either {stored curve: scene curve} or an object with any of the
+    sections namespaces, prefixes, suffixes and names. CSV rows are
+    stored,scene curve names; lines starting with # are skipped.
+    """
+    if os.path.splitext(filepath)[1].lower() == ".csv":
+        names = {}
+        with open(filepath, "r", newline="") as f:
+            for row in csv.reader(f):
+                row = [cell.strip() for cell in row]
+                if len(row) < 2 or not row[0] or row[0].startswith("#"):
+                    continue
+                names[row[0]] = row[1]
+        return RemapRules(names=names)
+
+    with open(filepath, "r") as f:
+        data = json.load(f)
+
+    if any(section in data for section in REMAP_SECTIONS):
+        return RemapRules.from_dict(data)
+    return RemapRules(names=data)
+
+
+def get_remap_settings():
+    """Return the saved remap settings: enabled, the rules of every section and a mapping file"""
+    settings = {"enabled": False, "namespaces": {}, "prefixes": {}, "suffixes": {}, "names": {}, "file": ""}
+    if cmds.optionVar(exists=REMAP_OPTION):
+        try:
+            settings.update(json.loads(cmds.optionVar(query=REMAP_OPTION)))
+        except ValueError:
+            cmds.warning("Ignoring invalid remap settings in optionVar " + REMAP_OPTION)
+    return settings
+
+
+def format_remap_rules(rules):
+    """Return {old: new} as one "old, new" line per rule, for editing in the remap window"""
+    return "\n".join("{0}, {1}".format(old, new) for old, new in rules.items())
+
+
+def parse_remap_rules(text, allow_empty_old=False):
+    """
+    Read "old, new" lines back into {old: new}.
+
+    Blank lines and lines starting with # are skipped; a line without a
+    comma maps to an empty name. Rules need an old name unless
+    allow_empty_old (the root namespace).
+    """
+    rules = {}
+    for line in text.splitlines():
+        if not line.strip() or line.strip().startswith("#"):
+            continue
+        old, _, new = line.partition(",")
+        old, new = old.strip(), new.strip()
+        if old or (allow_empty_old and new):
+            rules[old] = new
+    return rules
+
+
+def get_remap_rules():
+    """Return the saved RemapRules, or None if remapping is off"""
+    settings = get_remap_settings()
+    if not settings["enabled"]:
+        return None
+
+    rules = RemapRules.from_dict(settings)
+    if settings["file"]:
+        try:
+            file_rules = load_remap_file(settings["file"])
+        except (IOError, OSError, ValueError) as e:
+            cmds.warning("Could not read remap file {0}: {1}".format(settings["file"], e))
+        else:
+            # Rules typed in the UI win over the file
+            file_rules.update(rules)
+            rules = file_rules
+    return rules
+
+
+def remap_pose_data(data, rules=None):
+    """
+    Rename the curves of pose data and keep those that exist in the scene.
+
+    All targets are checked with one ls call. Returns (remapped data,
+    unmatched) where unmatched lists (stored name, target name, reason).
+    """
+    table = rules.compile(data) if rules else dict((name, name) for name in data)
+
+    existing = set(cmds.ls(list(set(table.values())), type="animCurve") or [])
+
+    remapped = {}
+    unmatched = []
+    for name, keys in data.items():
+        if not keys:
+            continue
+        target = table[name]
+        if target not in existing:
+            unmatched.append((name, target, "not found"))
+        elif target in remapped:
+            unmatched.append((name, target, "target already used"))
+        else:
+            remapped[target] = keys
+    return remapped, unmatched
+
+
+def report_unmatched(unmatched, limit=UNMATCHED_REPORT_LIMIT):
+    """Print the curves a paste skipped, with one warning for all of them"""
+    if not unmatched:
+        return
+
+    print("Unmatched curves ({0}):".format(len(unmatched)))
+    for name, target, reason in unmatched[:limit]:
+        if name == target:
+            print("  {0}: {1}".format(name, reason))
+        else:
+            print("  {0} -> {1}: {2}".format(name, target, reason))
+    if len(unmatched) > limit:
+        print("  ... and {0} more".format(len(unmatched) - limit))
+
+    cmds.warning("{0} curves had no match in the scene, see the Script Editor.".format(len(unmatched)))
+
+
+# ------------------------------------------------------------
+# Binary pose files
+# ------------------------------------------------------------
+
+def keys_to_block(keys):
+    """Pack one curve's keys into contiguous float64 arrays and tangent type codes"""
+    floats = array("d")
+    for field in FLOAT_FIELDS:
+        default = FLOAT_DEFAULTS.get(field, 0.0)
+        floats.extend(float(entry.get(field, default)) for entry in keys)
+
+    codes = bytearray()
+    for field in ["inTangentType", "outTangentType"]:
+        for entry in keys:
+            name = entry.get(field)
+            codes.append(TANGENT_TYPE_NAMES.index(name) if name in TANGENT_TYPES else NO_TANGENT_TYPE)
+
+    if sys.byteorder == "big":
+        floats.byteswap()
+
+    return floats.tobytes() + bytes(codes)
+
+
+def block_to_keys(block, key_count, weighted):
+    """Unpack a curve block written by keys_to_block"""
+    float_size = key_count * len(FLOAT_FIELDS) * 8
+
+    floats = array("d")
+    floats.frombytes(block[:float_size])
+    if sys.byteorder == "big":
+        floats.byteswap()
+    codes = block[float_size:float_size + key_count * 2]
+
+    keys = []
+    for index in range(key_count):
+        entry = {"weighted": weighted}
+        for position, field in enumerate(FLOAT_FIELDS):
+            entry[field] = floats[position * key_count + index]
+        for position, field in enumerate(["inTangentType", "outTangentType"]):
+            code = codes[position * key_count + index]
+            if code != NO_TANGENT_TYPE:
+                entry[field] = TANGENT_TYPE_NAMES[code]
+        keys.append(entry)
+
+    return keys
+
+
+def write_pose_binary(path, data, compress=True):
+    """Write pose data to a binary pose file, one independently readable block per curve"""
+    names = [name for name, keys in data.items() if keys]
+    blocks = []
+    for name in names:
+        block = keys_to_block(data[name])
+        blocks.append(zlib.compress(block) if compress else block)
+
+    encoded_names = [name.encode("utf-8") for name in names]
+    offset = HEADER.size + sum(NAME_LENGTH.size + len(name) + TABLE_ENTRY.size for name in encoded_names)
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(POSE_MAGIC, POSE_VERSION, FLAG_COMPRESSED if compress else 0, len(names)))
+
+        for name, encoded, block in zip(names, encoded_names, blocks):
+            keys = data[name]
+            f.write(NAME_LENGTH.pack(len(encoded)))
+            f.write(encoded)
+            f.write(TABLE_ENTRY.pack(len(keys), int(bool(keys[0].get("weighted"))), offset, len(block)))
+            offset += len(block)
+
+        for block in blocks:
+            f.write(block)
+
+
+class PoseFile(object):
+    """
+    Memory-mapped reader for binary pose files.
+
+    Opening only parses the header and curve table; each curve's block is
+    decoded when read_curve asks for it, so one curve can be pasted from
+    a large clip without reading the rest.
+
+    Example:
+        with PoseFile(path) as pose:
+            keys = pose.read_curve("pCube1_translateX")
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, flags, curve_count = HEADER.unpack_from(self.map, 0)
+        if magic != POSE_MAGIC:
+            self.close()
+            raise ValueError("Not a binary pose file: " + path)
+        if version > POSE_VERSION:
+            self.close()
+            raise ValueError("Pose file version {0} is newer than this tool".format(version))
+
+        self.compressed = bool(flags & FLAG_COMPRESSED)
+        self.table = {}
+        self.curves = []
+
+        position = HEADER.size
+        for _ in range(curve_count):
+            (name_length,) = NAME_LENGTH.unpack_from(self.map, position)
+            position += NAME_LENGTH.size
+            name = self.map[position:position + name_length].decode("utf-8")
+            position += name_length
+
+            self.table[name] = TABLE_ENTRY.unpack_from(self.map, position)
+            self.curves.append(name)
+            position += TABLE_ENTRY.size
+
+    def read_curve(self, name):
+        """Decode the keys of one curve"""
+        key_count, weighted, offset, size = self.table[name]
+        block = self.map[offset:offset + size]
+        if self.compressed:
+            block = zlib.decompress(block)
+        return block_to_keys(block, key_count, bool(weighted))
+
+    def curve_time_range(self, name):
+        """Return (first, last) key time of a curve, decoding only its time array"""
+        key_count, _, offset, size = self.table[name]
+        if not key_count:
+            return None
+
+        block = self.map[offset:offset + size]
+        if self.compressed:
+            block = zlib.decompressobj().decompress(block, key_count * 8)
+
+        first, = struct.unpack_from("<d", block, 0)
+        last, = struct.unpack_from("<d", block, (key_count - 1) * 8)
+        return first, last
+
+    def read_all(self, names=None):
+        """Decode several curves (all by default) into pose data"""
+        names = self.curves if names is None else [name for name in names if name in self.table]
+        return dict((name, self.read_curve(name)) for name in names)
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+def is_binary_pose_file(path):
+    """Return True if the file starts with the binary pose magic"""
+    with open(path, "rb") as f:
+        return f.read(len(POSE_MAGIC)) == POSE_MAGIC
+
+
+def load_pose_data(path, curves=None):
+    """Read a binary or JSON pose file, optionally only some curves"""
+    if is_binary_pose_file(path):
+        with PoseFile(path) as pose:
+            return pose.read_all(curves)
+
+    with open(path, "r") as f:
+        data = json.load(f)
+
+    if curves is None:
+        return data
+    return dict((name, data[name]) for name in curves if name in data)
+
+
+def save_pose_data(path, data, compress=True):
+    """Write pose data as JSON for .json paths, binary otherwise"""
+    if os.path.splitext(path)[1].lower() == ".json":
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+    else:
+        write_pose_binary(path, data, compress)
+
+
+def get_last_copy_path():
+    """Return the file that holds the last copied keys"""
+    return os.path.join(cmds.internalVar(userAppDir=True), LAST_COPY_FILE)
+
+
+def load_last_copy():
+    """Return the last copied keys, also reading the old JSON optionVar"""
+    if cmds.optionVar(exists="lastCopiedKeysFile"):
+        path = cmds.optionVar(query="lastCopiedKeysFile")
+        if os.path.isfile(path):
+            return load_pose_data(path)
+
+    if cmds.optionVar(exists="lastCopiedKeys"):
+        return json.loads(cmds.optionVar(query="lastCopiedKeys"))
+
+    return None
+
+
+POSE_FILE_FILTER = "Pose Binary (*.pose);;Pose JSON (*.json);;All Files (*.*)"
+
+
 def write_pose_file(*_):
-    """Copy currently selected keyframes and write them to a JSON file"""
+    """Copy currently selected keyframes and write them to a binary or JSON pose file"""
     data = copy_selected_keyframes()
     if not data:
         return
 
-    filepath = cmds.fileDialog2(fileMode=0, caption="Save Pose File")  # 0 = save file
+    filepath = cmds.fileDialog2(fileMode=0, caption="Save Pose File", fileFilter=POSE_FILE_FILTER)  # 0 = save file
     if filepath:
-        with open(filepath[0], "w") as f:
-            json.dump(data, f, indent=2)
-        print("Pose file written:", filepath[0])
+        path = filepath[0]
+        if not os.path.splitext(path)[1]:
+            path += POSE_EXTENSION
+        save_pose_data(path, data)
+        print("Pose file written:", path)
 
 
 def read_pose_file(*_):
     """Open a file dialog to choose file and read/paste keyframes"""
-    filepath = cmds.fileDialog2(fileMode=1, caption="Open Pose File")  # 1 = open file
+    filepath = cmds.fileDialog2(fileMode=1, caption="Open Pose File", fileFilter=POSE_FILE_FILTER)  # 1 = open file
     if not filepath:
         return
 
-    with open(filepath[0], "r") as f:
-        data = json.load(f)
+    data = load_pose_data(filepath[0])
     paste_keyframes_at_current_time(data)
 
 
+def read_pose_file_for_selection(*_):
+    """Paste only the curves of the selected objects from a pose file"""
+    selection = cmds.ls(selection=True)
+    curves = cmds.keyframe(selection, query=True, name=True) if selection else None
+    if not curves:
+        cmds.warning("Select animated objects to paste onto.")
+        return
+
+    filepath = cmds.fileDialog2(fileMode=1, caption="Open Pose File", fileFilter=POSE_FILE_FILTER)
+    if not filepath:
+        return
+
+    # Stored names only equal the selection's curves without remapping
+    remap = get_remap_rules()
+    data = load_pose_data(filepath[0], None if remap else curves)
+    if not data:
+        cmds.warning("No matching curves in " + filepath[0])
+        return
+    paste_keyframes_at_current_time(data, remap or RemapRules(), targets=curves)
+
+
+# ------------------------------------------------------------
+# Pose library
+# ------------------------------------------------------------
+
+class PoseLibrary(object):
+    """
+    Directory of pose files with a persistent SQLite index.
+
+    The index keeps name, character, curve names, frame span, content hash
+    and thumbnail per pose, so browsing and searching never opens the pose
+    files. refresh() only re-reads files whose size or modification time
+    changed; keys are loaded from disk only when a pose is pasted.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS poses (
+            path TEXT PRIMARY KEY,
+            name TEXT,
+            character TEXT,
+            start REAL,
+            end REAL,
+            curve_count INTEGER,
+            key_count INTEGER,
+            hash TEXT,
+            thumbnail TEXT,
+            mtime REAL,
+            size INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS pose_curves (
+            path TEXT,
+            curve TEXT
+        );
+        CREATE INDEX IF NOT EXISTS pose_curves_path ON pose_curves (path);
+        CREATE INDEX IF NOT EXISTS pose_curves_curve ON pose_curves (curve);
+        CREATE INDEX IF NOT EXISTS poses_character ON poses (character);
+    """
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self._connection = None
+
+    @property
+    def connection(self):
+        """Open the index on first use"""
+        if self._connection is None:
+            if not os.path.isdir(self.root):
+                os.makedirs(self.root)
+            self._connection = sqlite3.connect(os.path.join(self.root, LIBRARY_INDEX))
+            self._connection.executescript(self.SCHEMA)
+        return self._connection
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    # --------------------------------------------------------
+    # Indexing
+    # --------------------------------------------------------
+
+    def scan(self):
+        """Return {relative path: (mtime, size)} for every pose file under the root"""
+        found = {}
+        for folder, _, files in os.walk(self.root):
+            for filename in files:
+                if os.path.splitext(filename)[1].lower() not in (POSE_EXTENSION, ".json"):
+                    continue
+                path = os.path.join(folder, filename)
+                stat = os.stat(path)
+                found[os.path.relpath(path, self.root).replace(os.sep, "/")] = (stat.st_mtime, stat.st_size)
+        return found
+
+    def refresh(self):
+        """Bring the index up to date; returns (added or changed, removed) counts"""
+        found = self.scan()
+        indexed = dict(
+            (path, (mtime, size))
+            for path, mtime, size in self.connection.execute("SELECT path, mtime, size FROM poses")
+        )
+
+        changed = [path for path, stamp in found.items() if indexed.get(path) != stamp]
+        removed = [path for path in indexed if path not in found]
+
+        with self.connection:
+            for path in removed:
+                self.remove_entry(path)
+            for path in changed:
+                try:
+                    self.index_file(path, *found[path])
+                except Exception as e:
+                    print("Skipped pose file {0}: {1}".format(path, e))
+
+        return len(changed), len(removed)
+
+    def remove_entry(self, path):
+        self.connection.execute("DELETE FROM poses WHERE path = ?", (path,))
+        self.connection.execute("DELETE FROM pose_curves WHERE path = ?", (path,))
+
+    def index_file(self, path, mtime, size):
+        """Read one pose file's metadata into the index"""
+        full_path = os.path.join(self.root, path)
+
+        with open(full_path, "rb") as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+
+        if is_binary_pose_file(full_path):
+            with PoseFile(full_path) as pose:
+                curves = list(pose.curves)
+                spans = [pose.curve_time_range(name) for name in curves]
+                key_count = sum(pose.table[name][0] for name in curves)
+        else:
+            data = load_pose_data(full_path)
+            curves = list(data)
+            spans = [(keys[0]["time"], keys[-1]["time"]) for keys in (
+                sorted(data[name], key=lambda entry: entry["time"]) for name in curves
+            ) if keys]
+            key_count = sum(len(keys) for keys in data.values())
+
+        spans = [span for span in spans if span]
+        start = min(span[0] for span in spans) if spans else None
+        end = max(span[1] for span in spans) if spans else None
+
+        thumbnail = os.path.splitext(path)[0] + THUMBNAIL_EXTENSION
+        if not os.path.isfile(os.path.join(self.root, thumbnail)):
+            thumbnail = None
+
+        self.remove_entry(path)
+        self.connection.execute(
+            "INSERT INTO poses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (path, os.path.splitext(os.path.basename(path))[0], self.character_of(path, curves),
+             start, end, len(curves), key_count, digest, thumbnail, mtime, size)
+        )
+        self.connection.executemany("INSERT INTO pose_curves VALUES (?, ?)", [(path, curve) for curve in curves])
+
+    def character_of(self, path, curves):
+        """Character from the first sub-folder, else the curves' namespace"""
+        parts = path.split("/")
+        if len(parts) > 1:
+            return parts[0]
+        for curve in curves:
+            if ":" in curve:
+                return curve.rsplit(":", 1)[0]
+        return ""
+
+    # --------------------------------------------------------
+    # Browsing
+    # --------------------------------------------------------
+
+    def characters(self):
+        return [row[0] for row in self.connection.execute("SELECT DISTINCT character FROM poses ORDER BY character")]
+
+    def search(self, text="", character=None, limit=500):
+        """Return matching entries as dicts; text matches pose, character or curve names"""
+        query = "SELECT path, name, character, start, end, curve_count, key_count, hash, thumbnail FROM poses WHERE 1 = 1"
+        arguments = []
+
+        if character:
+            query += " AND character = ?"
+            arguments.append(character)
+
+        if text:
+            pattern = "%" + text + "%"
+            query += (" AND (name LIKE ? OR character LIKE ? OR path IN "
+                      "(SELECT path FROM pose_curves WHERE curve LIKE ?))")
+            arguments += [pattern, pattern, pattern]
+
+        query += " ORDER BY character, name LIMIT ?"
+        arguments.append(limit)
+
+        fields = ["path", "name", "character", "start", "end", "curve_count", "key_count", "hash", "thumbnail"]
+        return [dict(zip(fields, row)) for row in self.connection.execute(query, arguments)]
+
+    def full_path(self, path):
+        return os.path.join(self.root, path) if path else None
+
+    def load(self, entry, curves=None):
+        """Load an entry's keys from disk"""
+        return load_pose_data(self.full_path(entry["path"]), curves)
+
+    # --------------------------------------------------------
+    # Saving
+    # --------------------------------------------------------
+
+    def save_pose(self, name, data, character="", thumbnail=True):
+        """Write a pose into the library, capture its thumbnail and index it"""
+        folder = os.path.join(self.root, character) if character else self.root
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+
+        path = os.path.join(folder, name + POSE_EXTENSION)
+        write_pose_binary(path, data)
+
+        if thumbnail:
+            capture_thumbnail(os.path.splitext(path)[0] + THUMBNAIL_EXTENSION)
+
+        relative = os.path.relpath(path, self.root).replace(os.sep, "/")
+        stat = os.stat(path)
+        with self.connection:
+            self.index_file(relative, stat.st_mtime, stat.st_size)
+        return relative
+
+
+def capture_thumbnail(path, frame=None):
+    """Playblast a single frame of the active viewport to a jpg"""
+    if cmds.about(batch=True):
+        return None
+
+    frame = cmds.currentTime(query=True) if frame is None else frame
+    try:
+        cmds.playblast(
+            frame=[frame],
+            format="image",
+            compression="jpg",
+            completeFilename=path,
+            widthHeight=THUMBNAIL_SIZE,
+            percent=100,
+            showOrnaments=False,
+            viewer=False,
+            forceOverwrite=True
+        )
+    except RuntimeError as e:
+        print("Thumbnail capture failed:", e)
+        return None
+    return path
+
+
+def get_library_dir():
+    """Return the pose library folder, set with the optionVar poseLibraryDir"""
+    if cmds.optionVar(exists="poseLibraryDir"):
+        return cmds.optionVar(query="poseLibraryDir")
+    return os.path.join(cmds.internalVar(userAppDir=True), LIBRARY_FOLDER)
+
+
+_library = None
+
+
+def get_library():
+    """Return the shared PoseLibrary for the current library folder"""
+    global _library
+    root = os.path.abspath(get_library_dir())
+    if _library is None or _library.root != root:
+        if _library is not None:
+            _library.close()
+        _library = PoseLibrary(root)
+    return _library
+
+
+def show_library_ui(*_):
+    """Browse, search, save and paste poses from the library"""
+    if cmds.window("poseLibraryUI", exists=True):
+        cmds.deleteUI("poseLibraryUI")
+
+    library = get_library()
+    library.refresh()
+    entries = {}
+
+    window = cmds.window("poseLibraryUI", title="Pose Library", widthHeight=(420, 420))
+    cmds.columnLayout(adjustableColumn=True, rowSpacing=4, columnAttach=("both", 6))
+
+    cmds.text(label=library.root, align="left")
+    search_field = cmds.textFieldGrp(label="Search", columnWidth2=(60, 300), columnAlign=(1, "left"))
+    character_menu = cmds.optionMenu(label="Character")
+
+    cmds.rowLayout(numberOfColumns=2, columnWidth2=(280, 132), adjustableColumn=1)
+    pose_list = cmds.textScrollList(height=250)
+    thumbnail = cmds.image(width=THUMBNAIL_SIZE[0], height=THUMBNAIL_SIZE[1], visible=False)
+    cmds.setParent("..")
+
+    def fill_characters():
+        for item in cmds.optionMenu(character_menu, query=True, itemListLong=True) or []:
+            cmds.deleteUI(item)
+        cmds.menuItem(label="All", parent=character_menu)
+        for character in library.characters():
+            cmds.menuItem(label=character or "(none)", parent=character_menu)
+
+    def fill_list(*_):
+        character = cmds.optionMenu(character_menu, query=True, value=True)
+        if character == "All":
+            character = None
+        elif character == "(none)":
+            character = ""
+
+        cmds.textScrollList(pose_list, edit=True, removeAll=True)
+        entries.clear()
+        for entry in library.search(cmds.textFieldGrp(search_field, query=True, text=True), character):
+            label = "{0}  [{1}]  {2:g}-{3:g}".format(
+                entry["name"], entry["character"] or "-", entry["start"] or 0, entry["end"] or 0
+            )
+            entries[label] = entry
+            cmds.textScrollList(pose_list, edit=True, append=label)
+
+    def selected_entry():
+        selected = cmds.textScrollList(pose_list, query=True, selectItem=True)
+        return entries.get(selected[0]) if selected else None
+
+    def show_thumbnail(*_):
+        entry = selected_entry()
+        path = library.full_path(entry["thumbnail"]) if entry else None
+        if path and os.path.isfile(path):
+            cmds.image(thumbnail, edit=True, image=path, visible=True)
+        else:
+            cmds.image(thumbnail, edit=True, visible=False)
+
+    def paste_selected(*_):
+        entry = selected_entry()
+        if entry:
+            paste_keyframes_at_current_time(library.load(entry))
+
+    def save_selected(*_):
+        result = cmds.promptDialog(
+            title="Save Pose",
+            message="Pose name (character/name to file under a character):",
+            button=["Save", "Cancel"],
+            defaultButton="Save",
+            cancelButton="Cancel",
+            dismissString="Cancel"
+        )
+        if result != "Save":
+            return
+        text = cmds.promptDialog(query=True, text=True).strip()
+        if not text:
+            return
+
+        character, _, name = text.rpartition("/")
+        data = copy_selected_keyframes()
+        if not data:
+            return
+        library.save_pose(name, data, character)
+        fill_characters()
+        fill_list()
+
+    def refresh(*_):
+        changed, removed = library.refresh()
+        print("Pose library refreshed: {0} updated, {1} removed".format(changed, removed))
+        fill_characters()
+        fill_list()
+
+    cmds.textFieldGrp(search_field, edit=True, changeCommand=fill_list)
+    cmds.optionMenu(character_menu, edit=True, changeCommand=fill_list)
+    cmds.textScrollList(pose_list, edit=True, selectCommand=show_thumbnail, doubleClickCommand=paste_selected)
+
+    cmds.rowLayout(numberOfColumns=3, columnWidth3=(136, 136, 136))
+    cmds.button(label="Save Selected Keys", command=save_selected)
+    cmds.button(label="Paste", command=paste_selected)
+    cmds.button(label="Refresh", command=refresh)
+    cmds.setParent("..")
+
+    fill_characters()
+    fill_list()
+    cmds.showWindow(window)
+
+
+def show_remap_ui(*_):
+    """Edit the remap settings used by every paste, every rule of every section"""
+    if cmds.window("poseRemapUI", exists=True):
+        cmds.deleteUI("poseRemapUI")
+
+    settings = get_remap_settings()
+
+    window = cmds.window("poseRemapUI", title="Paste Remap", widthHeight=(360, 520))
+    cmds.columnLayout(adjustableColumn=True, rowSpacing=4, columnAttach=("both", 6))
+
+    enabled_field = cmds.checkBox(label="Remap curve names on paste", value=settings["enabled"])
+    cmds.text(label="One From, To rule per line. Empty namespace is the root namespace.", align="left")
+
+    fields = {}
+    for section, label in [("namespaces", "Namespaces"), ("prefixes", "Prefixes"),
+                           ("suffixes", "Suffixes"), ("names", "Curve names")]:
+        cmds.text(label=label, align="left")
+        fields[section] = cmds.scrollField(text=format_remap_rules(settings[section]), wordWrap=False, height=70)
+
+    cmds.rowLayout(numberOfColumns=2, columnWidth2=(290, 60), adjustableColumn=1)
+    file_field = cmds.textFieldGrp(label="Mapping file", text=settings["file"], columnWidth2=(70, 220), columnAlign=(1, "left"))
+
+    def browse(*_):
+        filepath = cmds.fileDialog2(fileMode=1, caption="Open Remap File", fileFilter=REMAP_FILE_FILTER)
+        if filepath:
+            cmds.textFieldGrp(file_field, edit=True, text=filepath[0])
+
+    cmds.button(label="Browse", command=browse)
+    cmds.setParent("..")
+
+    def save(*_):
+        # Start from the saved settings so nothing the window doesn't show is lost
+        new_settings = dict(settings)
+        new_settings["enabled"] = cmds.checkBox(enabled_field, query=True, value=True)
+        new_settings["file"] = cmds.textFieldGrp(file_field, query=True, text=True).strip()
+        for section, field in fields.items():
+            # A namespace rule from the root namespace is allowed, other rules need a match
+            new_settings[section] = parse_remap_rules(
+                cmds.scrollField(field, query=True, text=True),
+                allow_empty_old=section == "namespaces"
+            )
+        cmds.optionVar(stringValue=(REMAP_OPTION, json.dumps(new_settings)))
+        cmds.deleteUI(window)
+
+    cmds.button(label="Save", command=save)
+    cmds.showWindow(window)
+
+
 def show_ui():
     """Create UI with two button groups (Copy/Paste and Write/Read) with spacing"""
     if cmds.window("keyframeCopyPasteUI", exists=True):
         cmds.deleteUI("keyframeCopyPasteUI")
 
-    window = cmds.window("keyframeCopyPasteUI", title="Paste Pose Tool", widthHeight=(200, 150))
+    window = cmds.window("keyframeCopyPasteUI", title="Paste Pose Tool", widthHeight=(200, 230))
     layout = cmds.columnLayout(adjustableColumn=True, columnAlign="center")
 
     # Copy Paste
     cmds.button(label="Copy", command=copy_selected_keyframes)
     cmds.button(label="Paste", command=paste_keyframes_at_current_time)
+    cmds.button(label="Remap...", command=show_remap_ui)
 
     cmds.text(label="", height=10)
 
     # Read Write 
     cmds.button(label="Write", command=write_pose_file)
     cmds.button(label="Read", command=read_pose_file)
+    cmds.button(label="Read Selected", command=read_pose_file_for_selection)
+
+    cmds.text(label="", height=10)
+
+    # Library
+    cmds.button(label="Library", command=show_library_ui)
 
     cmds.showWindow(window)
 
@@ -1,10 +1,16 @@
 import re
-import math
+import time
+import random
 import builtins
+import functools
+import threading
 
 import maya.cmds as cmds
 import maya.api.OpenMaya as om
 import maya.OpenMayaUI as omui
+import maya.utils
+
+import numpy as np
 
 
 # ------------------------------------------------------------
@@ -12,10 +18,10 @@ import maya.OpenMayaUI as omui
 # ------------------------------------------------------------
 
 try:
-    from PySide6 import QtWidgets
+    from PySide6 import QtCore, QtWidgets
     from shiboken6 import wrapInstance
 except ImportError:
-    from PySide2 import QtWidgets
+    from PySide2 import QtCore, QtWidgets
     from shiboken2 import wrapInstance
 
 
@@ -52,6 +58,123 @@ LEG_CHAIN = [
 ]
 
 
+# Anatomy templates describe a skeleton topology as data.
+#
+# Every chain starts from an already predicted part ("parent", the COG
+# is always predicted) and follows one child per label:
+#   labels     parts along the chain
+#   sides      ["left", "right"] to trace one chain per side of the parent
+#   direction  up, down, lateral, lateral_back, forward or backward
+#   minimums   lowest accepted score per label (or "minimum" for the first
+#              label, later labels accept -1.0)
+#   depth      expected joints below the first label, or a [shortest,
+#              longest] range for chains that may end in a subtree such as
+#              fingers (default: the rest of the labels)
+#   segments   label that may be an unbranched run of joints, numbered
+#              label_01.. up to the first joint with three or more children
+#   numbered   follow the whole chain as label_01, label_02 .. label_end
+#   weights    per template multipliers of the depth, branch and
+#              direction scores
+BIPED_TEMPLATE = {
+    "name": "biped",
+    "chains": [
+        {
+            "parent": "cog",
+            "labels": CENTER_CHAIN[1:],
+            "direction": "up",
+            "minimums": [1.0, -1.0, 0.5, -1.0, -2.0],
+            "segments": "spine",
+        },
+        {
+            "parent": "cog",
+            "labels": LEG_CHAIN,
+            "sides": ["left", "right"],
+            "direction": "down",
+            "minimum": 0.0,
+        },
+        {
+            "parent": "chest",
+            "labels": ARM_CHAIN,
+            "sides": ["left", "right"],
+            "direction": "lateral",
+            # The wrist may carry fingers of up to five joints.
+            "depth": [3, 8],
+            "minimum": 0.0,
+        },
+    ],
+}
+
+QUADRUPED_TEMPLATE = {
+    "name": "quadruped",
+    "chains": [
+        {
+            "parent": "cog",
+            "labels": ["spine", "chest", "neck", "head", "head_end"],
+            "direction": "forward",
+            "depth": 6,
+            "minimums": [1.0, -1.0, 0.5, -1.0, -2.0],
+            "segments": "spine",
+        },
+        {
+            "parent": "cog",
+            "labels": ["hip", "knee", "hock", "back_paw", "back_paw_end"],
+            "sides": ["left", "right"],
+            "direction": "down",
+            "minimum": 0.0,
+        },
+        {
+            "parent": "chest",
+            "labels": ["scapula", "shoulder", "elbow", "front_paw", "front_paw_end"],
+            "sides": ["left", "right"],
+            "direction": "down",
+            "minimum": 0.0,
+        },
+        {
+            "parent": "cog",
+            "labels": ["tail"],
+            "direction": "backward",
+            "depth": 5,
+            "minimum": 0.0,
+            "numbered": True,
+        },
+    ],
+}
+
+WINGED_TEMPLATE = {
+    "name": "winged",
+    "chains": BIPED_TEMPLATE["chains"] + [
+        {
+            "parent": "chest",
+            "labels": ["wing_root", "wing_elbow", "wing_wrist", "wing_tip"],
+            "sides": ["left", "right"],
+            "direction": "lateral_back",
+            "minimum": 0.0,
+        },
+        {
+            "parent": "cog",
+            "labels": ["tail"],
+            "direction": "backward",
+            "depth": 5,
+            "minimum": 0.0,
+            "numbered": True,
+        },
+    ],
+}
+
+# Scored together on every analysis; the best fit names the skeleton.
+ANATOMY_TEMPLATES = [
+    BIPED_TEMPLATE,
+    QUADRUPED_TEMPLATE,
+    WINGED_TEMPLATE,
+]
+
+DEFAULT_WEIGHTS = {
+    "depth": 1.0,
+    "branch": 1.0,
+    "direction": 1.0,
+}
+
+
 # Only suggest anatomical names automatically for names that look generic.
 # This prevents the tool from constantly questioning custom names.
 GENERIC_NAME_PATTERNS = [
@@ -61,6 +184,17 @@ GENERIC_NAME_PATTERNS = [
     r"^bone\d*$",
 ]
 
+# All generic patterns as one alternation, compiled once.
+GENERIC_NAME_REGEX = re.compile(
+    "|".join("(?:{})".format(pattern) for pattern in GENERIC_NAME_PATTERNS),
+    re.IGNORECASE
+)
+
+NUMBERED_NAME_REGEX = re.compile(r"^(.*)_(\d+)$")
+
+# Distinct names remembered by the name classifiers.
+NAME_CACHE_SIZE = 4096
+
 
 # ------------------------------------------------------------
 # Basic utilities
@@ -117,16 +251,35 @@ def distance(a, b):
     return (get_world_position(a) - get_world_position(b)).length()
 
 
+@functools.lru_cache(maxsize=NAME_CACHE_SIZE)
+def is_generic_short_name(name):
+    """Return True if a short name looks like a default temporary name."""
+
+    return GENERIC_NAME_REGEX.match(name) is not None
+
+
 def is_generic_name(name):
     """Return True if a node name looks like a default temporary name."""
 
-    clean_name = short_name(name)
+    return is_generic_short_name(
+        short_name(name)
+    )
+
 
-    for pattern in GENERIC_NAME_PATTERNS:
-        if re.match(pattern, clean_name, re.IGNORECASE):
-            return True
+@functools.lru_cache(maxsize=NAME_CACHE_SIZE)
+def get_numbered_name_data(name):
+    """Return (base, number, digits) for names like arm_03, else None."""
+
+    match = NUMBERED_NAME_REGEX.match(name)
 
-    return False
+    if not match:
+        return None
+
+    return (
+        match.group(1),
+        int(match.group(2)),
+        len(match.group(2))
+    )
 
 
 def descendant_depth(joint, max_depth=20):
@@ -345,527 +498,1967 @@ def ask_yes_no(text):
     return dialog.exec() == QtWidgets.QMessageBox.Yes
 
 
+# ------------------------------------------------------------
+# Skeleton snapshot
+# ------------------------------------------------------------
+
+def read_skeleton(cog, levels=None):
+    """
+    Walk the joints below the COG once with an MItDag.
+
+    Only joints parented directly to another joint are followed,
+    like get_joint_children. levels limits how deep the walk goes.
+
+    Returns (paths, parents, positions, dag paths), breadth first.
+    """
+
+    selection = om.MSelectionList()
+    selection.add(cog)
+
+    iterator = om.MItDag()
+    iterator.reset(
+        selection.getDagPath(0),
+        om.MItDag.kBreadthFirst,
+        om.MFn.kJoint
+    )
+
+    paths = []
+    parents = []
+    positions = []
+    dag_paths = []
+
+    index = {}
+    level = []
+
+    while not iterator.isDone():
+
+        dag_path = iterator.getPath()
+        path = dag_path.fullPathName()
+
+        parent = index.get(
+            path.rpartition("|")[0],
+            -1
+        )
+
+        # Joints under a non-joint transform are not joint children.
+        if paths and parent < 0:
+            iterator.prune()
+            iterator.next()
+            continue
+
+        index[path] = len(paths)
+        level.append(level[parent] + 1 if parent >= 0 else 0)
+
+        matrix = dag_path.inclusiveMatrix()
+
+        paths.append(path)
+        parents.append(parent)
+        positions.append((matrix[12], matrix[13], matrix[14]))
+        dag_paths.append(dag_path)
+
+        if levels is not None and level[-1] >= levels:
+            iterator.prune()
+
+        iterator.next()
+
+    return paths, parents, positions, dag_paths
+
+
+class SkeletonSnapshot(object):
+    """
+    Flat, read-only arrays of one joint hierarchy.
+
+    The COG is index 0 and every parent comes before its children.
+    parents holds parent indices (-1 for the COG), children an index
+    array per joint, positions an (n, 3) array of world positions and
+    depths the capped descendant depth used by descendant_depth.
+
+    Nothing here touches Maya, so a snapshot can be scored anywhere.
+    """
+
+    def __init__(self, paths, parents, positions, max_depth=20):
+
+        self.paths = tuple(paths)
+
+        self.index = dict(
+            (path, index)
+            for index, path in enumerate(self.paths)
+        )
+
+        self.parents = np.asarray(parents, dtype=int).reshape(-1)
+        self.positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+
+        self.max_depth = max_depth
+
+        children = [[] for _ in self.paths]
+
+        for index, parent in enumerate(self.parents.tolist()):
+            if parent >= 0:
+                children[parent].append(index)
+
+        self.children = tuple(
+            np.array(child_list, dtype=int)
+            for child_list in children
+        )
+
+        self.child_counts = np.array(
+            [len(child_list) for child_list in children],
+            dtype=int
+        )
+
+        # Walking backwards fills every depth from already known children.
+        depths = [0] * len(self.paths)
+
+        for index in range(len(self.paths) - 1, 0, -1):
+
+            parent = self.parents[index]
+
+            depths[parent] = max(
+                depths[parent],
+                min(depths[index] + 1, max_depth)
+            )
+
+        self.depths = np.array(depths, dtype=int)
+
+        for array in [
+            self.parents,
+            self.positions,
+            self.child_counts,
+            self.depths,
+        ]:
+            array.flags.writeable = False
+
+    def __len__(self):
+
+        return len(self.paths)
+
+    @classmethod
+    def from_scene(cls, cog, levels=None, max_depth=20):
+        """Snapshot the joints below a COG in the current scene."""
+
+        paths, parents, positions, _ = read_skeleton(
+            cog,
+            levels
+        )
+
+        return cls(
+            paths,
+            parents,
+            positions,
+            max_depth
+        )
+
+    def with_positions(self, indices, positions):
+        """Return a copy sharing the hierarchy, with some joints moved."""
+
+        snapshot = object.__new__(SkeletonSnapshot)
+        snapshot.__dict__.update(self.__dict__)
+
+        moved = self.positions.copy()
+        moved[list(indices)] = positions
+        moved.flags.writeable = False
+
+        snapshot.positions = moved
+
+        return snapshot
+
+
+# ------------------------------------------------------------
+# Skeleton graph
+# ------------------------------------------------------------
+
+class SkeletonGraph(object):
+    """
+    Persistent snapshot of the joints below the COG.
+
+    Built with one MItDag walk. DAG, name and world matrix callbacks
+    only mark what changed: a moved joint has its position re-read on
+    the next lookup, a reparent, rename or delete rebuilds once.
+    Between changes current() returns the same snapshot object, so
+    results derived from it can be cached against it.
+    """
+
+    def __init__(self, cog, max_depth=20):
+
+        self.cog_handle = get_object_handle(cog)
+
+        self.max_depth = max_depth
+
+        self.snapshot = None
+        self.dag_paths = []
+        self.hashes = set()
+
+        self.topology_dirty = True
+        self.dirty_positions = set()
+
+        self.scene_callbacks = []
+        self.joint_callbacks = []
+
+    # --------------------------------------------------------
+    # Build
+    # --------------------------------------------------------
+
+    def rebuild(self):
+        """Walk the hierarchy and read every world position."""
+
+        self.clear_joint_callbacks()
+
+        self.snapshot = None
+        self.dag_paths = []
+        self.hashes = set()
+
+        self.topology_dirty = False
+        self.dirty_positions = set()
+
+        cog = path_from_handle(
+            self.cog_handle
+        )
+
+        if not cog:
+            return
+
+        paths, parents, positions, self.dag_paths = read_skeleton(
+            cog
+        )
+
+        self.snapshot = SkeletonSnapshot(
+            paths,
+            parents,
+            positions,
+            self.max_depth
+        )
+
+        self.hashes = set(
+            om.MObjectHandle(dag_path.node()).hashCode()
+            for dag_path in self.dag_paths
+        )
+
+        self.add_joint_callbacks()
+
+    def current(self):
+        """Return an up to date snapshot, or None if the COG is gone."""
+
+        if self.topology_dirty:
+            self.rebuild()
+
+        if self.dirty_positions and self.snapshot:
+
+            indices = sorted(self.dirty_positions)
+
+            positions = []
+
+            for index in indices:
+
+                matrix = self.dag_paths[index].inclusiveMatrix()
+
+                positions.append(
+                    (matrix[12], matrix[13], matrix[14])
+                )
+
+            self.snapshot = self.snapshot.with_positions(
+                indices,
+                positions
+            )
+
+        self.dirty_positions = set()
+
+        return self.snapshot
+
+    # --------------------------------------------------------
+    # Callbacks
+    # --------------------------------------------------------
+
+    def attach(self):
+        """Start tracking scene changes."""
+
+        if self.scene_callbacks:
+            return self
+
+        self.scene_callbacks = [
+            om.MDagMessage.addAllDagChangesCallback(
+                self.on_dag_changed
+            ),
+            om.MDGMessage.addNodeRemovedCallback(
+                self.on_node_changed,
+                "joint"
+            ),
+            om.MNodeMessage.addNameChangedCallback(
+                om.MObject(),
+                self.on_node_changed
+            ),
+        ]
+
+        self.current()
+
+        return self
+
+    def detach(self):
+        """Remove every callback."""
+
+        self.clear_joint_callbacks()
+
+        if self.scene_callbacks:
+            om.MMessage.removeCallbacks(
+                self.scene_callbacks
+            )
+
+        self.scene_callbacks = []
+
+    def add_joint_callbacks(self):
+
+        if not self.scene_callbacks:
+            return
+
+        for index, dag_path in enumerate(self.dag_paths):
+
+            self.joint_callbacks.append(
+                om.MDagMessage.addWorldMatrixModifiedCallback(
+                    dag_path,
+                    self.on_matrix_modified,
+                    index
+                )
+            )
+
+    def clear_joint_callbacks(self):
+
+        if self.joint_callbacks:
+            om.MMessage.removeCallbacks(
+                self.joint_callbacks
+            )
+
+        self.joint_callbacks = []
+
+    def on_dag_changed(self, message, child, parent, *args):
+
+        if self.topology_dirty:
+            return
+
+        for dag_path in [child, parent]:
+
+            try:
+                node = dag_path.node()
+            except Exception:
+                continue
+
+            if om.MObjectHandle(node).hashCode() in self.hashes:
+                self.topology_dirty = True
+                return
+
+    def on_node_changed(self, node, *args):
+        """Deleted or renamed joint: every path below it changes."""
+
+        if self.topology_dirty:
+            return
+
+        if om.MObjectHandle(node).hashCode() in self.hashes:
+            self.topology_dirty = True
+
+    def on_matrix_modified(self, node, modified, index):
+
+        self.dirty_positions.add(index)
+
+
 # ------------------------------------------------------------
 # Skeleton analysis
 # ------------------------------------------------------------
 
 class SkeletonAnalyzer(object):
+    """
+    Predict anatomical parts from a skeleton snapshot.
 
-    def __init__(self, cog):
+    Every anatomy template is matched against the same snapshot and
+    the best fitting one provides the mapping, keyed by full DAG path.
+    Scoring functions take an array of candidates and score them all
+    at once; child directions are shared between templates.
+    """
+
+    def __init__(self, cog, snapshot=None, templates=None):
 
         self.cog = cog
 
-        self.mapping = {}
+        if snapshot is None:
+            snapshot = SkeletonSnapshot.from_scene(cog)
+
+        self.snapshot = snapshot
+
+        self.matchers = get_matchers(templates)
+
+        self.unit_directions = {}
+
+        self.mapping = {}
+        self.template = None
+
+        # One entry per template: name, fit, mapped joints, seconds.
+        self.results = []
+
+    # --------------------------------------------------------
+    # Candidate scoring
+    # --------------------------------------------------------
+
+    def depth_score(self, joints, expected_depth):
+        """
+        Score candidates based on expected remaining chain depth.
+
+        expected_depth is a joint count or a (shortest, longest) range.
+        A chain that is much longer than expected is not automatically
+        considered better.
+        """
+
+        if isinstance(expected_depth, tuple):
+            shortest, longest = expected_depth
+        else:
+            shortest = longest = expected_depth
+
+        depths = self.snapshot.depths[joints]
+
+        difference = (
+            np.maximum(shortest - depths, 0)
+            + np.maximum(depths - longest, 0)
+        )
+
+        return np.select(
+            [
+                difference == 0,
+                difference == 1,
+                difference == 2,
+            ],
+            [
+                5.0,
+                3.5,
+                1.5,
+            ],
+            np.maximum(-2.0, 1.0 - difference)
+        )
+
+    def branch_penalty(self, joints):
+        """
+        Penalize excessive immediate branching.
+
+        Small branches are still allowed because rig components may
+        contain helper or accessory joints.
+        """
+
+        count = self.snapshot.child_counts[joints]
+
+        return np.where(
+            count <= 2,
+            0.0,
+            np.where(
+                count == 3,
+                -0.5,
+                -(count - 2) * 1.5
+            )
+        )
+
+    def directions(self, parent, children):
+        """Return unit vectors from a parent to each of its children."""
+
+        if parent not in self.unit_directions:
+
+            positions = self.snapshot.positions
+
+            delta = positions[self.snapshot.children[parent]] - positions[parent]
+
+            length = np.maximum(
+                np.sqrt((delta * delta).sum(axis=1)),
+                0.0001
+            )
+
+            self.unit_directions[parent] = delta / length[:, None]
+
+        # Child index arrays are sorted, so rows can be looked up.
+        rows = np.searchsorted(
+            self.snapshot.children[parent],
+            children
+        )
+
+        return self.unit_directions[parent][rows]
+
+    def central_up_score(self, parent, children):
+        """Score children that should continue upward near the center."""
+
+        direction = self.directions(
+            parent,
+            children
+        )
+
+        return direction[:, 1] * 4.0 - np.abs(direction[:, 0]) * 3.0
+
+    def forward_score(self, parent, children):
+        """Score children that should continue forward near the center."""
+
+        direction = self.directions(
+            parent,
+            children
+        )
+
+        return (
+            direction[:, 2] * 4.0 -
+            np.abs(direction[:, 0]) * 3.0 -
+            np.abs(direction[:, 1]) * 1.5
+        )
+
+    def backward_score(self, parent, children):
+        """Score children that should continue backward near the center."""
+
+        direction = self.directions(
+            parent,
+            children
+        )
+
+        return (
+            -direction[:, 2] * 4.0 -
+            np.abs(direction[:, 0]) * 3.0 -
+            np.abs(direction[:, 1]) * 1.5
+        )
+
+    def downward_score(self, parent, children):
+        """Score children expected to move downward."""
+
+        direction = self.directions(
+            parent,
+            children
+        )
+
+        return -direction[:, 1] * 4.0
+
+    def lateral_score(self, parent, children, side):
+        """Score children expected to move outward from the body."""
+
+        direction = self.directions(
+            parent,
+            children
+        )
+
+        if side == "left":
+            return direction[:, 0] * 4.0
+
+        return -direction[:, 0] * 4.0
+
+    def lateral_back_score(self, parent, children, side):
+        """Score children expected to move outward and backward."""
+
+        direction = self.directions(
+            parent,
+            children
+        )
+
+        x_direction = direction[:, 0]
+
+        if side != "left":
+            x_direction = -x_direction
+
+        return (x_direction - direction[:, 2]) * 2.8
+
+    def direction_score(self, direction_mode, parent, children, side):
+
+        if direction_mode == "up":
+            return self.central_up_score(parent, children)
+
+        if direction_mode == "down":
+            return self.downward_score(parent, children)
+
+        if direction_mode == "forward":
+            return self.forward_score(parent, children)
+
+        if direction_mode == "backward":
+            return self.backward_score(parent, children)
+
+        if direction_mode == "lateral":
+            return self.lateral_score(parent, children, side)
+
+        if direction_mode == "lateral_back":
+            return self.lateral_back_score(parent, children, side)
+
+        return 0.0
+
+    # --------------------------------------------------------
+    # Candidate selection
+    # --------------------------------------------------------
+
+    def choose_candidate(
+        self,
+        parent,
+        candidates,
+        expected_depth,
+        direction_mode=None,
+        side=None,
+        minimum_score=1.0,
+        weights=(1.0, 1.0, 1.0)
+    ):
+        """Choose the most structurally plausible child candidate."""
+
+        return self.score_candidate(
+            parent,
+            candidates,
+            expected_depth,
+            direction_mode,
+            side,
+            minimum_score,
+            weights
+        )[0]
+
+    def score_candidate(
+        self,
+        parent,
+        candidates,
+        expected_depth,
+        direction_mode=None,
+        side=None,
+        minimum_score=1.0,
+        weights=(1.0, 1.0, 1.0)
+    ):
+        """Return (best candidate, its score), or (None, 0.0)."""
+
+        candidates = np.asarray(candidates, dtype=int)
+
+        if not len(candidates):
+            return None, 0.0
+
+        depth_weight, branch_weight, direction_weight = weights
+
+        scores = self.depth_score(
+            candidates,
+            expected_depth
+        ) * depth_weight
+
+        scores = scores + self.branch_penalty(candidates) * branch_weight
+
+        if direction_mode:
+            scores = scores + self.direction_score(
+                direction_mode,
+                parent,
+                candidates,
+                side
+            ) * direction_weight
+
+        # Stable, so ties keep the child order like the list sort did.
+        order = np.argsort(
+            -scores,
+            kind="stable"
+        )
+
+        best_score = scores[order[0]]
+
+        if best_score < minimum_score:
+            return None, 0.0
+
+        # Avoid uncertain guesses when two candidates score almost equally.
+        if len(order) > 1:
+
+            second_score = scores[order[1]]
+
+            if abs(best_score - second_score) < 0.75:
+                return None, 0.0
+
+        return int(candidates[order[0]]), float(best_score)
+
+    def split_sides(self, parent, candidates):
+        """Split candidates into (left, right) of the parent on X."""
+
+        candidates = np.asarray(candidates, dtype=int)
+
+        x = self.snapshot.positions[candidates, 0]
+        parent_x = self.snapshot.positions[parent, 0]
+
+        return (
+            candidates[x > parent_x],
+            candidates[x < parent_x]
+        )
+
+    def spine_segments(self, spine):
+        """
+        Return (segments, chest) for a spine of several joints.
+
+        Segments are the unbranched run from the spine joint up to the
+        first joint with three or more children, which is the chest.
+        A single spine joint returns ([], None).
+        """
+
+        run = [spine]
+        current = spine
+
+        while self.snapshot.child_counts[current] == 1:
+
+            current = int(self.snapshot.children[current][0])
+
+            if self.snapshot.child_counts[current] >= 3:
+
+                if len(run) > 1:
+                    return run, current
+
+                return [], None
+
+            run.append(current)
+
+        return [], None
+
+    # --------------------------------------------------------
+    # Full analysis
+    # --------------------------------------------------------
+
+    def analyze(self, cancelled=None):
+        """
+        Match every template and keep the best fitting mapping.
+
+        cancelled is checked before each template; when it returns
+        True the analysis stops and returns None.
+        """
+
+        self.mapping = {}
+        self.template = None
+        self.results = []
+
+        if not self.cog:
+            return {}
+
+        if not self.snapshot or not len(self.snapshot):
+            return {}
+
+        best = None
+
+        for matcher in self.matchers:
+
+            if cancelled is not None and cancelled():
+                return None
+
+            start = time.perf_counter()
+
+            mapping, fit = matcher.match(self)
+
+            result = {
+                "template": matcher.name,
+                "fit": fit,
+                "mapped": len(mapping),
+                "seconds": time.perf_counter() - start,
+            }
+
+            self.results.append(result)
+
+            # Best fit first, then the template naming more joints.
+            key = (fit, len(mapping))
+
+            if best is None or key > best[0]:
+                best = (key, matcher.name, mapping)
+
+        _, self.template, self.mapping = best
+
+        return self.mapping
+
+    def report(self):
+        """Return one line per template: fit, joints named and time."""
+
+        return [
+            "{}{:<12} fit {:5.2f}  {:>4} joints  {:.2f}ms".format(
+                "* " if result["template"] == self.template else "  ",
+                result["template"],
+                result["fit"],
+                result["mapped"],
+                result["seconds"] * 1000.0
+            )
+            for result in self.results
+        ]
+
+
+# ------------------------------------------------------------
+# Anatomy templates
+# ------------------------------------------------------------
+
+DIRECTION_MODES = [
+    None,
+    "up",
+    "down",
+    "forward",
+    "backward",
+    "lateral",
+    "lateral_back",
+]
+
+# Compiled matchers by template name.
+MATCHERS = {}
+
+
+class TemplateMatcher(object):
+    """
+    An anatomy template compiled for matching.
+
+    Compiling checks the template once and turns every chain into a
+    tuple of steps (label, expected depth range, minimum score), so matching
+    is a single walk over the snapshot's child arrays.
+    """
+
+    def __init__(self, template):
+
+        self.name = template["name"]
+
+        weights = dict(DEFAULT_WEIGHTS)
+        weights.update(template.get("weights", {}))
+
+        self.weights = (
+            float(weights["depth"]),
+            float(weights["branch"]),
+            float(weights["direction"]),
+        )
+
+        self.chains = []
+
+        for chain in template["chains"]:
+
+            labels = list(chain["labels"])
+
+            if not labels:
+                raise ValueError(
+                    "Template {}: chain without labels".format(self.name)
+                )
+
+            direction = chain.get("direction")
+
+            if direction not in DIRECTION_MODES:
+                raise ValueError(
+                    "Template {}: unknown direction {!r}".format(self.name, direction)
+                )
+
+            minimums = chain.get("minimums")
+
+            if minimums is None:
+                minimums = [chain.get("minimum", 1.0)] + [-1.0] * (len(labels) - 1)
+
+            if len(minimums) != len(labels):
+                raise ValueError(
+                    "Template {}: {} minimums for {} labels".format(
+                        self.name,
+                        len(minimums),
+                        len(labels)
+                    )
+                )
+
+            depth = chain.get("depth", len(labels) - 1)
+
+            if isinstance(depth, (list, tuple)):
+                shortest, longest = depth
+            else:
+                shortest = longest = depth
+
+            steps = tuple(
+                (label, (shortest - index, longest - index), float(minimum))
+                for index, (label, minimum) in enumerate(zip(labels, minimums))
+            )
+
+            self.chains.append((
+                chain.get("parent", "cog"),
+                tuple(chain.get("sides") or [None]),
+                direction,
+                steps,
+                chain.get("segments"),
+                bool(chain.get("numbered")),
+            ))
+
+        self.label_count = sum(
+            len(steps) * len(sides)
+            for _, sides, _, steps, _, _ in self.chains
+        )
+
+    def match(self, analyzer):
+        """
+        Return (mapping, fit).
+
+        fit is the average score per template label, missing labels
+        counting as zero, so it rewards complete and well aligned
+        matches alike.
+        """
+
+        snapshot = analyzer.snapshot
+
+        mapping = {}
+        parts = {}
+        total = 0.0
+
+        def assign(joint, part, side):
+
+            mapping[snapshot.paths[joint]] = {
+                "part": part,
+                "side": side,
+            }
+
+            parts[(part, side)] = joint
+
+        assign(0, "cog", None)
+
+        for parent_part, sides, direction, steps, segments, numbered in self.chains:
+
+            for side in sides:
+
+                parent = parts.get((parent_part, side))
+
+                if parent is None:
+                    parent = parts.get((parent_part, None))
+
+                if parent is None:
+                    continue
+
+                candidates = [
+                    child
+                    for child in snapshot.children[parent].tolist()
+                    if snapshot.paths[child] not in mapping
+                ]
+
+                if side is not None:
+
+                    left, right = analyzer.split_sides(
+                        parent,
+                        candidates
+                    )
+
+                    candidates = left if side == "left" else right
+
+                label, depth, minimum = steps[0]
+
+                current, score = analyzer.score_candidate(
+                    parent,
+                    candidates,
+                    depth,
+                    direction,
+                    side,
+                    minimum,
+                    self.weights
+                )
+
+                if current is None:
+                    continue
+
+                if numbered:
+                    self.number_chain(snapshot, current, label, side, assign)
+                    total += score
+                    continue
+
+                for index, (label, depth, minimum) in enumerate(steps):
+
+                    assign(current, label, side)
+                    total += score
+
+                    if index == len(steps) - 1:
+                        break
+
+                    if label == segments:
+
+                        run, chest = analyzer.spine_segments(current)
+
+                        if run:
+
+                            for number, joint in enumerate(run, 1):
+                                assign(joint, "{}_{:02d}".format(label, number), side)
+
+                            current = chest
+                            continue
+
+                    children = snapshot.children[current]
+
+                    if not len(children):
+                        break
+
+                    next_joint, score = analyzer.score_candidate(
+                        current,
+                        children,
+                        steps[index + 1][1],
+                        direction,
+                        side,
+                        steps[index + 1][2],
+                        self.weights
+                    )
+
+                    if next_joint is None:
+                        break
+
+                    current = next_joint
+
+        return mapping, total / max(self.label_count, 1)
+
+    def number_chain(self, snapshot, joint, label, side, assign):
+        """Name an unbranched chain label_01, label_02 .. label_end."""
+
+        number = 1
+
+        while True:
+
+            children = snapshot.children[joint]
+
+            if not len(children):
+                assign(joint, label + "_end", side)
+                return
+
+            assign(joint, "{}_{:02d}".format(label, number), side)
+
+            # Stop numbering where the chain branches.
+            if len(children) != 1:
+                return
+
+            joint = int(children[0])
+            number += 1
+
+
+def compile_template(template):
+    """Compile (or recompile after editing) a template and cache it."""
+
+    matcher = TemplateMatcher(template)
+
+    MATCHERS[matcher.name] = matcher
+
+    return matcher
+
+
+def get_matchers(templates=None):
+    """Return compiled matchers, compiling each template only once."""
+
+    if templates is None:
+        templates = ANATOMY_TEMPLATES
+
+    matchers = []
+
+    for template in templates:
+
+        matcher = MATCHERS.get(template["name"])
+
+        if matcher is None:
+            matcher = compile_template(template)
+
+        matchers.append(matcher)
+
+    return matchers
+
+
+def register_template(template):
+    """Add or replace a template used by every analysis."""
+
+    for index, existing in enumerate(ANATOMY_TEMPLATES):
+
+        if existing["name"] == template["name"]:
+            ANATOMY_TEMPLATES[index] = template
+            break
+
+    else:
+        ANATOMY_TEMPLATES.append(template)
+
+    return compile_template(template)
+
+
+# ------------------------------------------------------------
+# Batch naming
+# ------------------------------------------------------------
+
+def number_finger_chains(snapshot, mapping):
+    """
+    Return predictions for the chains below each predicted wrist.
+
+    Every unmapped child chain of a wrist is a finger, numbered front
+    to back (+Z first). Its joints are numbered like continue_numbering
+    does and its last joint becomes the _end joint.
+    """
+
+    fingers = {}
+
+    for path, data in mapping.items():
+
+        if data["part"] != "wrist":
+            continue
+
+        wrist = snapshot.index.get(path)
+
+        if wrist is None:
+            continue
+
+        starts = [
+            child
+            for child in snapshot.children[wrist].tolist()
+            if snapshot.paths[child] not in mapping
+        ]
+
+        starts.sort(
+            key=lambda child: -snapshot.positions[child, 2]
+        )
+
+        for finger, current in enumerate(starts, 1):
+
+            number = 1
+
+            while True:
+
+                children = snapshot.children[current]
+
+                if not len(children):
+                    part = "finger{}_end".format(finger)
+                else:
+                    part = "finger{}_{:02d}".format(finger, number)
+
+                fingers[snapshot.paths[current]] = {
+                    "part": part,
+                    "side": data["side"],
+                }
+
+                # Stop numbering where the chain branches.
+                if len(children) != 1:
+                    break
+
+                current = int(children[0])
+                number += 1
+
+    return fingers
+
+
+def plan_batch_names(snapshot, mapping, character):
+    """
+    Return the proposed renames for a whole skeleton.
+
+    Rows are dicts with path, current, new, part, side and generic,
+    in snapshot order (parents before children). Joints already
+    carrying their proposed name are left out.
+    """
+
+    rows = []
+
+    for index, path in enumerate(snapshot.paths):
+
+        data = mapping.get(path)
+
+        if not data:
+            continue
+
+        current = short_name(path)
+
+        new_name = build_rig_name(
+            character,
+            data["part"],
+            data["side"]
+        )
+
+        if current == new_name:
+            continue
+
+        rows.append({
+            "path": path,
+            "current": current,
+            "new": new_name,
+            "part": data["part"],
+            "side": data["side"] or "",
+            "generic": is_generic_name(current),
+        })
+
+    return rows
+
+
+class BatchRenameDialog(QtWidgets.QDialog):
+    """Review table for every proposed rename of a skeleton."""
+
+    COLUMNS = [
+        "Current name",
+        "New name",
+        "Part",
+        "Side",
+    ]
+
+    def __init__(self, rows, parent=None, template=None):
+
+        super(BatchRenameDialog, self).__init__(parent)
+
+        self.rows = rows
+
+        self.setWindowTitle("Skeleton Naming Assistant - Batch")
+        self.resize(720, 520)
+
+        layout = QtWidgets.QVBoxLayout(self)
+
+        layout.addWidget(
+            QtWidgets.QLabel(
+                "{} proposed renames ({} template). Custom names are "
+                "unchecked; new names can be edited.".format(
+                    len(rows),
+                    template or "no"
+                )
+            )
+        )
+
+        self.table = QtWidgets.QTableWidget(
+            len(rows),
+            len(self.COLUMNS)
+        )
+
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setStretchLastSection(True)
+
+        read_only = QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable
+
+        for row, data in enumerate(rows):
+
+            current = QtWidgets.QTableWidgetItem(data["current"])
+            current.setFlags(read_only | QtCore.Qt.ItemIsUserCheckable)
+            current.setCheckState(
+                QtCore.Qt.Checked if data["generic"] else QtCore.Qt.Unchecked
+            )
+            current.setToolTip(data["path"])
+
+            self.table.setItem(row, 0, current)
+            self.table.setItem(row, 1, QtWidgets.QTableWidgetItem(data["new"]))
+
+            for column, key in [(2, "part"), (3, "side")]:
+
+                item = QtWidgets.QTableWidgetItem(data[key])
+                item.setFlags(read_only)
+
+                self.table.setItem(row, column, item)
+
+        self.table.resizeColumnsToContents()
+
+        layout.addWidget(self.table)
+
+        buttons = QtWidgets.QHBoxLayout()
+
+        for label, state in [
+            ("Check All", QtCore.Qt.Checked),
+            ("Check None", QtCore.Qt.Unchecked),
+        ]:
+
+            button = QtWidgets.QPushButton(label)
+            button.clicked.connect(
+                lambda *_, state=state: self.set_all_checked(state)
+            )
+
+            buttons.addWidget(button)
+
+        buttons.addStretch()
+
+        apply_button = QtWidgets.QPushButton("Rename")
+        apply_button.setDefault(True)
+        apply_button.clicked.connect(self.accept)
+
+        cancel_button = QtWidgets.QPushButton("Cancel")
+        cancel_button.clicked.connect(self.reject)
+
+        buttons.addWidget(apply_button)
+        buttons.addWidget(cancel_button)
+
+        layout.addLayout(buttons)
+
+    def set_all_checked(self, state):
+
+        for row in range(self.table.rowCount()):
+            self.table.item(row, 0).setCheckState(state)
+
+    def accepted_renames(self):
+        """Return (path, new name) for every checked row."""
+
+        renames = []
+
+        for row, data in enumerate(self.rows):
+
+            if self.table.item(row, 0).checkState() != QtCore.Qt.Checked:
+                continue
+
+            new_name = self.table.item(row, 1).text().strip()
+
+            if new_name and new_name != data["current"]:
+                renames.append(
+                    (data["path"], new_name)
+                )
+
+        return renames
+
+
+def apply_batch_renames(renames):
+    """
+    Rename joints in one undo chunk.
+
+    Deepest joints are renamed first, so the long paths of the joints
+    still waiting keep pointing at the same nodes.
+
+    Returns [(old path, new name)].
+    """
+
+    ordered = sorted(
+        renames,
+        key=lambda item: item[0].count("|"),
+        reverse=True
+    )
+
+    renamed = []
+
+    # Keep the listener from reacting to our own renames.
+    tool = getattr(
+        builtins,
+        TOOL_KEY,
+        None
+    )
+
+    if tool is not None:
+        tool.processing = True
+
+    cmds.undoInfo(openChunk=True, chunkName="Batch Rename Skeleton")
+
+    try:
+
+        for path, new_name in ordered:
+
+            if not cmds.objExists(path):
+                continue
+
+            renamed.append(
+                (path, cmds.rename(path, new_name))
+            )
+
+    finally:
+
+        cmds.undoInfo(closeChunk=True)
+
+        if tool is not None:
+
+            tool.processing = False
+
+            selected = tool.get_selected_joint()
+
+            if selected:
+                tool.remember_selection(
+                    selected
+                )
+
+    return renamed
+
+
+def batch_name_skeleton(cog=None):
+    """
+    Propose names for a whole skeleton and rename the accepted ones.
+
+    The COG is the given joint, the listener's COG when it is running,
+    or the selected joint. One analysis covers every joint.
+    """
+
+    tool = getattr(
+        builtins,
+        TOOL_KEY,
+        None
+    )
+
+    snapshot = None
+
+    if cog is None and tool is not None and tool.graph:
+        snapshot = tool.graph.current()
+
+    if snapshot is None:
+
+        if cog is None:
+
+            selection = cmds.ls(
+                selection=True,
+                long=True,
+                type="joint"
+            ) or []
+
+            if len(selection) != 1:
+                cmds.warning("Select the COG joint.")
+                return []
+
+            cog = selection[0]
+
+        snapshot = SkeletonSnapshot.from_scene(cog)
+
+    cog = snapshot.paths[0]
+
+    analyzer = SkeletonAnalyzer(
+        cog,
+        snapshot
+    )
+
+    mapping = dict(analyzer.analyze())
+
+    for line in analyzer.report():
+        print(line)
+
+    mapping.update(
+        number_finger_chains(
+            snapshot,
+            mapping
+        )
+    )
+
+    rows = plan_batch_names(
+        snapshot,
+        mapping,
+        get_character_name(cog)
+    )
+
+    if not rows:
+        cmds.inViewMessage(
+            amg='<hl>Nothing to rename</hl>',
+            pos='topCenter',
+            fade=True
+        )
+        return []
+
+    dialog = BatchRenameDialog(
+        rows,
+        maya_main_window(),
+        analyzer.template
+    )
+
+    if not dialog.exec():
+        return []
+
+    renamed = apply_batch_renames(
+        dialog.accepted_renames()
+    )
+
+    print(
+        "Skeleton Naming Assistant: renamed {} joints".format(
+            len(renamed)
+        )
+    )
+
+    return renamed
+
+
+# ------------------------------------------------------------
+# Benchmark
+# ------------------------------------------------------------
+
+def synthetic_skeleton(joint_count=500, seed=0, creature="biped"):
+    """
+    Build a biped (with fingers) or quadruped (with a tail) plus hair
+    chains, in pure Python.
+
+    Returns (paths, parents, positions) for SkeletonSnapshot; every
+    joint has a generic jointN name like a freshly drawn skeleton.
+    """
+
+    rng = random.Random(seed)
+
+    paths = []
+    parents = []
+    positions = []
+
+    def add(parent, position):
+
+        name = "joint{}".format(len(paths) + 1)
 
-    # --------------------------------------------------------
-    # Mapping
-    # --------------------------------------------------------
+        if parent < 0:
+            paths.append("|synthetic_ROOT|" + name)
+        else:
+            paths.append(paths[parent] + "|" + name)
 
-    def assign(self, joint, part, side=None):
-        """Assign an anatomical prediction to a joint."""
+        parents.append(parent)
+        positions.append(tuple(position))
 
-        if not joint:
-            return
+        return len(paths) - 1
 
-        if not cmds.objExists(joint):
-            return
+    def chain(parent, offsets):
 
-        self.mapping[joint] = {
-            "part": part,
-            "side": side,
-        }
+        current = parent
+        x, y, z = positions[parent]
 
-    # --------------------------------------------------------
-    # Candidate scoring
-    # --------------------------------------------------------
+        for dx, dy, dz in offsets:
+            x, y, z = x + dx, y + dy, z + dz
+            current = add(current, (x, y, z))
 
-    def depth_score(self, joint, expected_depth):
-        """
-        Score a candidate based on expected remaining chain depth.
+        return current
 
-        A chain that is much longer than expected is not automatically
-        considered better.
-        """
+    if creature == "quadruped":
 
-        depth = descendant_depth(joint)
+        # Z forward: a spine of three segments, legs under hips and
+        # chest, and a tail.
+        cog = add(-1, (0.0, 100.0, -40.0))
 
-        difference = abs(depth - expected_depth)
+        spine = chain(cog, [(0.0, 2.0, 15.0), (0.0, 2.0, 15.0), (0.0, 1.0, 15.0)])
+        chest = chain(spine, [(0.0, 0.0, 15.0)])
 
-        if difference == 0:
-            return 5.0
+        head_end = chain(chest, [(0.0, 15.0, 15.0), (0.0, 5.0, 15.0), (0.0, 0.0, 15.0)])
 
-        if difference == 1:
-            return 3.5
+        for sign in [1.0, -1.0]:
 
-        if difference == 2:
-            return 1.5
+            chain(cog, [
+                (10.0 * sign, -5.0, 0.0),
+                (0.0, -40.0, 5.0),
+                (0.0, -35.0, -8.0),
+                (0.0, -15.0, 3.0),
+                (0.0, 0.0, 8.0),
+            ])
 
-        return max(
-            -2.0,
-            1.0 - difference
-        )
+            chain(chest, [
+                (8.0 * sign, -8.0, 0.0),
+                (0.0, -35.0, 0.0),
+                (0.0, -35.0, 0.0),
+                (0.0, -17.0, 5.0),
+                (0.0, 0.0, 8.0),
+            ])
 
-    def branch_penalty(self, joint):
-        """
-        Penalize excessive immediate branching.
+        chain(cog, [(0.0, -1.0, -12.0)] * 8)
 
-        Small branches are still allowed because rig components may
-        contain helper or accessory joints.
-        """
+    else:
 
-        count = len(get_joint_children(joint))
+        cog = add(-1, (0.0, 100.0, 0.0))
 
-        if count <= 2:
-            return 0.0
+        spine = chain(cog, [(0.0, 10.0, 0.0)])
+        chest = chain(spine, [(0.0, 20.0, 0.0)])
 
-        if count == 3:
-            return -0.5
+        head_end = chain(chest, [(0.0, 20.0, 0.0), (0.0, 10.0, 0.0), (0.0, 15.0, 0.0)])
 
-        return -(count - 2) * 1.5
+        hands = []
 
-    def central_up_score(self, parent, child):
-        """Score a child that should continue upward near the center."""
+        for sign in [1.0, -1.0]:
 
-        parent_pos = get_world_position(parent)
-        child_pos = get_world_position(child)
+            chain(cog, [
+                (10.0 * sign, -5.0, 0.0),
+                (0.0, -45.0, 0.0),
+                (0.0, -42.0, 0.0),
+                (0.0, -7.0, 10.0),
+                (0.0, 0.0, 8.0),
+            ])
 
-        delta = child_pos - parent_pos
+            hands.append(chain(chest, [
+                (5.0 * sign, 15.0, 0.0),
+                (13.0 * sign, 0.0, 0.0),
+                (27.0 * sign, 0.0, 0.0),
+                (25.0 * sign, 0.0, 0.0),
+            ]))
 
-        length = max(delta.length(), 0.0001)
+        # Four joint fingers, spread along Z
+        for hand, sign in zip(hands, [1.0, -1.0]):
+            for finger in range(5):
+                chain(hand, [
+                    (3.0 * sign, 0.0, (finger - 2) * 1.5),
+                    (2.5 * sign, 0.0, 0.0),
+                    (2.0 * sign, 0.0, 0.0),
+                    (1.5 * sign, 0.0, 0.0),
+                ])
 
-        up = delta.y / length
-        side_motion = abs(delta.x) / length
+    # Hair chains from the head, branching off each other, until the
+    # joint count is reached. They stay out of the way of the limbs.
+    head = parents[head_end]
+    hair = [head]
 
-        score = 0.0
+    while len(paths) < joint_count:
 
-        score += up * 4.0
-        score -= side_motion * 3.0
+        parent = rng.choice(hair)
+        length = min(rng.randint(3, 8), joint_count - len(paths))
 
-        return score
+        step = (
+            rng.uniform(-3.0, 3.0),
+            rng.uniform(-3.0, 0.5),
+            rng.uniform(-3.0, 3.0)
+        )
 
-    def downward_score(self, parent, child):
-        """Score a child expected to move downward."""
+        first = len(paths)
 
-        parent_pos = get_world_position(parent)
-        child_pos = get_world_position(child)
+        chain(parent, [step] * length)
 
-        delta = child_pos - parent_pos
+        hair.extend(range(first, len(paths)))
 
-        length = max(delta.length(), 0.0001)
+    return paths, parents, positions
 
-        down = -delta.y / length
 
-        return down * 4.0
+def benchmark_analyzer(joint_count=500, repeats=20, seed=0, creature="biped"):
+    """
+    Time snapshot building and analysis on a synthetic skeleton.
 
-    def lateral_score(self, parent, child, side):
-        """Score a child expected to move outward from the body."""
+    Runs without touching the scene. Prints the time each anatomy
+    template took and which one was picked.
+    """
 
-        parent_pos = get_world_position(parent)
-        child_pos = get_world_position(child)
+    paths, parents, positions = synthetic_skeleton(
+        joint_count,
+        seed,
+        creature
+    )
 
-        delta = child_pos - parent_pos
+    start = time.perf_counter()
 
-        length = max(delta.length(), 0.0001)
+    for _ in range(repeats):
+        snapshot = SkeletonSnapshot(
+            paths,
+            parents,
+            positions
+        )
 
-        x_direction = delta.x / length
+    build = (time.perf_counter() - start) / repeats
 
-        if side == "left":
-            return x_direction * 4.0
+    start = time.perf_counter()
 
-        return -x_direction * 4.0
+    for _ in range(repeats):
 
-    # --------------------------------------------------------
-    # Candidate selection
-    # --------------------------------------------------------
+        analyzer = SkeletonAnalyzer(
+            paths[0],
+            snapshot
+        )
 
-    def choose_candidate(
-        self,
-        parent,
-        candidates,
-        expected_depth,
-        direction_mode=None,
-        side=None,
-        minimum_score=1.0
-    ):
-        """Choose the most structurally plausible child candidate."""
+        mapping = analyzer.analyze()
 
-        if not candidates:
-            return None
+    analysis = (time.perf_counter() - start) / repeats
 
-        scored = []
+    print(
+        "{} joints: snapshot {:.2f}ms, analysis {:.2f}ms, {} joints predicted".format(
+            len(paths),
+            build * 1000.0,
+            analysis * 1000.0,
+            len(mapping)
+        )
+    )
 
-        for child in candidates:
+    for line in analyzer.report():
+        print(line)
 
-            score = 0.0
+    return {
+        "joints": len(paths),
+        "snapshot": build,
+        "analysis": analysis,
+        "predicted": len(mapping),
+        "template": analyzer.template,
+        "templates": analyzer.results,
+    }
 
-            score += self.depth_score(
-                child,
-                expected_depth
-            )
 
-            score += self.branch_penalty(child)
+def check_batch_naming(joint_count=500, seed=0):
+    """
+    Check batch naming on the synthetic biped, without touching the scene.
 
-            if direction_mode == "up":
-                score += self.central_up_score(
-                    parent,
-                    child
-                )
+    Both arms and all five fingers of each hand must be named. Raises
+    RuntimeError listing the missing parts; returns the planned rows.
+    """
 
-            elif direction_mode == "down":
-                score += self.downward_score(
-                    parent,
-                    child
-                )
+    paths, parents, positions = synthetic_skeleton(
+        joint_count,
+        seed
+    )
 
-            elif direction_mode == "lateral":
-                score += self.lateral_score(
-                    parent,
-                    child,
-                    side
-                )
+    snapshot = SkeletonSnapshot(
+        paths,
+        parents,
+        positions
+    )
 
-            scored.append(
-                (score, child)
-            )
+    mapping = dict(
+        SkeletonAnalyzer(
+            paths[0],
+            snapshot
+        ).analyze()
+    )
 
-        scored.sort(
-            key=lambda item: item[0],
-            reverse=True
+    mapping.update(
+        number_finger_chains(
+            snapshot,
+            mapping
         )
+    )
 
-        best_score, best_joint = scored[0]
-
-        if best_score < minimum_score:
-            return None
+    rows = plan_batch_names(
+        snapshot,
+        mapping,
+        "synthetic"
+    )
 
-        # Avoid uncertain guesses when two candidates score almost equally.
-        if len(scored) > 1:
+    named = set(
+        (row["part"], row["side"])
+        for row in rows
+    )
 
-            second_score = scored[1][0]
+    expected = [
+        (part, side)
+        for side in ["left", "right"]
+        for part in ARM_CHAIN + [
+            "finger{}_01".format(finger)
+            for finger in range(1, 6)
+        ]
+    ]
 
-            if abs(best_score - second_score) < 0.75:
-                return None
+    missing = [
+        "{} {}".format(side, part)
+        for part, side in expected
+        if (part, side) not in named
+    ]
 
-        return best_joint
+    if missing:
+        raise RuntimeError(
+            "Batch naming missed: " + ", ".join(missing)
+        )
 
-    # --------------------------------------------------------
-    # Chain tracing
-    # --------------------------------------------------------
+    print(
+        "Batch naming check passed: {} renames planned".format(
+            len(rows)
+        )
+    )
 
-    def trace_chain(
-        self,
-        start_joint,
-        labels,
-        side=None,
-        direction_mode=None
-    ):
-        """
-        Trace a known anatomical chain.
+    return rows
 
-        The expected remaining depth becomes shorter at every step.
-        """
 
-        if not start_joint:
-            return
+def classify_name_reference(name):
+    """
+    Reference classifier: one re.match per pattern on every call.
 
-        current = start_joint
+    Used to check and time the compiled, memoized classifiers.
+    """
 
-        for index, label in enumerate(labels):
+    generic = False
 
-            if not current:
-                break
+    for pattern in GENERIC_NAME_PATTERNS:
+        if re.match(pattern, name, re.IGNORECASE):
+            generic = True
+            break
 
-            self.assign(
-                current,
-                label,
-                side
-            )
+    match = re.match(r"^(.*)_(\d+)$", name)
 
-            if index == len(labels) - 1:
-                break
+    if not match:
+        return generic, None
 
-            children = get_joint_children(current)
+    return generic, (
+        match.group(1),
+        int(match.group(2)),
+        len(match.group(2))
+    )
 
-            if not children:
-                break
 
-            expected_depth = len(labels) - index - 2
+def benchmark_name_events(event_count=100000, tracked_share=0.01, seed=0):
+    """
+    Time rename event handling on synthetic events.
 
-            next_joint = self.choose_candidate(
-                current,
-                children,
-                expected_depth,
-                direction_mode=direction_mode,
-                side=side,
-                minimum_score=-1.0
-            )
+    Each event is (node hash, new name). The reference classifies every
+    event like the NameChanged scriptJob path did; the filtered path
+    drops events for other nodes with one hash comparison and only
+    classifies the tracked joint's names, through the memoized
+    compiled regexes. Runs without touching the scene.
+    """
 
-            if not next_joint:
-                break
+    rng = random.Random(seed)
 
-            current = next_joint
+    pool = []
 
-    # --------------------------------------------------------
-    # Center skeleton
-    # --------------------------------------------------------
+    for index in range(2000):
 
-    def build_center_chain(self):
+        kind = index % 4
 
-        self.assign(
-            self.cog,
-            "cog"
-        )
+        if kind == 0:
+            pool.append("joint{}".format(index))
+        elif kind == 1:
+            pool.append("arm_{:02d}".format(index % 40))
+        elif kind == 2:
+            pool.append("char_jnt_rig_finger{}_{:02d}_left".format(index % 5, index % 4))
+        else:
+            pool.append("pCube{}".format(index))
 
-        cog_children = get_joint_children(self.cog)
+    tracked = 1
 
-        spine = self.choose_candidate(
-            self.cog,
-            cog_children,
-            expected_depth=4,
-            direction_mode="up",
-            minimum_score=1.0
+    events = [
+        (
+            tracked if rng.random() < tracked_share else rng.randrange(2, 1 << 30),
+            rng.choice(pool)
         )
+        for _ in range(event_count)
+    ]
 
-        if not spine:
-            return None, None
+    start = time.perf_counter()
 
-        self.assign(
-            spine,
-            "spine"
-        )
+    reference = [
+        classify_name_reference(name)
+        for _, name in events
+    ]
 
-        spine_children = get_joint_children(spine)
+    reference_time = time.perf_counter() - start
 
-        chest = self.choose_candidate(
-            spine,
-            spine_children,
-            expected_depth=3,
-            direction_mode="up",
-            minimum_score=-1.0
-        )
+    is_generic_short_name.cache_clear()
+    get_numbered_name_data.cache_clear()
 
-        if not chest:
-            return spine, None
+    start = time.perf_counter()
 
-        self.assign(
-            chest,
-            "chest"
-        )
+    handled = 0
 
-        chest_children = get_joint_children(chest)
+    for node_hash, name in events:
 
-        neck = self.choose_candidate(
-            chest,
-            chest_children,
-            expected_depth=2,
-            direction_mode="up",
-            minimum_score=0.5
-        )
+        if node_hash != tracked:
+            continue
 
-        if neck:
+        is_generic_short_name(name)
+        get_numbered_name_data(name)
 
-            self.assign(
-                neck,
-                "neck"
-            )
+        handled += 1
 
-            neck_children = get_joint_children(neck)
+    filtered_time = time.perf_counter() - start
 
-            head = self.choose_candidate(
-                neck,
-                neck_children,
-                expected_depth=1,
-                direction_mode="up",
-                minimum_score=-1.0
-            )
+    start = time.perf_counter()
 
-            if head:
+    compiled = [
+        (is_generic_short_name(name), get_numbered_name_data(name))
+        for _, name in events
+    ]
 
-                self.assign(
-                    head,
-                    "head"
-                )
+    compiled_time = time.perf_counter() - start
 
-                head_children = get_joint_children(head)
+    matches = compiled == reference
 
-                head_end = self.choose_candidate(
-                    head,
-                    head_children,
-                    expected_depth=0,
-                    direction_mode="up",
-                    minimum_score=-2.0
-                )
+    print(
+        "{} rename events: reference {:.1f}ms, compiled+memo {:.1f}ms, "
+        "filtered {:.1f}ms ({} handled), results match: {}".format(
+            event_count,
+            reference_time * 1000.0,
+            compiled_time * 1000.0,
+            filtered_time * 1000.0,
+            handled,
+            matches
+        )
+    )
 
-                if head_end:
+    return {
+        "events": event_count,
+        "reference": reference_time,
+        "compiled": compiled_time,
+        "filtered": filtered_time,
+        "handled": handled,
+        "matches": matches,
+    }
 
-                    self.assign(
-                        head_end,
-                        "head_end"
-                    )
 
-        return spine, chest
+# ------------------------------------------------------------
+# Background prediction
+# ------------------------------------------------------------
 
-    # --------------------------------------------------------
-    # Legs
-    # --------------------------------------------------------
+class PredictionWorker(object):
+    """
+    Analyze skeleton snapshots on a worker thread.
 
-    def build_legs(self, spine):
+    Only the latest request is kept: a new request replaces a waiting
+    one and makes a running one stop at its next template. Results
+    are handed to on_result on Maya's main thread, and only if no
+    newer request came in meanwhile. Errors are reported from the
+    main thread too.
 
-        candidates = get_joint_children(self.cog)
+    Snapshots never change once built, so the thread reads nothing
+    from the scene.
+    """
 
-        candidates = [
-            joint
-            for joint in candidates
-            if joint != spine
-        ]
+    def __init__(self, on_result):
 
-        cog_pos = get_world_position(self.cog)
+        self.on_result = on_result
 
-        left_candidates = []
-        right_candidates = []
+        self.condition = threading.Condition()
 
-        for joint in candidates:
+        self.generation = 0
+        self.pending = None
 
-            position = get_world_position(joint)
+        self.thread = None
+        self.running = False
 
-            if position.x > cog_pos.x:
-                left_candidates.append(joint)
+    def submit(self, joint, snapshot):
+        """Queue an analysis, dropping any older one."""
 
-            elif position.x < cog_pos.x:
-                right_candidates.append(joint)
+        with self.condition:
 
-        left_hip = self.choose_candidate(
-            self.cog,
-            left_candidates,
-            expected_depth=4,
-            direction_mode="down",
-            side="left",
-            minimum_score=0.0
-        )
+            self.generation += 1
+            self.pending = (self.generation, joint, snapshot)
 
-        right_hip = self.choose_candidate(
-            self.cog,
-            right_candidates,
-            expected_depth=4,
-            direction_mode="down",
-            side="right",
-            minimum_score=0.0
-        )
+            if not self.running:
 
-        if left_hip:
+                self.running = True
 
-            self.trace_chain(
-                left_hip,
-                LEG_CHAIN,
-                side="left",
-                direction_mode="down"
-            )
+                self.thread = threading.Thread(
+                    target=self.run,
+                    name="SkeletonNamingPrediction"
+                )
+                self.thread.daemon = True
+                self.thread.start()
 
-        if right_hip:
+            self.condition.notify()
 
-            self.trace_chain(
-                right_hip,
-                LEG_CHAIN,
-                side="right",
-                direction_mode="down"
-            )
+            return self.generation
 
-    # --------------------------------------------------------
-    # Arms
-    # --------------------------------------------------------
+    def cancel(self):
+        """Drop the waiting request and stop the running one."""
 
-    def build_arms(self, chest):
+        with self.condition:
 
-        if not chest:
-            return
+            self.generation += 1
+            self.pending = None
 
-        children = get_joint_children(chest)
+    def stop(self):
+        """Cancel everything and let the thread exit."""
 
-        mapped_center_children = []
+        with self.condition:
 
-        for joint in children:
+            self.generation += 1
+            self.pending = None
+            self.running = False
 
-            data = self.mapping.get(joint)
+            self.condition.notify()
 
-            if data:
-                if data["part"] == "neck":
-                    mapped_center_children.append(joint)
+        if self.thread is not None:
+            self.thread.join(1.0)
 
-        arm_candidates = [
-            joint
-            for joint in children
-            if joint not in mapped_center_children
-        ]
+        self.thread = None
 
-        chest_pos = get_world_position(chest)
+    def is_stale(self, generation):
 
-        left_candidates = []
-        right_candidates = []
+        return generation != self.generation
 
-        for joint in arm_candidates:
+    def run(self):
 
-            position = get_world_position(joint)
+        while True:
 
-            if position.x > chest_pos.x:
-                left_candidates.append(joint)
+            with self.condition:
 
-            elif position.x < chest_pos.x:
-                right_candidates.append(joint)
+                while self.running and self.pending is None:
+                    self.condition.wait()
 
-        left_clavicle = self.choose_candidate(
-            chest,
-            left_candidates,
-            expected_depth=3,
-            direction_mode="lateral",
-            side="left",
-            minimum_score=0.0
-        )
+                if not self.running:
+                    return
 
-        right_clavicle = self.choose_candidate(
-            chest,
-            right_candidates,
-            expected_depth=3,
-            direction_mode="lateral",
-            side="right",
-            minimum_score=0.0
-        )
+                generation, joint, snapshot = self.pending
+                self.pending = None
 
-        if left_clavicle:
+            try:
 
-            self.trace_chain(
-                left_clavicle,
-                ARM_CHAIN,
-                side="left",
-                direction_mode="lateral"
-            )
+                analyzer = SkeletonAnalyzer(
+                    snapshot.paths[0],
+                    snapshot
+                )
 
-        if right_clavicle:
+                mapping = analyzer.analyze(
+                    cancelled=lambda: self.is_stale(generation)
+                )
 
-            self.trace_chain(
-                right_clavicle,
-                ARM_CHAIN,
-                side="right",
-                direction_mode="lateral"
-            )
+            except Exception as error:
 
-    # --------------------------------------------------------
-    # Full analysis
-    # --------------------------------------------------------
+                # Script Editor output is not thread safe.
+                maya.utils.executeDeferred(
+                    self.report_error,
+                    joint,
+                    error
+                )
+                continue
 
-    def analyze(self):
+            if mapping is None or self.is_stale(generation):
+                continue
 
-        if not self.cog:
-            return {}
+            maya.utils.executeDeferred(
+                self.deliver,
+                generation,
+                joint,
+                snapshot,
+                mapping
+            )
 
-        if not cmds.objExists(self.cog):
-            return {}
+    def deliver(self, generation, joint, snapshot, mapping):
+        """Main thread: pass the result on unless it is already stale."""
 
-        spine, chest = self.build_center_chain()
+        if self.is_stale(generation):
+            return
 
-        self.build_legs(spine)
-        self.build_arms(chest)
+        self.on_result(
+            joint,
+            snapshot,
+            mapping
+        )
 
-        return self.mapping
+    def report_error(self, joint, error):
+        """Main thread: report a failed analysis."""
+
+        print(
+            "Skeleton Naming Assistant: prediction failed for {}: {}".format(
+                short_name(joint),
+                error
+            )
+        )
 
 
 # ------------------------------------------------------------
@@ -877,17 +2470,27 @@ class SkeletonNamingAssistant(object):
     def __init__(self):
 
         self.selection_job = None
-        self.rename_job = None
+        self.rename_callback = None
 
         self.processing = False
 
         self.selected_handle = None
+        self.selected_hash = None
         self.selected_name = None
 
         self.cog_handle = None
 
+        # Joint graph below the COG and the last analysis of it,
+        # as (snapshot, mapping).
+        self.graph = None
+        self.analysis = None
+
         self.first_cog_pending = True
 
+        self.predictor = PredictionWorker(
+            self.on_prediction
+        )
+
         self.last_prompted_joint = None
         self.last_prompted_name = None
 
@@ -905,12 +2508,12 @@ class SkeletonNamingAssistant(object):
             protected=True
         )
 
-        self.rename_job = cmds.scriptJob(
-            event=[
-                "NameChanged",
-                self.on_name_changed
-            ],
-            protected=True
+        # Unlike the NameChanged scriptJob, the callback says which node
+        # was renamed, so renames elsewhere in the scene are skipped
+        # before any path or name work.
+        self.rename_callback = om.MNodeMessage.addNameChangedCallback(
+            om.MObject(),
+            self.on_node_renamed
         )
 
         cmds.inViewMessage(
@@ -923,20 +2526,28 @@ class SkeletonNamingAssistant(object):
 
     def stop(self):
 
-        for job in [
-            self.selection_job,
-            self.rename_job
-        ]:
+        if self.selection_job:
+            if cmds.scriptJob(exists=self.selection_job):
+                cmds.scriptJob(
+                    kill=self.selection_job,
+                    force=True
+                )
 
-            if job:
-                if cmds.scriptJob(exists=job):
-                    cmds.scriptJob(
-                        kill=job,
-                        force=True
-                    )
+        if self.rename_callback is not None:
+            om.MMessage.removeCallback(
+                self.rename_callback
+            )
 
         self.selection_job = None
-        self.rename_job = None
+        self.rename_callback = None
+
+        self.predictor.stop()
+
+        if self.graph:
+            self.graph.detach()
+
+        self.graph = None
+        self.analysis = None
 
         cmds.inViewMessage(
             amg='<hl>Skeleton Naming Assistant: OFF</hl>',
@@ -971,11 +2582,14 @@ class SkeletonNamingAssistant(object):
                 joint
             )
 
+            self.selected_hash = self.selected_handle.hashCode()
+
             self.selected_name = short_name(joint)
 
         except Exception:
 
             self.selected_handle = None
+            self.selected_hash = None
             self.selected_name = None
 
     # --------------------------------------------------------
@@ -989,7 +2603,13 @@ class SkeletonNamingAssistant(object):
         Exactly three joint children is considered the strongest case.
         """
 
-        children = get_joint_children(joint)
+        # One walk reads the joint and its children's positions.
+        snapshot = SkeletonSnapshot.from_scene(
+            joint,
+            levels=1
+        )
+
+        children = snapshot.children[0]
 
         if len(children) == 3:
             return True
@@ -1000,27 +2620,13 @@ class SkeletonNamingAssistant(object):
         if len(children) > 5:
             return False
 
-        parent_pos = get_world_position(joint)
-
-        above = 0
-        below = 0
-
-        positive_x = 0
-        negative_x = 0
-
-        for child in children:
-
-            position = get_world_position(child)
+        delta = snapshot.positions[children] - snapshot.positions[0]
 
-            if position.y > parent_pos.y:
-                above += 1
-            else:
-                below += 1
+        above = int((delta[:, 1] > 0).sum())
+        below = len(children) - above
 
-            if position.x > parent_pos.x:
-                positive_x += 1
-            elif position.x < parent_pos.x:
-                negative_x += 1
+        positive_x = int((delta[:, 0] > 0).sum())
+        negative_x = int((delta[:, 0] < 0).sum())
 
         return (
             above >= 1 and
@@ -1035,6 +2641,18 @@ class SkeletonNamingAssistant(object):
             joint
         )
 
+        if self.graph:
+            self.graph.detach()
+
+        self.graph = SkeletonGraph(
+            joint
+        ).attach()
+
+        self.analysis = None
+
+        # Compile the templates here rather than on the worker thread.
+        get_matchers()
+
         self.first_cog_pending = False
 
         cmds.inViewMessage(
@@ -1047,27 +2665,50 @@ class SkeletonNamingAssistant(object):
     # Anatomical prediction
     # --------------------------------------------------------
 
-    def get_prediction(self, joint):
+    def get_mapping(self):
+        """
+        Return the analysis of the current skeleton.
 
-        cog = path_from_handle(
-            self.cog_handle
-        )
+        The analysis is only redone when the graph changed since
+        the last one; otherwise this is a lookup.
+        """
 
-        if not cog:
-            return None
+        if not self.graph:
+            return {}
 
-        analyzer = SkeletonAnalyzer(cog)
+        snapshot = self.graph.current()
 
-        mapping = analyzer.analyze()
+        if not snapshot:
+            return {}
 
-        return mapping.get(joint)
+        if self.analysis and self.analysis[0] is snapshot:
+            return self.analysis[1]
 
-    def suggest_anatomical_name(self, joint):
+        analyzer = SkeletonAnalyzer(
+            snapshot.paths[0],
+            snapshot
+        )
 
-        prediction = self.get_prediction(
-            joint
+        mapping = analyzer.analyze()
+
+        self.analysis = (
+            snapshot,
+            mapping
         )
 
+        return mapping
+
+    def get_prediction(self, joint):
+
+        return self.get_mapping().get(joint)
+
+    def suggest_anatomical_name(self, joint, prediction=None):
+
+        if prediction is None:
+            prediction = self.get_prediction(
+                joint
+            )
+
         if not prediction:
             return
 
@@ -1195,19 +2836,7 @@ class SkeletonNamingAssistant(object):
 
     def get_numbered_name_data(self, name):
 
-        match = re.match(
-            r"^(.*)_(\d+)$",
-            name
-        )
-
-        if not match:
-            return None
-
-        return (
-            match.group(1),
-            int(match.group(2)),
-            len(match.group(2))
-        )
+        return get_numbered_name_data(name)
 
     def choose_numbering_child(self, joint):
 
@@ -1354,6 +2983,7 @@ class SkeletonNamingAssistant(object):
 
         if not joint:
             self.selected_handle = None
+            self.selected_hash = None
             self.selected_name = None
             return
 
@@ -1391,10 +3021,67 @@ class SkeletonNamingAssistant(object):
         # Once COG is known, selected joints can receive predictions.
         if self.cog_handle:
 
+            self.request_prediction(
+                joint
+            )
+
+    def request_prediction(self, joint):
+        """
+        Predict the joint's name without blocking the selection.
+
+        An unchanged skeleton is answered from the last analysis;
+        otherwise the current snapshot goes to the worker thread.
+        """
+
+        snapshot = None
+
+        if self.graph:
+            snapshot = self.graph.current()
+
+        if not snapshot:
+            return
+
+        if self.analysis and self.analysis[0] is snapshot:
+
+            self.predictor.cancel()
+
             cmds.evalDeferred(
                 lambda: self.process_prediction()
             )
 
+            return
+
+        self.predictor.submit(
+            joint,
+            snapshot
+        )
+
+    def on_prediction(self, joint, snapshot, mapping):
+        """Main thread: a worker analysis finished."""
+
+        if self.graph and self.graph.snapshot is snapshot:
+            self.analysis = (
+                snapshot,
+                mapping
+            )
+
+        if self.processing:
+            return
+
+        # The user may have clicked on while the analysis ran.
+        if self.get_selected_joint() != joint:
+            return
+
+        prediction = mapping.get(joint)
+
+        if not prediction:
+            return
+
+        self.suggest_anatomical_name(
+            joint,
+            prediction
+        )
+
     def process_prediction(self):
 
         if self.processing:
@@ -1409,6 +3096,23 @@ class SkeletonNamingAssistant(object):
             joint
         )
 
+    def on_node_renamed(self, node, previous_name, *args):
+        """Scene-wide rename callback: only the tracked joint matters."""
+
+        if self.processing:
+            return
+
+        if self.selected_hash is None:
+            return
+
+        if om.MObjectHandle(node).hashCode() != self.selected_hash:
+            return
+
+        # Prompts must not open from inside a Maya callback.
+        cmds.evalDeferred(
+            self.on_name_changed
+        )
+
     def on_name_changed(self):
 
         if self.processing:
@@ -1483,4 +3187,5 @@ def toggle_skeleton_naming_assistant():
     tool.start()
 
 
-toggle_skeleton_naming_assistant()
\ No newline at end of file
+if __name__ == "__main__":
+    toggle_skeleton_naming_assistant()
\ No newline at end of file